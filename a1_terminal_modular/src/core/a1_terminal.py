@@ -7,11 +7,12 @@ import os
 import yaml
 import json
 import copy
-import threading
+import time
 from datetime import datetime
 
 from src.ui.color_wheel import ColorWheel
-from src.ui.chat_bubble import ChatBubble
+from src.ui.virtual_transcript import VirtualTranscript
+from src.ui.session_list import SessionList
 from src.ui.categorized_combobox import CategorizedComboBox
 from src.ui.resizable_pane import ResizablePane
 from src.ui.session_card import SessionCard
@@ -19,13 +20,27 @@ from src.ui.model_selector import ModelSelector
 from src.ui.enhanced_chat_bubble import EnhancedChatBubble
 from src.ui.ultimate_ui import setup_ultimate_ui
 from src.ui.model_info_dropdown import ModelInfoDropdown
+from src.ui.stream_renderer import StreamRenderer
+from src.ui.compare_view import CompareWindow
 from src.core.ollama_manager import OllamaManager
+from src.core.context_cache import SessionContextCache, history_as_prompt
+from src.core.session_store import SessionStore, session_file_name
+from src.core.session_index import SessionIndex
+from src.core.persistence_worker import PersistenceWorker
+from src.core.task_runtime import DEFAULT_LANES, CancelToken, LaneFullError, TaskRuntime
+from src.core.generation_scheduler import GenerationScheduler
+from src.core.model_residency import ModelResidency
+from src.core.prompt_prefill import PromptPrefill
+from src.core.sqlite_session_store import SqliteSessionStore
+from src.core.session_generation import SessionGeneration
+from src.core.history_window import build_history_window, estimate_tokens, format_window_report
+from src.core import session_counters
+from src.core.generation_metrics import format_metrics, accumulate_model_stats, format_model_stats
 
 class A1Terminal:
     """Main application class"""
     def __init__(self):
         self._session_just_loaded = False
-        self._model_just_changed = False
         
         # Load YAML configuration file FIRST
         self.config_file = "a1_terminal_config.yaml"
@@ -35,6 +50,16 @@ class A1Terminal:
         self.root = ctk.CTk()
         self.root.title("A1-Terminal - Ollama Chat Client")
         
+        # Alle Hintergrundarbeit läuft in benannten Lanes; UI-Updates über die Dispatch-Queue
+        lanes = dict(DEFAULT_LANES)
+        for lane in ("generation", "downloads", "metadata"):
+            workers, max_queue, overflow = lanes[lane]
+            lanes[lane] = (self.config.get(f"runtime_{lane}_workers", workers), max_queue, overflow)
+        # Vergleichsmodus: eigene Lane, deren Worker-Zahl die parallelen Generierungen begrenzt
+        lanes["compare"] = (self.compare_parallel_limit(), 16, "reject")
+        self.runtime = TaskRuntime(lanes, tick_ms=self.config.get("runtime_dispatch_tick_ms", 16))
+        self.runtime.attach(self.root)
+        
         # Window size from config
         window_width = self.config.get('ui_window_width', 1400)
         window_height = self.config.get('ui_window_height', 900)
@@ -45,19 +70,49 @@ class A1Terminal:
         self.root.minsize(900, 500)
         self.root.maxsize(2560, 1440)
         
-        self.ollama = OllamaManager()
+        self.ollama = OllamaManager(
+            base_url=self.config.get("ollama_host", "http://localhost:11434"),
+            pool_size=self.config.get("ollama_pool_size", 10),
+            connect_timeout=self.config.get("ollama_connect_timeout", 5.0),
+            read_timeout=self.config.get("ollama_read_timeout", 300.0),
+            catalog_path=self.config.get("model_catalog_cache_path") or os.path.join(os.getcwd(), "model_catalog.json"),
+            offline_mode=self.config.get("offline_mode", False),
+            catalog_max_age=self.config.get("model_catalog_max_age_hours", 24) * 3600.0,
+            # Warteschlange vor allen Generierungen: Limits gegen RAM-Thrashing, Chat vor Hintergrund
+            scheduler=GenerationScheduler(
+                # Der Vergleichsmodus darf so viele Modelle parallel laufen lassen, wie er verspricht
+                max_active=max(self.config.get("generation_max_concurrent", 2), self.compare_parallel_limit()),
+                # Ohne Umgebungsvariable Ollamas eigene Defaults: NUM_PARALLEL automatisch (bis 4),
+                # MAX_LOADED_MODELS 3
+                max_per_model=self.ollama_limit("generation_max_per_model", "OLLAMA_NUM_PARALLEL", 4),
+                max_models=self.ollama_limit("generation_max_loaded_models", "OLLAMA_MAX_LOADED_MODELS", 3),
+                fairness_seconds=self.config.get("generation_fairness_seconds", 30)
+            ),
+            keep_alive=self.config.get("residency_keep_alive") or None
+        )
+        # Welche Modelle Ollama geladen hat (/api/ps) + Entlade-Policy für ungenutzte Modelle
+        self.residency = ModelResidency(
+            idle_unload_seconds=self.config.get("residency_idle_unload_minutes", 10) * 60.0,
+            max_loaded=self.config.get("residency_max_loaded", 0)
+        )
+        self.residency_poll_timer = None
+        self.catalog_timer = None   # nächste Revalidierung des Registry-Katalogs (root.after)
+        # Prompt-Prefill beim Tippen (opt-in): wärmt Ollamas Prompt-Cache vor dem Senden
+        self.prefill = PromptPrefill(
+            min_interval=self.config.get("prompt_prefill_min_interval_seconds", 10)
+        )
         self.current_model = None
+        self._model_info_request = 0  # nur die neueste Anfrage darf das Model-Info-Panel setzen
         self.chat_history = []
         
-        # Stop functionality for generation and downloads
-        self.generation_stopped = False
+        # Laufende Antworten pro Session (session_id -> SessionGeneration), Stop für Downloads
+        self.generations = {}
         self.download_stopped = False
-        self.current_generation_thread = None
-        self.current_download_thread = None
+        self.current_download_task = None
         
-        # Progressive message display
-        self.response_message_widget = None
-        self.current_response_text = ""
+        # Vergleichsmodus (ein Prompt an mehrere Modelle)
+        self.compare_window = None
+        self.compare_tokens = []
         
         # Message history for arrow key navigation
         self.message_history = []
@@ -77,12 +132,49 @@ class A1Terminal:
         if not os.path.exists(self.sessions_dir):
             os.makedirs(self.sessions_dir)
         
+        # Metadaten aller Sessions inkl. Dateiname; Messages werden erst beim Öffnen geladen
+        self.session_index = SessionIndex(self.sessions_dir)
+        
+        # Session-Persistenz: Snapshot + append-only Journal
+        self.session_store = SessionStore(
+            self.sessions_dir,
+            compact_every=self.config.get("session_journal_compact_every", 200),
+            locate=self.session_index.file_path
+        )
+        # Optional: Sessions in SQLite (WAL + FTS5-Suche) statt JSON-Files
+        self.session_db = None
+        if self.config.get("session_storage_backend", "json") == "sqlite":
+            db_path = self.config.get("session_db_path") or os.path.join(self.sessions_dir, "sessions.db")
+            try:
+                self.session_db = SqliteSessionStore(db_path)
+            except Exception as e:
+                print(f"❌ SQLite session storage unavailable, using JSON files: {e}")
+        
+        # Session-Saves laufen im Hintergrund (gebündelt pro Session)
+        self.persistence = PersistenceWorker(
+            self.write_session_snapshot,
+            release=self.session_db.release if self.session_db else self.session_store.release,
+            on_error=lambda sid, e: self.runtime.call_soon(
+                lambda: self.console_print(f"❌ Error beim Save der Session {sid}: {e}", "error")
+            ),
+            runtime=self.runtime
+        )
+        self.index_save_timer = None
+        
+        # Ollama-Kontext pro Session (optional, spart Prompt-Re-Evaluation beim Fortsetzen)
+        self.context_cache = SessionContextCache(self.sessions_dir)
+        
         # Auto-save timer for session saving
         self.auto_save_timer = None
         
+        # Debounce-Timer der Session-Suche (SQLite-Backend)
+        self.session_search_timer = None
+        self.session_search_visible = False
+        
         # Setup UI
         self.setup_ui()
         self.check_ollama_status()
+        self.poll_residency()
     
     def get_default_config(self):
         """Returns the default configuration"""
@@ -174,6 +266,51 @@ class A1Terminal:
             "auto_scroll_chat": True,        # Auto-scroll to new messages
             "show_timestamps": True,         # Show timestamps in chat
             "compact_mode": False,           # Compact display
+            "stream_render_fps": 30,         # Max. repaints/s while streaming answers
+            
+            # ========== TASK RUNTIME ==========
+            "runtime_generation_workers": 4, # Chat requests in flight (Ollama access is limited by the scheduler)
+            "runtime_downloads_workers": 1,  # Parallel model downloads
+            "runtime_metadata_workers": 4,   # Status checks, model lists, model details, search
+            "runtime_dispatch_tick_ms": 16,  # Interval for applying worker results in the UI thread
+            "compare_max_parallel": 0,       # Parallel generations in compare mode (0 = OLLAMA_NUM_PARALLEL or 2)
+            
+            # ========== GENERATION SCHEDULER ==========
+            "generation_max_concurrent": 2,  # Generations sent to Ollama at the same time (at least compare_max_parallel)
+            "generation_max_per_model": 0,   # Per model (0 = OLLAMA_NUM_PARALLEL or 4, Ollama's automatic maximum)
+            "generation_max_loaded_models": 0,  # Different models at the same time (0 = OLLAMA_MAX_LOADED_MODELS or 3, Ollama's default)
+            "generation_fairness_seconds": 30,  # Max. time a request yields to requests for the loaded model
+            
+            # ========== MODEL RESIDENCY ==========
+            "residency_poll_seconds": 15,    # Interval for checking loaded models via /api/ps (0 = off)
+            "residency_preload": True,       # Load the selected model into memory right away
+            "residency_keep_alive": "30m",   # keep_alive sent with requests ("" = Ollama default)
+            "residency_idle_unload_minutes": 10,  # Unload models the app used after this idle time (0 = never)
+            "residency_max_loaded": 0,       # Max. loaded models, least recently used unloaded first (0 = no limit)
+            
+            # ========== PROMPT PREFILL ==========
+            "prompt_prefill": False,         # Evaluate BIAS + history while typing (warms Ollama's prompt cache)
+            "prompt_prefill_min_interval_seconds": 10,  # Min. time between two prefill requests
+            
+            # ========== OLLAMA CONNECTION ==========
+            "ollama_host": "http://localhost:11434",  # Ollama API base URL
+            "ollama_pool_size": 10,          # Keep-alive connections in pool
+            "ollama_connect_timeout": 5.0,   # Connect timeout (s)
+            "ollama_read_timeout": 300.0,    # Read timeout (s), long for slow models
+            "ollama_context_cache": False,   # Persist Ollama context per session (resume without re-eval)
+            "offline_mode": False,           # Never contact the model registry (air-gapped machines)
+            "model_catalog_cache_path": "",  # Registry catalog cache (empty = ./model_catalog.json)
+            "model_catalog_max_age_hours": 24,  # Revalidate the cached catalog after this age
+            
+            # ========== SESSION STORAGE ==========
+            "session_journal_compact_every": 200,  # Journal entries before a new snapshot is written
+            "session_storage_backend": "json",   # "json" (files) or "sqlite" (WAL + full-text search)
+            "session_db_path": "",           # SQLite file (empty = sessions/sessions.db)
+            "session_search_limit": 50,      # Max. hits of the session full-text search
+            
+            # ========== CONTEXT WINDOW ==========
+            "context_num_ctx": 4096,         # Context size (tokens) requested from the model
+            "context_reserve_tokens": 512,   # Tokens kept free for the answer
         }
     
     def load_config(self):
@@ -316,6 +453,50 @@ class A1Terminal:
         )
         self.model_dropdown.pack(fill="x", pady=2)
         
+        # Aufsummierte Latenz-Metriken des aktuellen Models (pro Session)
+        self.model_stats_label = ctk.CTkLabel(
+            left_frame,
+            text="",
+            font=("Arial", self.config.get("ui_model_label_size", 9)),
+            text_color="gray",
+            anchor="w",
+            justify="left",
+            wraplength=300
+        )
+        self.model_stats_label.pack(fill="x", padx=5, pady=(0, 2))
+        
+        # Belegung des Kontextfensters durch die aktuelle Session (aus den Session-Zählern)
+        self.context_budget_label = ctk.CTkLabel(
+            left_frame,
+            text="",
+            font=("Arial", self.config.get("ui_model_label_size", 9)),
+            text_color="gray",
+            anchor="w"
+        )
+        self.context_budget_label.pack(fill="x", padx=5, pady=(0, 2))
+        
+        # Generierungs-Warteschlange (Position der eigenen Anfrage bzw. Auslastung)
+        self.queue_status_label = ctk.CTkLabel(
+            left_frame,
+            text="",
+            font=("Arial", self.config.get("ui_model_label_size", 9)),
+            text_color="gray",
+            anchor="w"
+        )
+        self.queue_status_label.pack(fill="x", padx=5, pady=(0, 2))
+        
+        # Von Ollama geladene Modelle mit RAM-Belegung (/api/ps)
+        self.residency_label = ctk.CTkLabel(
+            left_frame,
+            text="",
+            font=("Arial", self.config.get("ui_model_label_size", 9)),
+            text_color="gray",
+            anchor="w",
+            justify="left",
+            wraplength=300
+        )
+        self.residency_label.pack(fill="x", padx=5, pady=(0, 2))
+        
         # Rechte Seite: Model Info Panel
         self.model_info_panel = ctk.CTkFrame(
             model_controls_frame,
@@ -368,7 +549,7 @@ class A1Terminal:
         self.refresh_btn = ctk.CTkButton(
             buttons_frame,
             text="🔄 Refresh",
-            command=self.refresh_models,
+            command=lambda: self.refresh_models(revalidate_catalog=True),
             width=130,
             font=("Arial", 12, "bold")
         )
@@ -469,15 +650,53 @@ class A1Terminal:
         )
         new_session_btn.pack(side="right", padx=(self.config.get("ui_padding_main", 10), 0))
         
+        # Volltextsuche über alle Sessions (nur mit SQLite-Backend)
+        if self.session_db:
+            search_frame = ctk.CTkFrame(sessions_frame, fg_color="transparent")
+            search_frame.pack(fill="x", padx=self.config.get("ui_padding_main", 10), 
+                             pady=(0, self.config.get("ui_padding_content", 5)))
+            
+            self.session_search_entry = ctk.CTkEntry(
+                search_frame,
+                placeholder_text="🔍 Search all sessions...",
+                font=("Arial", 11)
+            )
+            self.session_search_entry.pack(side="left", fill="x", expand=True)
+            self.session_search_entry.bind("<KeyRelease>", self.on_session_search_changed)
+            self.session_search_entry.bind("<Escape>", lambda e: self.clear_session_search())
+            
+            import_btn = ctk.CTkButton(
+                search_frame,
+                text="📥 JSON",
+                command=self.import_json_sessions,
+                width=70,
+                height=28,
+                font=("Arial", 10, "bold"),
+                fg_color="#4A4A4A",
+                hover_color="#5A5A5A"
+            )
+            import_btn.pack(side="right", padx=(5, 0))
+        
         # Scrollbare Session-List - mehr Platz durch Entfernung des "Current Session" Bereichs
-        self.session_listbox = ctk.CTkScrollableFrame(sessions_frame, 
-                                                      height=self.config.get("ui_session_item_height", 60) * 2.5)
+        # Eine Karte pro Session, Updates patchen nur geänderte Karten
+        self.session_listbox = SessionList(
+            sessions_frame,
+            on_open=self.load_session,
+            on_settings=self.show_session_settings,
+            hover_color=lambda color: self.adjust_color_brightness(color, 1.2),
+            height=self.config.get("ui_session_item_height", 60) * 2.5
+        )
         self.session_listbox.pack(fill="both", expand=True, 
                                  padx=self.config.get("ui_padding_main", 10), 
                                  pady=self.config.get("ui_padding_content", 5))
         
+        # Suchtreffer ersetzen während einer Suche die Session-List (initial versteckt)
+        self.session_search_results = ctk.CTkScrollableFrame(sessions_frame, 
+                                                             height=self.config.get("ui_session_item_height", 60) * 2.5)
+        
         # Session Actions unter der Session-List
         actions_frame = ctk.CTkFrame(sessions_frame)
+        self.session_actions_frame = actions_frame
         actions_frame.pack(fill="x", padx=self.config.get("ui_padding_main", 10), 
                           pady=self.config.get("ui_padding_content", 5))
         
@@ -575,8 +794,8 @@ class A1Terminal:
         # if not os.path.exists(self.sessions_dir):
         #     os.makedirs(self.sessions_dir)
             
-        # Chat bubbles for session management
-        self.chat_bubbles = []
+        # Chat bubbles for session management (Messages des Transcripts)
+        self.chat_bubbles = self.chat_display_frame.entries if hasattr(self, 'chat_display_frame') else []
         
         # Load existing sessions
         self.load_all_sessions()
@@ -627,9 +846,19 @@ class A1Terminal:
             "bias": "",
             "messages": [],
             "total_messages": 0,
+            "word_count": 0,
+            "token_count": 0,
             "color": "#1f538d"  # Standard-Farbe: Blue
         }
         
+        # Bisherige Session save und auf Metadaten reduzieren
+        previous_session_id = self.current_session_id
+        self.cancel_prefill()
+        if previous_session_id and previous_session_id in self.sessions:
+            self.detach_generation_view(previous_session_id)
+            self.save_current_session()
+            self.unload_session_messages(previous_session_id)
+        
         # Session save
         self.sessions[session_id] = session_data
         self.current_session_id = session_id
@@ -643,10 +872,13 @@ class A1Terminal:
             self.session_bias_entry.delete("1.0", "end")
         # BIAS-Info-Label refresh
         self.update_bias_info_label()
+        self.update_context_budget_label()
+        self.update_model_stats_label()
         
         # UI refresh
         self.update_session_list()
         self.update_current_session_display()
+        self.update_generation_controls()
         
         # Stelle sicher, dass Modelle loaded sind
         if hasattr(self, 'model_dropdown'):
@@ -657,9 +889,6 @@ class A1Terminal:
         
         # Session persistent save mit Feedback
         self.save_session_with_feedback()
-        
-        # Force update der UI nach kurzer Verzögerung
-        self.root.after(100, self.update_session_list)
 
         self.console_print(f"✅ New Session created: {session_id}", "success")
 
@@ -718,19 +947,27 @@ class A1Terminal:
                 debug_text += f"   💬 Messages: {session_data.get('total_messages', 0)}\n"
                 debug_text += f"   📝 BIAS: {'Yes' if session_data.get('bias', '') else 'No'}\n"
                 
-                # Check for session file (any name, but with matching ID)
-                matching_files = [f for f in os.listdir(self.sessions_dir) if f.endswith(f"_session_{session_id}.json")]
-                file_exists = len(matching_files) > 0
+                # Check for session file (Dateiname aus dem Session-Index)
+                session_file = self.session_index.file_path(session_id)
+                file_exists = bool(session_file) and os.path.exists(session_file)
                 debug_text += f"   💾 File: {'✅ Present' if file_exists else '❌ Missing'}\n"
                 if file_exists:
                     try:
-                        stat = os.stat(os.path.join(self.sessions_dir, matching_files[0]))
+                        stat = os.stat(session_file)
                         debug_text += f"   📏 File Size: {stat.st_size} Bytes\n"
                     except:
                         debug_text += f"   📏 File Size: Unreadable\n"
                 
                 debug_text += "\n"
         
+        # Auslastung der Task-Runtime (Lanes + UI-Dispatch)
+        debug_text += "⚙️ TASK RUNTIME\n" + self.runtime.format_stats() + "\n"
+        debug_text += "🚦 GENERATION QUEUE\n" + self.ollama.scheduler.format_stats() + "\n"
+        debug_text += (f"🧠 MODEL RESIDENCY ({self.residency.preloads} preloads, "
+                       f"{self.residency.unloads} unloads)\n{self.residency.format_status()}\n")
+        if self.config.get("prompt_prefill", False):
+            debug_text += "⌨️ PROMPT PREFILL\n" + self.prefill.format_stats() + "\n"
+        
         # Zeige Debug-Info in einem Dialog
         debug_dialog = ctk.CTkToplevel(self.root)
         debug_dialog.title("🔍 Session Debug Information")
@@ -861,6 +1098,13 @@ class A1Terminal:
             self.console_print(f"ℹ️ Session already active: {session_id}", "info")
             return True
         
+        # Messages der Session erst jetzt von der Platte lesen (Index hält nur Metadaten)
+        try:
+            session_data = self.load_session_data(session_id)
+        except Exception as e:
+            self.console_print(f"❌ Error beim Load der Session-File: {e}", "error")
+            return False
+        
         # IMPORTANT: Set flag to prevent saving during load process
         self._session_just_loaded = True
         
@@ -873,7 +1117,12 @@ class A1Terminal:
         # Alte Session save BEVOR Chat geleert is being und BEVOR Session-ID gewechselt is being
         # Die Messages müssen noch in chat_bubbles sein für das Save
         # WICHTIG: Prüfe ob die alte Session noch existiert (könnte deleted worden sein)
+        if old_session_id != session_id:
+            self.cancel_prefill()
         if old_session_id and old_session_id != session_id and old_session_id in self.sessions:
+            # Laufende Antwort der alten Session läuft im Hintergrund weiter, ihre Bubbles
+            # gehören nicht in den Snapshot (die fertige Antwort speichert finish_generation)
+            self.detach_generation_view(old_session_id)
             # Save während chat_bubbles noch existieren und current_session_id noch die alte ist
             if self.save_current_session():
                 self.console_print(f"💾 Alte Session saved: {old_session_id}", "success")
@@ -885,21 +1134,11 @@ class A1Terminal:
         
         # JETZT Session ID wechseln - KRITISCH: Muss VOR clear_chat passieren!
         self.current_session_id = session_id
+        self.sessions[session_id] = session_data
         
-        # Session-Daten aus der File load
-        session_name = self.sessions[session_id].get("name", "")
-        safe_name = "_".join(session_name.split()).replace("/", "_").replace("\\", "_")
-        session_file = os.path.join(self.sessions_dir, f"{safe_name}_session_{session_id}.json")
-        
-        try:
-            with open(session_file, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
-                # Aktualisiere auch das in-memory Dictionary
-                self.sessions[session_id] = session_data
-        except Exception as e:
-            self.console_print(f"⚠️ Error beim Load der Session-File: {e}", "warning")
-            # Fallback auf in-memory Daten
-            session_data = self.sessions[session_id]
+        # Alte Session wieder auf Metadaten reduzieren (Messages liegen auf der Platte)
+        if old_session_id and old_session_id != session_id and old_session_id in self.sessions:
+            self.unload_session_messages(old_session_id)
         
         # JETZT ERST Chat-Anzeige leeren (NACH Session-ID Wechsel!)
         # Dadurch is being auto_save, falls es aufgerufen is being, die RICHTIGE (neue) Session save
@@ -914,6 +1153,7 @@ class A1Terminal:
         # Model setzen wenn vorhanden
         if session_data.get("model"):
             self.current_model = session_data["model"]
+            self.preload_model(self.current_model)
             if hasattr(self, 'model_dropdown'):
                 # Versuche das Model direkt zu setzen
                 self.model_dropdown.set_selected(self.current_model)
@@ -956,6 +1196,8 @@ class A1Terminal:
         
         # BIAS-Info-Label refresh
         self.update_bias_info_label()
+        self.update_context_budget_label()
+        self.update_model_stats_label()
         
         # Messages load und Chat-Historie für LLM aufbauen
         message_count = 0
@@ -974,24 +1216,11 @@ class A1Terminal:
                 # AI-Antwort hinzufügen
                 self.chat_history.append({"role": "assistant", "content": message})
         
-        # Layout nach dem Load aller Messages vollständig refresh
-        if message_count > 0:
-            # Mehrfaches Update für zuverlässiges Rendering
-            self.chat_display_frame.update()
-            self.chat_display_frame.update_idletasks()
-            
-            # Parent Canvas Update
-            if hasattr(self.chat_display_frame, '_parent_canvas'):
-                self.chat_display_frame._parent_canvas.update()
-                self.chat_display_frame._parent_canvas.update_idletasks()
-                
-                # Scrollregion nur EINMAL refresh - keine unnötigen mehrfachen Updates
-                self.root.after(300, lambda: self._update_scroll_region())
-        else:
-            # Auch für leere Sessions das Layout refresh
-            if hasattr(self, 'chat_display_frame'):
-                self.chat_display_frame.update()
-                self.chat_display_frame.update_idletasks()
+        # Der Transcript erzeugt Bubbles erst beim Rendern und nur für den sichtbaren Bereich
+        
+        # Läuft in dieser Session noch eine Antwort: weiter sichtbar streamen
+        self.attach_generation_view(session_id)
+        self.update_generation_controls()
         
         # Debug info about restored chat history
         if self.chat_history:
@@ -1012,16 +1241,6 @@ class A1Terminal:
         
         return True
     
-    def _update_scroll_region(self):
-        """Hilfsmethode zum Refresh der Scroll-Region"""
-        if hasattr(self, 'chat_display_frame') and hasattr(self.chat_display_frame, '_parent_canvas'):
-            try:
-                self.chat_display_frame._parent_canvas.configure(
-                    scrollregion=self.chat_display_frame._parent_canvas.bbox("all")
-                )
-            except:
-                pass
-
     def save_current_session(self):
         """Speichert die aktuelle Session"""
         if not self.current_session_id:
@@ -1037,7 +1256,7 @@ class A1Terminal:
         # Aktuelle Daten sammeln
         session_data["last_modified"] = datetime.now().isoformat()
         session_data["model"] = getattr(self, 'current_model', None)
-        session_data["bias"] = self.current_session_bias
+        session_counters.set_session_bias(session_data, self.current_session_bias)
         session_data["total_messages"] = self.count_chat_messages()
         
         # Chat-Messages sammeln
@@ -1048,31 +1267,102 @@ class A1Terminal:
                 "sender": bubble.sender,
                 "message": bubble.message
             }
+            if bubble.metrics:
+                msg_data["metrics"] = bubble.metrics
             messages.append(msg_data)
         
-        session_data["messages"] = messages
+        # Wort-/Token-Zähler nur um die geänderten Messages korrigieren
+        session_counters.replace_session_messages(session_data, messages)
+        self.update_context_budget_label()
         
-        # Session-File save: Name am Anfang, dann _session_<SessionID>.json
-        session_name = self.sessions[self.current_session_id].get("name", "")
-        safe_name = "_".join(session_name.split()).replace("/", "_").replace("\\", "_")
-        session_file = os.path.join(self.sessions_dir, f"{safe_name}_session_{self.current_session_id}.json")
-
-        # Lösche ggf. alte Dateien mit anderer Benennung für diese Session-ID
-        for fname in os.listdir(self.sessions_dir):
-            if fname.endswith(f"_session_{self.current_session_id}.json") and fname != f"{safe_name}_session_{self.current_session_id}.json":
-                try:
-                    os.remove(os.path.join(self.sessions_dir, fname))
-                except Exception:
-                    pass
-
+        # Nur die Änderungen seit dem letzten Save ins Journal schreiben
         try:
-            with open(session_file, 'w', encoding='utf-8') as f:
-                json.dump(session_data, f, ensure_ascii=False, indent=2)
+            self.persist_session(session_data)
             return True
         except Exception as e:
             self.console_print(f"❌ Error beim Save der Session: {e}", "error")
             return False
 
+    def persist_session(self, session_data):
+        """Markiert eine (vollständig geladene) Session zum Schreiben im Hintergrund"""
+        session_counters.ensure_session_counters(session_data)
+        self.persistence.submit(session_data["session_id"], session_data)
+    
+    def write_session_snapshot(self, session_data):
+        """Schreibt eine Session-Kopie und aktualisiert ihren Index-Eintrag (Persistence-Worker)"""
+        if self.session_db:
+            self.session_db.save(session_data)
+            return
+        self.session_store.save(session_data)
+        self.session_index.update(
+            session_data,
+            self.session_store.snapshot_path(session_data),
+            self.session_store.journal_path(session_data["session_id"])
+        )
+        self.runtime.call_soon(self.schedule_index_save)
+    
+    def schedule_index_save(self):
+        """Plant das Schreiben des Session-Index (max. einmal pro Sekunde)"""
+        if self.index_save_timer is None:
+            self.index_save_timer = self.root.after(1000, self.save_session_index)
+    
+    def save_session_index(self):
+        """Schreibt den Session-Index, falls er sich geändert hat"""
+        self.index_save_timer = None
+        try:
+            self.session_index.save()
+        except Exception as e:
+            self.console_print(f"❌ Error beim Save des Session-Index: {e}", "error")
+    
+    def load_session_data(self, session_id):
+        """Liefert die vollständigen Daten einer Session inkl. Messages (lädt bei Bedarf)"""
+        session_data = self.sessions[session_id]
+        if "messages" in session_data:
+            return session_data
+        # Ausstehende Saves zuerst schreiben, sonst wäre der Stand auf der Platte veraltet
+        self.persistence.flush()
+        if self.session_db:
+            session_data = self.session_db.load(session_id)
+        else:
+            session_file = self.session_index.file_path(session_id) or os.path.join(
+                self.sessions_dir, session_file_name(session_id, session_data.get("name", ""))
+            )
+            session_data = self.apply_session_defaults(self.session_store.load(session_file))
+        # Alte Sessions ohne Zähler einmalig komplett zählen
+        session_counters.ensure_session_counters(session_data)
+        return session_data
+    
+    def unload_session_messages(self, session_id, session_data=None):
+        """Reduziert eine nicht angezeigte Session auf ihre Index-Metadaten"""
+        if session_data is None:
+            session_data = self.sessions.get(session_id)
+        if session_data is not None and "messages" in session_data:
+            self.sessions[session_id] = {
+                key: session_data[key] for key in SessionIndex.META_KEYS if key in session_data
+            }
+            self.persistence.release(session_id)
+    
+    def update_session_metadata(self, session_id, **changes):
+        """Ändert Metadaten (Name, Farbe) einer Session und persistiert sie
+        
+        Nicht geöffnete Sessions werden dafür kurz geladen und danach wieder auf
+        Metadaten reduziert.
+        """
+        changes.setdefault("last_modified", datetime.now().isoformat())
+        if session_id == self.current_session_id:
+            self.sessions[session_id].update(changes)
+            return self.save_current_session()
+        
+        try:
+            session_data = self.load_session_data(session_id)
+            session_data.update(changes)
+            self.persist_session(session_data)
+            self.unload_session_messages(session_id, session_data)
+            return True
+        except Exception as e:
+            self.console_print(f"❌ Error beim Save der Session {session_id}: {e}", "error")
+            return False
+    
     def auto_save_session(self):
         """Automatisches Save mit Debounce-Logik"""
         # Lösche vorherigen Timer falls vorhanden
@@ -1102,143 +1392,214 @@ class A1Terminal:
         return False
 
     def load_all_sessions(self):
-        """Lädt alle Sessions aus dem Sessions-Folder"""
+        """Lädt die Metadaten aller Sessions - aus dem Index, geparst nur bei geänderten Files"""
+        if self.session_db:
+            self.load_all_sessions_from_db()
+            return
+        
         try:
+            self.session_index.load()
             session_files = [f for f in os.listdir(self.sessions_dir)
-                             if f.endswith(".json")]
+                             if f.endswith(".json") and f != SessionIndex.FILE_NAME]
             
+            found_ids = []
+            parsed_count = 0
             for session_file in session_files:
                 session_path = os.path.join(self.sessions_dir, session_file)
+                
+                # Session-ID steckt im Dateinamen: <name>_session_<id>.json
+                if "_session_" in session_file:
+                    session_id = session_file.rsplit("_session_", 1)[1][:-len(".json")]
+                    journal_path = self.session_store.journal_path(session_id)
+                    if self.session_index.is_fresh(session_id, session_file, journal_path):
+                        self.sessions[session_id] = self.session_index.metadata(session_id)
+                        found_ids.append(session_id)
+                        continue
+                
                 try:
-                    with open(session_path, 'r', encoding='utf-8') as f:
-                        session_data = json.load(f)
-                        session_id = session_data.get("session_id")
-                        if session_id:
-                            # Füge Standard-Namen hinzu wenn nicht vorhanden (Migration bestehender Sessions)
-                            if "name" not in session_data:
-                                created_date = session_data.get("created_at", "")
-                                if created_date:
-                                    try:
-                                        date_obj = datetime.fromisoformat(created_date)
-                                        session_data["name"] = f"Session {date_obj.strftime('%d.%m %H-%M')}"
-                                    except:
-                                        session_data["name"] = f"Session {session_id[-8:]}"
-                                else:
-                                    session_data["name"] = f"Session {session_id[-8:]}"
-                            # Füge Standard-Farbe hinzu wenn nicht vorhanden (Migration bestehender Sessions) 
-                            if "color" not in session_data:
-                                session_data["color"] = "#1f538d"  # Standard-Blue
-                            self.sessions[session_id] = session_data
+                    session_data = self.session_store.load(session_path)
+                    session_id = session_data.get("session_id")
+                    if session_id:
+                        self.apply_session_defaults(session_data)
+                        
+                        # Index-Eintrag new aufbauen, Messages nicht im Speicher halten
+                        session_counters.ensure_session_counters(session_data)
+                        self.session_index.update(
+                            session_data, session_path, self.session_store.journal_path(session_id)
+                        )
+                        self.sessions[session_id] = self.session_index.metadata(session_id)
+                        self.session_store.release(session_id)
+                        found_ids.append(session_id)
+                        parsed_count += 1
                 except Exception as e:
                     self.console_print(f"❌ Error beim Load der Session {session_file}: {e}", "warning")
             
+            # Einträge gelöschter Files entfernen und Index sofort aktualisieren
+            self.session_index.retain(found_ids)
+            self.save_session_index()
+            
             self.update_session_list()
-            self.console_print(f"📂 {len(self.sessions)} Sessions loaded", "info")
+            self.console_print(f"📂 {len(self.sessions)} Sessions loaded ({parsed_count} parsed, rest from index)", "info")
             
         except Exception as e:
             self.console_print(f"❌ Error beim Load der Sessions: {e}", "error")
 
-    def calculate_session_word_count(self, session_data):
-        """Berechnet die Gesamtanzahl der Wörter in einer Session"""
-        total_words = 0
-        messages = session_data.get("messages", [])
-        
-        for message in messages:
-            content = message.get("message", "")
-            if isinstance(content, str) and content.strip():
-                # Einfache aber robuste Wort-Zählung
-                # Teile bei Whitespace und filtere leere Strings
-                words = [word for word in content.split() if word.strip()]
-                total_words += len(words)
-        
-        # BIAS auch mitzählen falls vorhanden
-        bias = session_data.get("bias", "")
-        if bias and bias.strip():
-            bias_words = [word for word in bias.split() if word.strip()]
-            total_words += len(bias_words)
-        
-        return total_words
+    def load_all_sessions_from_db(self):
+        """Lädt die Session-Metadaten aus der SQLite-Datenbank"""
+        try:
+            # Erster Start mit SQLite: bestehende JSON-Sessions übernehmen
+            if self.session_db.count_sessions() == 0:
+                self.import_json_sessions(show_result=False)
+            
+            for session_data in self.session_db.list_sessions():
+                self.sessions[session_data["session_id"]] = session_data
+            
+            self.update_session_list()
+            self.console_print(f"📂 {len(self.sessions)} Sessions loaded (SQLite)", "info")
+        except Exception as e:
+            self.console_print(f"❌ Error beim Load der Sessions: {e}", "error")
+    
+    def iter_json_sessions(self):
+        """Liefert alle Sessions aus den JSON-Files (Snapshot + Journal) vollständig"""
+        for session_file in os.listdir(self.sessions_dir):
+            if not session_file.endswith(".json") or session_file == SessionIndex.FILE_NAME:
+                continue
+            try:
+                session_data = self.session_store.load(os.path.join(self.sessions_dir, session_file))
+            except Exception as e:
+                self.console_print(f"❌ Error beim Load der Session {session_file}: {e}", "warning")
+                continue
+            if not session_data.get("session_id"):
+                continue
+            self.apply_session_defaults(session_data)
+            session_counters.ensure_session_counters(session_data)
+            session_data.setdefault("total_messages", len([
+                m for m in session_data.get("messages", []) if m.get("sender") != "System"
+            ]))
+            self.session_store.release(session_data["session_id"])
+            yield session_data
+    
+    def import_json_sessions(self, show_result=True):
+        """Importiert die JSON-Session-Files in die SQLite-Datenbank (bestehende IDs bleiben)"""
+        if not self.session_db:
+            return 0
+        
+        self.persistence.flush()
+        imported = self.session_db.import_sessions(self.iter_json_sessions())
+        self.console_print(f"📥 {imported} JSON sessions imported into SQLite", "success")
+        
+        if show_result:
+            for session_data in self.session_db.list_sessions():
+                self.sessions.setdefault(session_data["session_id"], session_data)
+            self.update_session_list()
+            messagebox.showinfo("Import", f"{imported} sessions imported from JSON files.")
+        return imported
+    
+    def apply_session_defaults(self, session_data):
+        """Ergänzt fehlende Felder älterer Session-Files (Migration bestehender Sessions)"""
+        session_id = session_data["session_id"]
+        # Füge Standard-Namen hinzu wenn nicht vorhanden
+        if "name" not in session_data:
+            created_date = session_data.get("created_at", "")
+            if created_date:
+                try:
+                    date_obj = datetime.fromisoformat(created_date)
+                    session_data["name"] = f"Session {date_obj.strftime('%d.%m %H-%M')}"
+                except:
+                    session_data["name"] = f"Session {session_id[-8:]}"
+            else:
+                session_data["name"] = f"Session {session_id[-8:]}"
+        # Füge Standard-Farbe hinzu wenn nicht vorhanden
+        if "color" not in session_data:
+            session_data["color"] = "#1f538d"  # Standard-Blue
+        return session_data
 
     def update_session_list(self):
         """Aktualisiert die Session-List in der UI"""
         if not hasattr(self, 'session_listbox'):
             return
             
-        # Lösche alte Einträge
-        for widget in self.session_listbox.winfo_children():
+        # Nur neue/gelöschte/geänderte Sessions fassen Widgets an
+        self.session_listbox.sync(self.sessions, busy=self.generations)
+    
+    def on_session_search_changed(self, event=None):
+        """Startet die Suche verzögert, sobald der User aufhört zu tippen"""
+        if self.session_search_timer:
+            self.root.after_cancel(self.session_search_timer)
+        self.session_search_timer = self.root.after(250, self.run_session_search)
+    
+    def run_session_search(self):
+        """Führt die Volltextsuche im Hintergrund aus"""
+        self.session_search_timer = None
+        query = self.session_search_entry.get().strip()
+        if not query:
+            self.clear_session_search()
+            return
+        
+        def search():
+            try:
+                results = self.session_db.search(query, limit=self.config.get("session_search_limit", 50))
+            except Exception as e:
+                self.runtime.call_soon(lambda: self.console_print(f"❌ Search error: {e}", "error"))
+                return
+            self.runtime.call_soon(lambda: self.show_session_search_results(query, results))
+        
+        self.runtime.submit("metadata", search, name="session-search")
+    
+    def show_session_search_results(self, query, results):
+        """Zeigt die gerankten Treffer anstelle der Session-List"""
+        # Veraltete Ergebnisse (User hat inzwischen weitergetippt) verwerfen
+        if query != self.session_search_entry.get().strip():
+            return
+        
+        for widget in self.session_search_results.winfo_children():
             widget.destroy()
         
-        # Sortiere Sessions nach Erstellungsdatum (neueste zuerst)
-        sorted_sessions = sorted(self.sessions.items(), 
-                               key=lambda x: x[1].get("created_at", ""), 
-                               reverse=True)
+        if not self.session_search_visible:
+            self.session_search_visible = True
+            self.session_listbox.pack_forget()
+            self.session_search_results.pack(fill="both", expand=True, 
+                                             padx=self.config.get("ui_padding_main", 10), 
+                                             pady=self.config.get("ui_padding_content", 5),
+                                             before=self.session_actions_frame)
+        
+        if not results:
+            ctk.CTkLabel(self.session_search_results, text=f"No matches for '{query}'",
+                         font=("Arial", 10), text_color="gray").pack(pady=10)
+            return
         
-        for session_id, session_data in sorted_sessions:
-            # Session-Info
-            session_name = session_data.get("name", f"Session {session_id[-8:]}")
-            created_date = session_data.get("created_at", "Unbekannt")
-            if created_date != "Unbekannt":
-                try:
-                    date_obj = datetime.fromisoformat(created_date)
-                    date_str = date_obj.strftime("%d.%m.%Y %H:%M")  # Ohne Sekunden für mehr Platz
-                except:
-                    date_str = created_date[:16] if len(created_date) > 16 else created_date
-            else:
-                date_str = created_date
-
-            msg_count = session_data.get("total_messages", 0)
-            model_name = session_data.get("model", "Kein Model")
-            model_name = model_name[:12] if model_name else "Kein Model"
-
-            # Token/Wort-Anzahl für diese Session berechnen
-            word_count = self.calculate_session_word_count(session_data)
-            word_display = f"{word_count}W" if word_count < 1000 else f"{word_count//1000:.1f}kW"
-
-            # Aktive Session hervorheben: Keine gelbe Farbe, nur Session-Farbe verwenden
-            is_active = session_id == self.current_session_id
-
-            # Session-Container für Name und Buttons
-            session_container = ctk.CTkFrame(self.session_listbox)
-            session_container.pack(fill="x", pady=2)
-
-            # Session-Button mit Namen - kompakter für schmale Fenster
-            if len(session_name) > 20:
-                session_name_display = session_name[:17] + "..."
-            else:
-                session_name_display = session_name
-
-            button_text = f"📝 {session_name_display}\n📅 {date_str}\n💬 {msg_count} | 🤖 {model_name[:8]} | 📊 {word_display}"
-
-            # Session-Farbe verwenden
-            session_color = session_data.get("color", "#4A4A4A")
-            btn_fg_color = session_color
-            btn_hover_color = self.adjust_color_brightness(btn_fg_color, 1.2)
-
-            session_btn = ctk.CTkButton(
-                session_container,
+        for hit in results:
+            name = hit.get("name") or f"Session {hit['session_id'][-8:]}"
+            snippet = " ".join((hit.get("snippet") or "").split())
+            button_text = f"📝 {name[:20]}\n{hit.get('sender', '')} • {hit.get('timestamp', '')}\n{snippet[:90]}"
+            color = hit.get("color") or "#4A4A4A"
+            
+            hit_btn = ctk.CTkButton(
+                self.session_search_results,
                 text=button_text,
-                command=lambda sid=session_id: self.load_session(sid),
-                height=75,  # Etwas höher für mehr Text
+                command=lambda sid=hit["session_id"]: self.load_session(sid),
+                height=75,
                 font=("Arial", 9),
                 anchor="w",
-                fg_color=btn_fg_color,
-                hover_color=btn_hover_color,
-                text_color="#000000"  # Schrift schwarz
-            )
-            session_btn.pack(side="left", fill="both", expand=True, padx=(0, 5))
-            
-            # Quadratischer Zahnrad-Button für Session-Einstellungen (Umbenennen + Farbe)
-            settings_btn = ctk.CTkButton(
-                session_container,
-                text="⚙️",
-                command=lambda sid=session_id: self.show_session_settings(sid),
-                width=75,
-                height=75,
-                font=("Arial", 18),
-                fg_color="#4A4A4A",
-                hover_color="#5A5A5A"
+                fg_color=color,
+                hover_color=self.adjust_color_brightness(color, 1.2),
+                text_color="#000000"
             )
-            settings_btn.pack(side="right")
+            hit_btn.pack(fill="x", pady=2)
+        
+        self.console_print(f"🔍 {len(results)} matches for '{query}'", "info")
+    
+    def clear_session_search(self):
+        """Beendet die Suche und zeigt wieder die Session-List"""
+        if self.session_search_entry.get():
+            self.session_search_entry.delete(0, "end")
+        if self.session_search_visible:
+            self.session_search_visible = False
+            self.session_search_results.pack_forget()
+            self.session_listbox.pack(fill="both", expand=True, 
+                                     padx=self.config.get("ui_padding_main", 10), 
+                                     pady=self.config.get("ui_padding_content", 5),
+                                     before=self.session_actions_frame)
     
     def rename_session(self, session_id):
         """Zeigt einen Dialog zum Umbenennen einer Session"""
@@ -1288,24 +1649,9 @@ class A1Terminal:
         def save_name():
             new_name = name_entry.get().strip()
             if new_name and new_name != current_name:
-                # Name in Session-Daten refresh
-                self.sessions[session_id]["name"] = new_name
-                self.sessions[session_id]["last_modified"] = datetime.now().isoformat()
-                # Find old file
-                old_files = [f for f in os.listdir(self.sessions_dir) if f.endswith(f"_session_{session_id}.json")]
-                old_path = os.path.join(self.sessions_dir, old_files[0]) if old_files else None
-                # Save to new file with new name (name at beginning)
-                safe_name = "_".join(new_name.split()).replace("/", "_").replace("\\", "_")
-                new_path = os.path.join(self.sessions_dir, f"{safe_name}_session_{session_id}.json")
-                try:
-                    # Save updated session data to new file
-                    with open(new_path, 'w', encoding='utf-8') as f:
-                        json.dump(self.sessions[session_id], f, ensure_ascii=False, indent=2)
-                    # Delete old file if it exists and is not the same as new file
-                    if old_path and os.path.abspath(old_path) != os.path.abspath(new_path):
-                        os.remove(old_path)
-                except Exception as e:
-                    self.console_print(f"❌ Error beim Umbenennen/Save der Session-File: {e}", "warning")
+                # Name ändern - der Store schreibt den Snapshot unter neuem Namen
+                if not self.update_session_metadata(session_id, name=new_name):
+                    self.console_print(f"❌ Error beim Umbenennen/Save der Session-File", "warning")
                 # UI refresh
                 self.update_session_list()
                 self.update_current_session_display()
@@ -1482,11 +1828,9 @@ class A1Terminal:
         def save_color():
             new_color = selected_color.get()
             if new_color and new_color != current_color:
-                # Farbe in Session-Daten refresh
-                self.sessions[session_id]["color"] = new_color
-                self.sessions[session_id]["last_modified"] = datetime.now().isoformat()
-                # Session save
-                self.save_session_with_feedback()
+                # Farbe in Session-Daten refresh und save
+                if self.update_session_metadata(session_id, color=new_color):
+                    self.console_print(f"💾 Session saved: {session_id}", "success")
                 # UI refresh
                 self.update_session_list()
                 # Wenn die aktuelle Session changed wurde, Anzeige sofort refresh
@@ -1658,36 +2002,20 @@ class A1Terminal:
             new_name = name_entry.get().strip()
             new_color = selected_color.get()
             
-            changed = False
+            changes = {}
             
-            # Name change
+            # Name change (File is being vom Store umbenannt)
             if new_name and new_name != current_name:
-                self.sessions[session_id]["name"] = new_name
-                changed = True
-                
-                # File umbenennen
-                old_files = [f for f in os.listdir(self.sessions_dir) if f.endswith(f"_session_{session_id}.json")]
-                old_path = os.path.join(self.sessions_dir, old_files[0]) if old_files else None
-                safe_name = "_".join(new_name.split()).replace("/", "_").replace("\\", "_")
-                new_path = os.path.join(self.sessions_dir, f"{safe_name}_session_{session_id}.json")
-                
-                try:
-                    with open(new_path, 'w', encoding='utf-8') as f:
-                        json.dump(self.sessions[session_id], f, ensure_ascii=False, indent=2)
-                    if old_path and os.path.abspath(old_path) != os.path.abspath(new_path):
-                        os.remove(old_path)
-                except Exception as e:
-                    self.console_print(f"❌ Error Save: {e}", "warning")
+                changes["name"] = new_name
             
             # Farbe change
             if new_color and new_color != current_color:
-                self.sessions[session_id]["color"] = new_color
-                changed = True
+                changes["color"] = new_color
             
             # Save und UI refresh
-            if changed:
-                self.sessions[session_id]["last_modified"] = datetime.now().isoformat()
-                self.save_session_with_feedback()
+            if changes:
+                if not self.update_session_metadata(session_id, **changes):
+                    self.console_print(f"❌ Error Save", "warning")
                 self.update_session_list()
                 if hasattr(self, 'current_session_id') and self.current_session_id == session_id:
                     self.update_current_session_display()
@@ -1803,8 +2131,8 @@ class A1Terminal:
         """Automatische Session-Speicherung ohne Konsolen-Output"""
         if self.current_session_id:
             try:
-                with open("sessions.json", "w", encoding="utf-8") as f:
-                    json.dump(self.sessions, f, indent=2, ensure_ascii=False)
+                # Metadaten-Änderung (z.B. BIAS) landet als Header-Eintrag im Journal
+                self.persist_session(self.sessions[self.current_session_id])
             except Exception as e:
                 # Stille Fehlerbehandlung - nur bei kritischen Fehlern show
                 pass
@@ -1834,10 +2162,11 @@ class A1Terminal:
         self.current_session_bias = bias_text
         
         if self.current_session_id and self.current_session_id in self.sessions:
-            self.sessions[self.current_session_id]["bias"] = bias_text
+            session_counters.set_session_bias(self.sessions[self.current_session_id], bias_text)
             
         self.console_print("💾 Session-BIAS saved", "success")
         self.update_bias_info_label()
+        self.update_context_budget_label()
     
     def on_bias_text_changed(self, event=None):
         """Is being aufgerufen, wenn sich der BIAS-Text ändert (Auto-Save mit Verzögerung)"""
@@ -1865,11 +2194,12 @@ class A1Terminal:
             self.current_session_bias = bias_text
             
             if self.current_session_id and self.current_session_id in self.sessions:
-                self.sessions[self.current_session_id]["bias"] = bias_text
+                session_counters.set_session_bias(self.sessions[self.current_session_id], bias_text)
                 # Session automatic save
                 self.silent_save_session()
                 
             self.update_bias_info_label()
+            self.update_context_budget_label()
             
             if bias_text:
                 self.console_print("💭 BIAS automatic aktualisiert", "info")
@@ -1926,32 +2256,15 @@ class A1Terminal:
             
         deleted_session_id = self.current_session_id
         
-        # Alle zugehörigen Session-Dateien delete (unabhängig vom Namen)
-        try:
-            deleted_files = 0
-            for f in os.listdir(self.sessions_dir):
-                if f.endswith(f"_session_{self.current_session_id}.json"):
-                    file_path = os.path.join(self.sessions_dir, f)
-                    try:
-                        os.remove(file_path)
-                        deleted_files += 1
-                    except Exception as e:
-                        self.console_print(f"❌ Error deleting session file {f}: {e}", "error")
-            if deleted_files == 0:
-                self.console_print(f"⚠️ No session file found for {self.current_session_id}.", "warning")
-        except Exception as e:
-            self.console_print(f"❌ Error deleting session files: {e}", "error")
+        # Alle zugehörigen Session-Dateien delete (Dateiname aus dem Session-Index)
+        self.delete_session_files(deleted_session_id)
         
         # Remove session from memory
         if self.current_session_id in self.sessions:
             del self.sessions[self.current_session_id]
         
-        # Sessions persistent save
-        try:
-            with open("sessions.json", "w", encoding="utf-8") as f:
-                json.dump(self.sessions, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            self.console_print(f"❌ Error beim Save der Session-List: {e}", "error")
+        # Session-Index persistent save
+        self.save_session_index()
         
         self.console_print(f"🗑️ Session deleted: {deleted_session_id}", "warning")
         
@@ -1959,9 +2272,6 @@ class A1Terminal:
         self.update_session_list()
         self.update_current_session_display()
         
-        # Force update nach kurzer Verzögerung
-        self.root.after(100, self.update_session_list)
-        
         # Prüfe ob noch andere Sessions vorhanden sind
         if self.sessions:
             # Lade die neueste verfügbare Session
@@ -1986,9 +2296,50 @@ class A1Terminal:
             self.current_model = None
             if hasattr(self, 'model_dropdown'):
                 self.model_dropdown.update_models({})
+            self.update_generation_controls()
                 
             self.console_print("🔄 All sessions deleted - chat ready for new session", "info")
 
+    def delete_session_files(self, session_id):
+        """Löscht Snapshot, Journal und Kontext-Cache einer Session ohne Directory-Scan
+        
+        Returns:
+            bool: True wenn der Snapshot entfernt wurde (oder nie existierte)
+        """
+        # Laufende Antwort abbrechen, sonst würde sie die Session wieder anlegen
+        self.cancel_session_generation(session_id)
+        
+        # Keine ausstehenden Saves, die die Files danach wieder anlegen
+        self.persistence.discard(session_id)
+        self.persistence.flush()
+        
+        if self.session_db:
+            self.context_cache.delete(session_id)
+            try:
+                self.session_db.delete(session_id)
+                return True
+            except Exception as e:
+                self.console_print(f"❌ Error deleting session {session_id}: {e}", "error")
+                return False
+        
+        success = True
+        session_file = self.session_index.file_path(session_id)
+        if session_file:
+            try:
+                os.remove(session_file)
+            except FileNotFoundError:
+                self.console_print(f"⚠️ No session file found for {session_id}.", "warning")
+            except Exception as e:
+                success = False
+                self.console_print(f"❌ Error deleting session file {os.path.basename(session_file)}: {e}", "error")
+        else:
+            self.console_print(f"⚠️ No session file found for {session_id}.", "warning")
+        
+        self.context_cache.delete(session_id)
+        self.session_store.delete(session_id)
+        self.session_index.remove(session_id)
+        return success
+
     def delete_all_sessions(self):
         """Deletes all sessions after confirmation"""
         if not self.sessions:
@@ -2009,30 +2360,17 @@ class A1Terminal:
             failed_count = 0
             
             for session_id in list(self.sessions.keys()):
-                found_file = False
-                for f in os.listdir(self.sessions_dir):
-                    if f.endswith(f"_session_{session_id}.json"):
-                        found_file = True
-                        file_path = os.path.join(self.sessions_dir, f)
-                        try:
-                            os.remove(file_path)
-                            deleted_count += 1
-                        except Exception as e:
-                            failed_count += 1
-                            self.console_print(f"❌ Error deleting {f}: {e}", "error")
-                if not found_file:
-                    self.console_print(f"⚠️ No session file found for {session_id}.", "warning")
+                if self.delete_session_files(session_id):
+                    deleted_count += 1
+                else:
+                    failed_count += 1
             
             # Remove all sessions from memory
             self.sessions.clear()
             self.current_session_id = None
             
-            # Sessions-File refresh (leere File)
-            try:
-                with open("sessions.json", "w", encoding="utf-8") as f:
-                    json.dump({}, f, indent=2, ensure_ascii=False)
-            except Exception as e:
-                self.console_print(f"❌ Error beim Save der leeren Session-List: {e}", "error")
+            # Session-Index refresh (leerer Index)
+            self.save_session_index()
             
             # UI zurücksetzen
             self.clear_chat_for_new_session()
@@ -2047,6 +2385,7 @@ class A1Terminal:
             self.current_model = None
             if hasattr(self, 'model_dropdown'):
                 self.model_dropdown.update_models({})
+            self.update_generation_controls()
             
             # Ergebnis show
             if failed_count == 0:
@@ -2064,46 +2403,15 @@ class A1Terminal:
 
     def clear_chat_for_new_session(self):
         """Leert den Chat für eine neue Session"""
-        # Lösche alle Chat-Bubbles gründlich
-        if hasattr(self, 'chat_bubbles'):
-            for bubble in self.chat_bubbles:
-                try:
-                    # Explizit pack_forget aufrufen vor destroy
-                    bubble.pack_forget()
-                    bubble.destroy()
-                except Exception as e:
-                    pass
-            self.chat_bubbles.clear()
+        # Alle Messages aus dem Transcript entfernen (Bubble-Widgets werden recycelt)
+        # und nach oben scrollen (für leere Chats)
+        if hasattr(self, 'chat_display_frame'):
+            self.chat_display_frame.clear()
         
         # Chat-History leeren
         self.chat_history.clear()
         self.message_history.clear()
         self.history_index = -1
-        
-        # Layout MEHRFACH und gründlich refresh nach dem Delete
-        if hasattr(self, 'chat_display_frame'):
-            # Sofortiges Update
-            self.chat_display_frame.update()
-            self.chat_display_frame.update_idletasks()
-            
-            if hasattr(self.chat_display_frame, '_parent_canvas'):
-                # Canvas Update
-                self.chat_display_frame._parent_canvas.update()
-                self.chat_display_frame._parent_canvas.update_idletasks()
-                
-                # Scrollregion zurücksetzen
-                try:
-                    self.chat_display_frame._parent_canvas.configure(
-                        scrollregion=self.chat_display_frame._parent_canvas.bbox("all")
-                    )
-                except:
-                    pass
-                
-                # Nach oben scrollen (für leere Chats)
-                try:
-                    self.chat_display_frame._parent_canvas.yview_moveto(0.0)
-                except:
-                    pass
 
     def restore_chat_message(self, msg_data):
         """Stellt eine Chat-Message aus Session-Daten wieder her"""
@@ -2115,19 +2423,8 @@ class A1Terminal:
         if sender == "System" and not self.config.get("show_system_messages", True):
             return  # Keine UI-Bubble create für ausgeblendete System-Messages
         
-        # Chat-Bubble create
-        bubble = ChatBubble(
-            self.chat_display_frame,
-            sender=sender,
-            message=message,
-            timestamp=timestamp,
-            app_config=self.config
-        )
-        
-        self.chat_bubbles.append(bubble)
-        
-        # Sofortiges Layout-Update für jede Bubble
-        bubble.update_idletasks()
+        # Nur ein Transcript-Eintrag - das Widget entsteht erst, wenn die Message sichtbar is being
+        self.chat_display_frame.append(sender, message, timestamp, msg_data.get("metrics"))
 
     # ============================================
     # ENDE SESSION MANAGEMENT SYSTEM  
@@ -2187,17 +2484,18 @@ class A1Terminal:
         self.chat_frame = ctk.CTkFrame(self.chat_tab)
         self.chat_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
-        # Chat history with scrollable frame and colored border for active session
-        self.chat_display_frame = ctk.CTkScrollableFrame(
+        # Chat history: virtualized transcript with colored border for active session
+        self.chat_display_frame = VirtualTranscript(
             self.chat_frame,
+            app_config=self.config,
             label_text="Chat History",
             border_width=3,
             border_color="#4A4A4A"  # Standard gray, updated on session change
         )
         self.chat_display_frame.pack(fill="both", expand=True, padx=10, pady=(10, 5))
         
-        # List für Chat-Bubbles
-        self.chat_bubbles = []
+        # List der Chat-Messages (TranscriptEntry, gehört dem Transcript)
+        self.chat_bubbles = self.chat_display_frame.entries
         
         # Input-Area
         self.input_frame = ctk.CTkFrame(self.chat_frame)
@@ -2243,6 +2541,18 @@ class A1Terminal:
         self.stop_btn.pack(side="right", padx=(0, self.config.get("ui_padding_main", 10)), 
                           pady=self.config.get("ui_padding_main", 10))
         
+        # Vergleichsmodus: gleichen Prompt an mehrere Modelle schicken
+        self.compare_btn = ctk.CTkButton(
+            self.input_frame,
+            text="⚖️",
+            command=self.open_compare_mode,
+            width=self.config.get("ui_model_button_size", 60),
+            height=self.config.get("ui_button_height", 40),
+            font=("Arial", self.config.get("ui_input_font_size", 12))
+        )
+        self.compare_btn.pack(side="right", padx=(0, self.config.get("ui_padding_main", 10)),
+                              pady=self.config.get("ui_padding_main", 10))
+        
         # Keine automatische Session-Erstellung beim Start mehr
     
     def setup_config_tab(self):
@@ -2721,10 +3031,9 @@ class A1Terminal:
     def update_all_chat_bubbles(self):
         """Aktualisiert das Styling aller bestehenden Chat-Bubbles"""
         try:
-            updated_count = 0
-            for bubble in self.chat_bubbles:
-                bubble.update_style(self.config)
-                updated_count += 1
+            # Sichtbare Bubbles sofort, alle anderen beim nächsten Materialisieren
+            self.chat_display_frame.update_style(self.config)
+            updated_count = len(self.chat_bubbles)
             
             if updated_count > 0:
                 self.console_print(f"🎨 {updated_count} Chat-Bubbles mit neuer Configuration aktualisiert", "info")
@@ -2782,51 +3091,97 @@ class A1Terminal:
     def check_ollama_status(self):
         """Prüft Ollama-Status und lädt Modelle"""
         def check():
+            # Worker-Thread: Tk und Session-Daten nur über call_soon anfassen
             if self.ollama.is_ollama_running():
-                self.status_label.configure(text="Ollama Status: ✅ Connected")
+                self.runtime.call_soon(lambda: self.status_label.configure(text="Ollama Status: ✅ Connected"))
+                # Lädt installierte Modelle und die Download-List (aus dem Katalog-Cache)
                 self.refresh_models()
-                self.load_available_models()
             else:
-                self.status_label.configure(text="Ollama Status: ❌ Not Connected")
-                self.add_to_chat("System", "Ollama ist nicht erreichbar. Stellen You sicher, dass Ollama running.")
+                self.runtime.call_soon(lambda: self.status_label.configure(text="Ollama Status: ❌ Not Connected"))
+                self.runtime.call_soon(
+                    self.add_to_chat, "System",
+                    "Ollama ist nicht erreichbar. Stellen You sicher, dass Ollama running."
+                )
         
-        threading.Thread(target=check, daemon=True).start()
+        self.runtime.submit("metadata", check, name="ollama-status", key="ollama-status")
+        
+        # Registry-Katalog im Hintergrund aktuell halten (blockiert den Start nie)
+        self.schedule_catalog_revalidation()
     
-    def load_available_models(self):
-        """Lädt alle verfügbaren Ollama-Modelle"""
-        def load():
-            self.add_to_chat("System", "🔄 Lade aktuelle Model-List von Ollama...")
-            all_models = self.ollama.get_all_ollama_models()
-            
-            if all_models:
-                # Konvertiere zu Model-Info-Dict mit Größen-Informationen
-                models_dict = {}
-                for model_name in all_models:
-                    # Extrahiere Größen-Info aus dem Namen (z.B. llama3:8b)
-                    size_info = ""
-                    if ":" in model_name:
-                        param_size = model_name.split(":")[-1]
-                        if "b" in param_size.lower():
-                            size_info = param_size.upper()
-                    
-                    models_dict[model_name] = {
-                        "size": f"~{size_info.replace('B', ' Mrd Parameter')}" if size_info else "Available",
-                        "type": "LLM",
-                        "parameters": size_info
-                    }
-                
-                self.root.after(0, lambda: self.available_dropdown.update_models(models_dict))
-                model_count = len(models_dict)
-                self.root.after(0, lambda: self.add_to_chat("System", 
-                    f"✅ {model_count} Modelle zum Download available"))
-            else:
-                self.root.after(0, lambda: self.available_dropdown.update_models({}))
-                self.root.after(0, lambda: self.add_to_chat("System", "❌ Keine Modelle available"))
+    def schedule_catalog_revalidation(self):
+        """Plant die nächste Katalog-Prüfung per root.after (Cache-Alter bzw. Backoff, Main-Thread)"""
+        if self.catalog_timer is not None:
+            self.root.after_cancel(self.catalog_timer)
+            self.catalog_timer = None
+        delay = self.ollama.catalog_check_delay()
+        if delay is None:
+            # Offline-Modus: nie gegen die Registry prüfen
+            return
+        self.catalog_timer = self.root.after(int(max(1.0, delay) * 1000), self.revalidate_catalog)
+    
+    def revalidate_catalog(self, force=False):
+        """Prüft den Registry-Katalog in der Metadata-Lane und plant danach die nächste Prüfung
+        
+        Args:
+            force (bool): auch einen noch frischen Cache prüfen (Refresh-Button)
+        """
+        if self.catalog_timer is not None:
+            self.root.after_cancel(self.catalog_timer)
+            self.catalog_timer = None
         
-        threading.Thread(target=load, daemon=True).start()
+        def revalidate():
+            try:
+                if self.ollama.revalidate_catalog(force=force):
+                    models = self.ollama.get_all_ollama_models()
+                    self.runtime.call_soon(lambda: self.show_download_models(models, announce=True))
+            finally:
+                self.runtime.call_soon(self.schedule_catalog_revalidation)
+        
+        task = self.runtime.submit("metadata", revalidate, name="catalog-revalidate",
+                                   key=("catalog-revalidate", force))
+        # Aus der vollen Lane verdrängt: trotzdem weiter planen
+        task.token.on_cancel(lambda: self.runtime.call_soon(self.schedule_catalog_revalidation))
+    
+    def build_download_models_dict(self, all_models):
+        """Konvertiert die Download-List zu einem Model-Info-Dict mit Größen-Informationen"""
+        models_dict = {}
+        for model_name in all_models:
+            # Extrahiere Größen-Info aus dem Namen (z.B. llama3:8b)
+            size_info = ""
+            if ":" in model_name:
+                param_size = model_name.split(":")[-1]
+                if "b" in param_size.lower():
+                    size_info = param_size.upper()
+            
+            models_dict[model_name] = {
+                "size": f"~{size_info.replace('B', ' Mrd Parameter')}" if size_info else "Available",
+                "type": "LLM",
+                "parameters": size_info
+            }
+        return models_dict
+    
+    def show_download_models(self, all_models, announce=False):
+        """Setzt die Download-List (Main-Thread)"""
+        models_dict = self.build_download_models_dict(all_models or [])
+        self.available_dropdown.update_models(models_dict)
+        if not announce:
+            return
+        if models_dict:
+            self.add_to_chat("System", f"✅ {len(models_dict)} Modelle zum Download available")
+        else:
+            self.add_to_chat("System", "❌ Keine Modelle available")
     
-    def refresh_models(self):
-        """Aktualisiert die Model-Listen"""
+    def load_available_models(self):
+        """Lädt alle verfügbaren Ollama-Modelle (sofort aus dem Katalog-Cache, kein Netzwerk)"""
+        all_models = self.ollama.get_all_ollama_models()
+        self.runtime.call_soon(lambda: self.show_download_models(all_models))
+    
+    def refresh_models(self, revalidate_catalog=False):
+        """Aktualisiert die Model-Listen
+        
+        Args:
+            revalidate_catalog (bool): zusätzlich den Registry-Katalog sofort neu prüfen
+        """
         def update():
             # Installed Models refresh
             models = self.ollama.get_available_models()
@@ -2841,40 +3196,31 @@ class A1Terminal:
                         "parameters": ""
                     }
                 
-                self.root.after(0, lambda: self.model_dropdown.update_models(models_dict))
+                self.runtime.call_soon(lambda: self.model_dropdown.update_models(models_dict))
                 if not self.current_model or self.current_model not in models:
-                    self.root.after(0, lambda: self.model_dropdown.set_selected(models[0]))
+                    self.runtime.call_soon(lambda: self.model_dropdown.set_selected(models[0]))
                     self.current_model = models[0]
-                    # Update model info panel for initial model
-                    self.root.after(100, lambda: self.update_model_info_panel(models[0]))
+                    # Update model info panel for initial model (nach dem Dropdown-Update, gleiche Queue)
+                    self.runtime.call_soon(lambda: self.update_model_info_panel(models[0]))
                 else:
                     # Update model info panel for current model
-                    self.root.after(100, lambda: self.update_model_info_panel(self.current_model))
+                    self.runtime.call_soon(lambda: self.update_model_info_panel(self.current_model))
             else:
-                self.root.after(0, lambda: self.model_dropdown.update_models({}))
+                self.runtime.call_soon(lambda: self.model_dropdown.update_models({}))
                 self.current_model = None
             
-            # Verfügbare Modelle refresh
-            all_models = self.ollama.get_all_ollama_models()
-            if all_models:
-                # Konvertiere zu Model-Info-Dict
-                download_models_dict = {}
-                for model_name in all_models:
-                    size_info = ""
-                    if ":" in model_name:
-                        param_size = model_name.split(":")[-1]
-                        if "b" in param_size.lower():
-                            size_info = param_size.upper()
-                    
-                    download_models_dict[model_name] = {
-                        "size": f"~{size_info.replace('B', ' Mrd Parameter')}" if size_info else "Available",
-                        "type": "LLM",
-                        "parameters": size_info
-                    }
-                
-                self.root.after(0, lambda: self.available_dropdown.update_models(download_models_dict))
+            # Verfügbare Modelle refresh (Cache; neue Registry-Daten kommen über on_change)
+            self.load_available_models()
+            if revalidate_catalog:
+                self.runtime.call_soon(self.revalidate_catalog, True)
+            
+            # Details aller installierten Modelle vorladen - Model-Wechsel zeigen sie dann ohne Request
+            if models:
+                self.ollama.prewarm_model_details(models)
         
-        threading.Thread(target=update, daemon=True).start()
+        # Mehrere Refreshes kurz hintereinander laufen als ein Task
+        self.runtime.submit("metadata", update, name="refresh-models",
+                            key=("refresh-models", revalidate_catalog))
     
     def on_model_select_new(self, choice):
         """Behandelt Model-Auswahl (neue Methode für ModelInfoDropdown)"""
@@ -2882,7 +3228,14 @@ class A1Terminal:
         self.update_model_info_panel(choice)
     
     def update_model_info_panel(self, model_name):
-        """Aktualisiert das Model-Info-Panel mit Details zum ausgewählten Model"""
+        """Aktualisiert das Model-Info-Panel mit Details zum ausgewählten Model
+        
+        Installierte Modelle kommen aus dem Details-Cache des OllamaManagers (ohne
+        Request). Nur die zuletzt angeforderte Anzeige setzt das Panel - späte
+        Antworten für ein vorher gewähltes Model werden verworfen.
+        """
+        self._model_info_request += 1
+        request_id = self._model_info_request
         if not model_name:
             self.model_info_text.configure(state="normal")
             self.model_info_text.delete("1.0", "end")
@@ -2890,160 +3243,167 @@ class A1Terminal:
             self.model_info_text.configure(state="disabled")
             return
         
-        # Model-Informationen zusammenstellen
+        cached = self.ollama.cached_model_details(model_name)
+        if cached is not None:
+            self._update_info_text(self.build_model_info_text(model_name, cached))
+            return
+        
+        # Model-Informationen im Hintergrund laden
         def fetch_info():
             try:
-                info_text = f"📦 Model: {model_name}\n\n"
-                api_success = False
-                
-                # Versuche Infos über Ollama API zu bekommen
                 try:
-                    import ollama
-                    result = ollama.show(model_name)
-                    
-                    if result and isinstance(result, dict):
-                        api_success = True
-                        
-                        # Parameter Count aus details
-                        if 'details' in result:
-                            details = result['details']
-                            
-                            if 'parameter_size' in details:
-                                param_size = details['parameter_size']
-                                info_text += f"🔢 Parameters: {param_size}\n"
-                            
-                            if 'quantization_level' in details:
-                                quant = details['quantization_level']
-                                info_text += f"⚙️ Quantization: {quant}\n"
-                            
-                            if 'family' in details:
-                                family = details['family']
-                                info_text += f"👪 Family: {family.title()}\n"
-                            
-                            if 'format' in details:
-                                format_info = details['format']
-                                info_text += f"📄 Format: {format_info.upper()}\n"
-                            
-                            if 'families' in details:
-                                families = details['families']
-                                if families:
-                                    info_text += f"🏷️ Tags: {', '.join(families[:3])}\n"
-                        
-                        # Size info
-                        if 'size' in result:
-                            size_mb = result['size'] / (1024 * 1024)
-                            if size_mb >= 1024:
-                                size_gb = size_mb / 1024
-                                info_text += f"💾 Size: {size_gb:.2f} GB\n"
-                            else:
-                                info_text += f"💾 Size: {size_mb:.0f} MB\n"
-                        
-                        info_text += "\n"
-                        
-                        # Template info
-                        if 'template' in result and result['template']:
-                            info_text += "📝 Template: ✅ Configured\n"
-                        
-                        # Modified date
-                        if 'modified_at' in result:
-                            modified = result['modified_at'].split('T')[0] if 'T' in result['modified_at'] else result['modified_at']
-                            info_text += f"🗓️ Last Modified:\n   {modified}\n\n"
-                        
-                        # Empfohlen für (basierend auf Familie und Tags)
-                        recommendations = []
-                        model_lower = model_name.lower()
-                        
-                        if 'code' in model_lower or 'coder' in model_lower:
-                            recommendations.append("💻 Code Generation")
-                            recommendations.append("🔧 Programming")
-                        elif 'llava' in model_lower or 'vision' in model_lower:
-                            recommendations.append("👁️ Image Analysis")
-                            recommendations.append("🖼️ Vision Tasks")
-                        elif 'math' in model_lower or 'wizard' in model_lower:
-                            recommendations.append("🧮 Mathematics")
-                            recommendations.append("📐 Calculations")
-                        elif 'sql' in model_lower:
-                            recommendations.append("🗄️ SQL Queries")
-                            recommendations.append("📊 Database")
-                        elif 'med' in model_lower or 'bio' in model_lower:
-                            recommendations.append("🏥 Medicine")
-                            recommendations.append("🧬 Biology")
-                        else:
-                            # Standard Chat-Modelle
-                            if 'b' in model_lower:
-                                param_num = ''.join(filter(str.isdigit, model_lower.split('b')[0].split(':')[-1]))
-                                if param_num:
-                                    param_val = int(param_num)
-                                    if param_val <= 3:
-                                        recommendations.append("💬 Quick Responses")
-                                        recommendations.append("📱 Mobile Devices")
-                                    elif param_val <= 8:
-                                        recommendations.append("💬 Chat & Dialogue")
-                                        recommendations.append("✍️ Text Creation")
-                                    else:
-                                        recommendations.append("🎯 Complex Tasks")
-                                        recommendations.append("📚 Analysis & Research")
-                        
-                        if recommendations:
-                            info_text += "✨ Recommended for:\n"
-                            for rec in recommendations[:3]:  # Max 3 Empfehlungen
-                                info_text += f"   {rec}\n"
-                    
+                    result = self.ollama.get_model_details(model_name)
                 except Exception as e:
                     print(f"Ollama API Error: {e}")
-                    api_success = False
+                    result = None
+                info_text = self.build_model_info_text(model_name, result)
+            except Exception as e:
+                info_text = f"📦 Model: {model_name}\n\n❌ Error beim Load der Details:\n{str(e)}"
+            
+            # Update UI in main thread (nur wenn noch aktuell)
+            self.runtime.call_soon(lambda: self._apply_model_info(request_id, info_text))
+        
+        self.runtime.submit("metadata", fetch_info, name="model-info")
+    
+    def _apply_model_info(self, request_id, text):
+        """Setzt den Info-Text, sofern seitdem kein anderes Model angefordert wurde"""
+        if request_id == self._model_info_request:
+            self._update_info_text(text)
+    
+    def build_model_info_text(self, model_name, result):
+        """Info-Text fürs Model-Info-Panel (result: Details von /api/show, None = nur aus dem Namen)"""
+        info_text = f"📦 Model: {model_name}\n\n"
+        api_success = bool(result) and isinstance(result, dict)
+        
+        if api_success:
+            # Parameter Count aus details
+            if 'details' in result:
+                details = result['details']
                 
-                # Fallback wenn ollama.show nicht funktioniert
-                if not api_success:
-                    info_text += "ℹ️ Type: LLM\n"
-                    
-                    # Parse Parameter aus Modellname
-                    if ':' in model_name:
-                        param_info = model_name.split(':')[-1]
-                        if 'b' in param_info.lower():
-                            param_clean = param_info.upper().replace('B', ' Billion')
-                            info_text += f"🔢 Parameters: ~{param_clean}\n"
-                    
-                    # Model-Familie aus Namen ableiten
-                    model_base = model_name.split(':')[0].lower()
-                    if 'llama' in model_base:
-                        info_text += "👪 Family: Llama\n"
-                    elif 'mistral' in model_base:
-                        info_text += "👪 Family: Mistral\n"
-                    elif 'gemma' in model_base:
-                        info_text += "👪 Family: Gemma\n"
-                    elif 'phi' in model_base:
-                        info_text += "👪 Family: Phi\n"
-                    elif 'codellama' in model_base or 'code' in model_base:
-                        info_text += "👪 Family: CodeLlama\n"
-                    
-                    info_text += "\n"
-                    
-                    # Empfehlungen auch im Fallback
-                    recommendations = []
-                    if 'code' in model_base:
-                        recommendations = ["💻 Code Generation", "🔧 Programming"]
-                    elif 'llava' in model_base:
-                        recommendations = ["👁️ Image Analysis", "🖼️ Vision Tasks"]
-                    elif 'math' in model_base:
-                        recommendations = ["🧮 Mathematics", "📐 Calculations"]
-                    else:
-                        recommendations = ["💬 Chat & Dialogue", "✍️ Text Creation"]
-                    
-                    if recommendations:
-                        info_text += "✨ Recommended for:\n"
-                        for rec in recommendations[:3]:
-                            info_text += f"   {rec}\n"
+                if 'parameter_size' in details:
+                    param_size = details['parameter_size']
+                    info_text += f"🔢 Parameters: {param_size}\n"
                 
-                # Update UI in main thread
-                self.root.after(0, lambda: self._update_info_text(info_text))
+                if 'quantization_level' in details:
+                    quant = details['quantization_level']
+                    info_text += f"⚙️ Quantization: {quant}\n"
                 
-            except Exception as e:
-                error_text = f"📦 Model: {model_name}\n\n❌ Error beim Load der Details:\n{str(e)}"
-                self.root.after(0, lambda: self._update_info_text(error_text))
+                if 'family' in details:
+                    family = details['family']
+                    info_text += f"👪 Family: {family.title()}\n"
+                
+                if 'format' in details:
+                    format_info = details['format']
+                    info_text += f"📄 Format: {format_info.upper()}\n"
+                
+                if 'families' in details:
+                    families = details['families']
+                    if families:
+                        info_text += f"🏷️ Tags: {', '.join(families[:3])}\n"
+            
+            # Size info
+            if 'size' in result:
+                size_mb = result['size'] / (1024 * 1024)
+                if size_mb >= 1024:
+                    size_gb = size_mb / 1024
+                    info_text += f"💾 Size: {size_gb:.2f} GB\n"
+                else:
+                    info_text += f"💾 Size: {size_mb:.0f} MB\n"
+            
+            info_text += "\n"
+            
+            # Template info
+            if 'template' in result and result['template']:
+                info_text += "📝 Template: ✅ Configured\n"
+            
+            # Modified date
+            if 'modified_at' in result:
+                modified = result['modified_at'].split('T')[0] if 'T' in result['modified_at'] else result['modified_at']
+                info_text += f"🗓️ Last Modified:\n   {modified}\n\n"
+            
+            # Empfohlen für (basierend auf Familie und Tags)
+            recommendations = []
+            model_lower = model_name.lower()
+            
+            if 'code' in model_lower or 'coder' in model_lower:
+                recommendations.append("💻 Code Generation")
+                recommendations.append("🔧 Programming")
+            elif 'llava' in model_lower or 'vision' in model_lower:
+                recommendations.append("👁️ Image Analysis")
+                recommendations.append("🖼️ Vision Tasks")
+            elif 'math' in model_lower or 'wizard' in model_lower:
+                recommendations.append("🧮 Mathematics")
+                recommendations.append("📐 Calculations")
+            elif 'sql' in model_lower:
+                recommendations.append("🗄️ SQL Queries")
+                recommendations.append("📊 Database")
+            elif 'med' in model_lower or 'bio' in model_lower:
+                recommendations.append("🏥 Medicine")
+                recommendations.append("🧬 Biology")
+            else:
+                # Standard Chat-Modelle
+                if 'b' in model_lower:
+                    param_num = ''.join(filter(str.isdigit, model_lower.split('b')[0].split(':')[-1]))
+                    if param_num:
+                        param_val = int(param_num)
+                        if param_val <= 3:
+                            recommendations.append("💬 Quick Responses")
+                            recommendations.append("📱 Mobile Devices")
+                        elif param_val <= 8:
+                            recommendations.append("💬 Chat & Dialogue")
+                            recommendations.append("✍️ Text Creation")
+                        else:
+                            recommendations.append("🎯 Complex Tasks")
+                            recommendations.append("📚 Analysis & Research")
+            
+            if recommendations:
+                info_text += "✨ Recommended for:\n"
+                for rec in recommendations[:3]:  # Max 3 Empfehlungen
+                    info_text += f"   {rec}\n"
+        
+        # Fallback ohne Details von Ollama (nicht installiert / nicht erreichbar)
+        if not api_success:
+            info_text += "ℹ️ Type: LLM\n"
+            
+            # Parse Parameter aus Modellname
+            if ':' in model_name:
+                param_info = model_name.split(':')[-1]
+                if 'b' in param_info.lower():
+                    param_clean = param_info.upper().replace('B', ' Billion')
+                    info_text += f"🔢 Parameters: ~{param_clean}\n"
+            
+            # Model-Familie aus Namen ableiten
+            model_base = model_name.split(':')[0].lower()
+            if 'llama' in model_base:
+                info_text += "👪 Family: Llama\n"
+            elif 'mistral' in model_base:
+                info_text += "👪 Family: Mistral\n"
+            elif 'gemma' in model_base:
+                info_text += "👪 Family: Gemma\n"
+            elif 'phi' in model_base:
+                info_text += "👪 Family: Phi\n"
+            elif 'codellama' in model_base or 'code' in model_base:
+                info_text += "👪 Family: CodeLlama\n"
+            
+            info_text += "\n"
+            
+            # Empfehlungen auch im Fallback
+            recommendations = []
+            if 'code' in model_base:
+                recommendations = ["💻 Code Generation", "🔧 Programming"]
+            elif 'llava' in model_base:
+                recommendations = ["👁️ Image Analysis", "🖼️ Vision Tasks"]
+            elif 'math' in model_base:
+                recommendations = ["🧮 Mathematics", "📐 Calculations"]
+            else:
+                recommendations = ["💬 Chat & Dialogue", "✍️ Text Creation"]
+            
+            if recommendations:
+                info_text += "✨ Recommended for:\n"
+                for rec in recommendations[:3]:
+                    info_text += f"   {rec}\n"
         
-        # Lade Infos in separatem Thread
-        threading.Thread(target=fetch_info, daemon=True).start()
+        return info_text
     
     def _update_info_text(self, text):
         """Hilfsmethode zum Refresh des Info-Textfelds (muss im Main-Thread laufen)"""
@@ -3059,6 +3419,10 @@ class A1Terminal:
             model_changed = (self.current_model != choice)
             
             self.current_model = choice
+            self.update_model_stats_label()
+            if model_changed:
+                self.cancel_prefill()
+                self.preload_model(choice)
             
             # WICHTIG: Nicht save während eine Session loaded is being
             if getattr(self, '_session_just_loaded', False):
@@ -3067,8 +3431,7 @@ class A1Terminal:
             
             # Set flag if model changed in existing session with messages
             if model_changed and hasattr(self, 'chat_bubbles') and len(self.chat_bubbles) > 0:
-                self._model_just_changed = True
-                self.console_print(f"🔄 Model changed - full history will be sent with next message", "info")
+                self.console_print(f"🔄 Model changed - history continues within the context window", "info")
             
             # Reset chat history only for new/empty sessions
             # Keep history for existing sessions with messages
@@ -3159,7 +3522,7 @@ class A1Terminal:
                 if current_time - last_update >= 0.2:
                     if 'total' in status and 'completed' in status:
                         progress = status['completed'] / status['total']
-                        self.root.after(0, lambda p=progress: self.progress_bar.set(p))
+                        self.runtime.call_soon(lambda p=progress: self.progress_bar.set(p))
                         
                         # Detaillierte Fortschrittsinformationen
                         completed_mb = status['completed'] / (1024 * 1024)
@@ -3177,10 +3540,10 @@ class A1Terminal:
                             eta_text = ""
                         
                         status_text = f"{percent:.1f}% ({completed_mb:.1f}/{total_mb:.1f}MB) | {speed_mb:.1f}MB/s{eta_text}"
-                        self.root.after(0, lambda s=status_text: self.progress_label.configure(text=status_text))
+                        self.runtime.call_soon(lambda s=status_text: self.progress_label.configure(text=status_text))
                     else:
                         status_text = status.get('status', 'Downloading...')
-                        self.root.after(0, lambda s=status_text: self.progress_label.configure(text=f"Status: {status_text}"))
+                        self.runtime.call_soon(lambda s=status_text: self.progress_label.configure(text=f"Status: {status_text}"))
                     
                     last_update = current_time
             
@@ -3202,11 +3565,10 @@ class A1Terminal:
                 # UI zurücksetzen
                 self.reset_download_ui()
             
-            self.root.after(0, finish)
+            self.runtime.call_soon(finish)
         
-        # Download-Thread start und save
-        self.current_download_thread = threading.Thread(target=download, daemon=True)
-        self.current_download_thread.start()
+        # Download-Task start und save
+        self.current_download_task = self.runtime.submit("downloads", download, name=f"download {model_name}")
     
     def delete_selected_model(self):
         """Löscht das ausgewählte Model"""
@@ -3230,14 +3592,12 @@ class A1Terminal:
                     else:
                         self.add_to_chat("System", f"❌ Error beim Delete von {self.current_model}")
                 
-                self.root.after(0, finish)
+                self.runtime.call_soon(finish)
             
-            threading.Thread(target=delete, daemon=True).start()
+            self.runtime.submit("metadata", delete, name="delete-model")
     
     def send_message(self, event=None):
-        """Sendet eine Message mit Stop-Funktionalität und Anti-Redundanz"""
-        import time
-        
+        """Sendet die Message aus dem Eingabefeld an das Model der aktuellen Session"""
         message = self.message_entry.get().strip()
         if not message:
             return
@@ -3246,27 +3606,45 @@ class A1Terminal:
             messagebox.showwarning("Warning", "No model selected!")
             return
         
-        # Reset Stop-Flag
-        self.generation_stopped = False
+        if self.current_session_id in self.generations:
+            # Diese Session wartet noch auf ihre Antwort (andere Sessions dürfen parallel)
+            return
+        
+        self.message_entry.delete(0, 'end')
+        self.submit_message(message)
+    
+    def send_message_programmatic(self, message):
+        """Sendet eine Message programmatisch (z.B. aus Textbox statt Entry)"""
+        if not message or not message.strip():
+            return
         
+        if not self.current_model:
+            messagebox.showwarning("Warning", "No model selected!")
+            return
+        
+        if self.current_session_id in self.generations:
+            return
+        
+        self.submit_message(message.strip())
+    
+    def submit_message(self, message):
+        """Zeigt die Message an und startet die Antwort in der aktuellen Session"""
         # Message zur Historie hinzufügen (nur wenn nicht leer)
         if message and message not in self.message_history:
             self.message_history.append(message)
         # Reset Historie-Index
         self.history_index = -1
         
-
         # Prüfe, ob die Session vorher leer war (keine Messages)
         session_empty = False
         if self.current_session_id and self.current_session_id in self.sessions:
             session_data = self.sessions[self.current_session_id]
             if not session_data.get("messages"):
                 session_empty = True
-
-        # Message show
+        
+        # Message show (legt bei Bedarf eine Session an)
         self.add_to_chat("You", message)
-        self.message_entry.delete(0, 'end')
-
+        
         # Wenn Session vorher leer war: Session-List, Anzeige und Chat-Konsole sofort refresh
         if session_empty:
             self.update_session_list()
@@ -3276,199 +3654,498 @@ class A1Terminal:
                 if hasattr(self, 'chat_display_frame') and hasattr(self.chat_display_frame, '_parent_canvas'):
                     self.chat_display_frame._parent_canvas.yview_moveto(1.0)
         
-        # UI während Generation anpassen
-        self.stop_btn.configure(state="normal")
-        self.send_btn.configure(state="disabled", text="⏳ Generiert...")
+        self.start_generation(message)
+    
+    def start_generation(self, message):
+        """Startet die Antwort auf message in der angezeigten Session (Main-Thread)
         
-        # Eingabefeld visuell anpassen (leicht transparent)
-        if hasattr(self, 'message_entry'):
-            self.message_entry.configure(state="disabled")
+        Model, BIAS und History werden jetzt festgehalten - die Antwort landet in
+        dieser Session, auch wenn der User inzwischen eine andere öffnet.
+        """
+        session_id = self.current_session_id
+        if session_id is None or session_id in self.generations:
+            return None
+        # Prefill abbrechen, bevor die Antwort einen Slot anfordert - er soll die echte
+        # Anfrage nicht aufhalten (schon ausgewertete Prompt-Teile bleiben in Ollamas Cache)
+        self.cancel_prefill()
+        
+        generation = SessionGeneration(
+            session_id,
+            self.current_model,
+            message,
+            (self.current_session_bias or "").strip(),
+            list(self.chat_history),
+            CancelToken()
+        )
+        generation.renderer = StreamRenderer(
+            self.root,
+            lambda text: self.update_progressive_response(generation, text),
+            max_fps=self.config.get("stream_render_fps", 30),
+            dispatch=self.runtime.call_soon
+        )
+        try:
+            generation.task = self.runtime.submit(
+                "generation", self.run_generation, generation,
+                name=f"chat {session_id}", token=generation.token
+            )
+        except LaneFullError as e:
+            self.add_to_chat("System", f"❌ {e}")
+            return None
+        
+        self.generations[session_id] = generation
+        self.residency.touch(generation.model)
+        self.add_thinking_indicator(generation)
+        self.update_generation_controls()
+        self.update_session_list()
+        return generation
+    
+    def run_generation(self, generation):
+        """Task: holt die Antwort für eine Session (Generation-Lane, Worker-Thread)
         
-        # Antwort abrufen
-        def get_response():
-            try:
-                # Denkprozess-Indikator hinzufügen
-                self.root.after(0, self.add_thinking_indicator)
-                
-                # Session-BIAS berücksichtigen
-                session_bias = ""
-                if hasattr(self, 'current_session_bias') and self.current_session_bias:
-                    session_bias = self.current_session_bias.strip()
-                    print(f"🎯 BIAS active: {session_bias[:50]}...")
-                    self.root.after(0, lambda: self.console_print(f"🎯 BIAS sent: {session_bias[:30]}...", "info"))
-                else:
-                    print("🎯 No BIAS set")
-                
-                # Nur bei Session-Load oder Model-Wechsel: volle History, sonst nur BIAS und aktuelle User-Input
-                if getattr(self, '_session_just_loaded', False):
-                    print("[INFO] Complete session history is being sent to the model (session was just loaded).")
-                    modified_history = self.chat_history.copy()
-                    if session_bias:
-                        modified_history.insert(0, {"role": "system", "content": session_bias})
-                    self._session_just_loaded = False
-                elif getattr(self, '_model_just_changed', False):
-                    print("[INFO] Complete session history is being sent to the model (model was just changed).")
-                    modified_history = self.chat_history.copy()
-                    if session_bias:
-                        modified_history.insert(0, {"role": "system", "content": session_bias})
-                    self._model_just_changed = False
+        Arbeitet nur mit dem beim Start festgehaltenen Zustand; alles, was die UI
+        oder Session-Daten anfasst, läuft über call_soon im Main-Thread.
+        """
+        token = generation.token
+        error = None
+        response_stream = None
+        try:
+            if token.cancelled:
+                # Vor dem Start gestoppt (oder Session deleted)
+                return
+            
+            # Session-BIAS berücksichtigen
+            session_bias = generation.bias
+            if session_bias:
+                print(f"🎯 BIAS active: {session_bias[:50]}...")
+                self.runtime.call_soon(self.console_print, f"🎯 BIAS sent: {session_bias[:30]}...", "info")
+            else:
+                print("🎯 No BIAS set")
+            
+            # BIAS + neueste History + aktuelle Message passend zum Kontextfenster
+            window, window_report = build_history_window(
+                generation.history,
+                generation.message,
+                bias=session_bias,
+                num_ctx=self.config.get("context_num_ctx", 4096),
+                reserve_tokens=self.config.get("context_reserve_tokens", 512)
+            )
+            options = {"num_ctx": self.config.get("context_num_ctx", 4096)}
+            print(f"[INFO] Context window: {len(window) - 1} messages, "
+                  f"≈{window_report['used_tokens']}/{window_report['budget']} tokens")
+            self.runtime.call_soon(self.notify_history_window, window_report, generation.session_id)
+            
+            # Position/Wartezeit in der Generierungs-Warteschlange anzeigen
+            def on_wait(position, waited):
+                self.runtime.call_soon(self.update_generation_queue, generation, position, waited)
+            
+            session_id = generation.session_id
+            use_context = bool(self.config.get("ollama_context_cache", False))
+            if use_context:
+                # Auf dem gespeicherten Ollama-Kontext aufsetzen statt die Historie new auszuwerten
+                context = self.context_cache.get(
+                    session_id, generation.model, session_bias, len(generation.history)
+                )
+                budget = options["num_ctx"] - self.config.get("context_reserve_tokens", 512)
+                if context and len(context) + estimate_tokens(generation.message) > budget:
+                    # Ollama würde den Kontext stillschweigend abschneiden (samt BIAS) -
+                    # stattdessen mit dem gekürzten History-Fenster neu beginnen
+                    print(f"[INFO] Cached context ({len(context)} tokens) exceeds the window "
+                          f"({budget} tokens) - falling back to the history window.")
+                    self.context_cache.delete(session_id)
+                    context = None
+                if context:
+                    print(f"[INFO] Resuming from cached context ({len(context)} tokens).")
+                    prompt = generation.message
                 else:
-                    # Nur BIAS (falls gesetzt) und aktuelle User-Input
-                    modified_history = []
-                    if session_bias:
-                        modified_history.append({"role": "system", "content": session_bias})
-                # Letzte Model-Input für Debug-Zwecke save
-                try:
-                    history_copy = copy.deepcopy(modified_history)
-                except Exception:
-                    history_copy = modified_history.copy()
-
+                    print("[INFO] No cached context - history is evaluated once.")
+                    history = [entry for entry in window[:-1] if entry["role"] != "system"]
+                    prompt = history_as_prompt(history, window[-1]["content"])
+                response_stream = self.ollama.generate_with_context(
+                    generation.model,
+                    prompt,
+                    # BIAS steckt schon im Kontext - nur beim Neuaufbau mitschicken
+                    system=None if context else (session_bias or None),
+                    context=context,
+                    options=options,
+                    on_wait=on_wait
+                )
+            else:
                 response_stream = self.ollama.chat_with_model(
-                    self.current_model, 
-                    message, 
-                    modified_history
+                    generation.model,
+                    window[-1]["content"],
+                    window[:-1],
+                    options=options,
+                    on_wait=on_wait
                 )
-                
-                if response_stream:
-                    full_response = ""
-                    
-                    # Sammle alle Tokens
-                    for chunk in response_stream:
-                        # Stop-Check
-                        if self.generation_stopped:
-                            self.root.after(0, lambda: self.add_to_chat("System", "🛑 Generation stopped"))
-                            break
-                            
-                        if 'message' in chunk:
-                            content = chunk['message'].get('content', '')
-                            if content:
-                                full_response += content
-                    
-                    # Am Ende: Entferne "Denkt..." und zeige vollständige Antwort
-                    if full_response and not self.generation_stopped:
-                        def show_final_response():
-                            self.remove_last_message()
-                            formatted_content = self.format_ai_response(full_response)
-                            self.add_to_chat(f"🤖 {self.current_model}", formatted_content)
-                            
-                            # WICHTIG: Session SOFORT save nach AI-Antwort
-                            # Nicht waiting auf auto_save_timer (200ms), sondern direkt save
-                            if self.current_session_id and self.current_session_id in self.sessions:
-                                if self.save_current_session():
-                                    self.console_print(f"💾 Session saved", "success")
-                        
-                        self.root.after(0, show_final_response)
-                        
-                        # Chat-Historie refresh (ohne BIAS für permanente Historie)
-                        self.chat_history.append({"role": "user", "content": message})
-                        self.chat_history.append({"role": "assistant", "content": full_response})
-                    else:
-                        print(f"⚠️ Empty response: {len(full_response)} characters")
-                else:
-                    print("❌ No response stream received")
-                    
-            except Exception as e:
-                if not self.generation_stopped:
-                    self.root.after(0, lambda: self.add_to_chat("System", f"❌ Error: {str(e)}"))
-            finally:
-                # UI zurücksetzen
-                self.root.after(0, self.reset_generation_ui)
+            if not response_stream:
+                print("❌ No response stream received")
+                return
+            token.on_cancel(response_stream.cancel)
+            
+            # Tokens sofort (frame-gebündelt) in die Antwort streamen
+            for chunk in response_stream:
+                if token.cancelled:
+                    break
+                content = chunk.get('message', {}).get('content', '')
+                if content:
+                    generation.renderer.push(content)
+            
+            if use_context and not token.cancelled:
+                new_context = (response_stream.final_chunk or {}).get("context")
+                if new_context:
+                    self.context_cache.put(
+                        session_id, generation.model, session_bias,
+                        len(generation.history) + 2, new_context
+                    )
+        except Exception as e:
+            if not token.cancelled:
+                error = e
+        finally:
+            metrics = response_stream.metrics if response_stream else None
+            self.runtime.call_soon(self.finish_generation, generation, metrics, error)
+    
+    def finish_generation(self, generation, metrics=None, error=None):
+        """Schließt die Antwort einer Session ab (Main-Thread, mehrfacher Aufruf harmlos)
+        
+        Ist die Session gerade angezeigt, wird die Bubble finalisiert; sonst landet
+        die Antwort direkt in den Session-Daten auf der Platte.
+        """
+        if generation.finished:
+            return
+        generation.finished = True
+        # Restliche Token sofort zeichnen bzw. an response_text anhängen
+        generation.renderer.close()
+        if self.generations.get(generation.session_id) is generation:
+            del self.generations[generation.session_id]
+        self.residency.touch(generation.model)
+        
+        full_response = generation.response_text
+        if full_response and not generation.stopped:
+            print(f"✅ Response for session {generation.session_id}: {len(full_response)} characters")
+        elif not error:
+            print(f"⚠️ Empty response: {len(full_response)} characters")
+        
+        if generation.session_id == self.current_session_id:
+            bubble = self.finish_stream_response(generation)
+            if bubble is not None and metrics:
+                bubble.set_metrics(metrics)
+                self.record_generation_metrics(generation.model, metrics)
+            if generation.stopped:
+                self.add_to_chat("System", "🛑 Generation stopped")
+            elif error is not None:
+                self.add_to_chat("System", f"❌ Error: {str(error)}")
+            
+            if full_response and not generation.stopped:
+                # Chat-Historie refresh (ohne BIAS für permanente Historie)
+                user_entry = {"role": "user", "content": generation.message}
+                if not self.chat_history or self.chat_history[-1] != user_entry:
+                    self.chat_history.append(user_entry)
+                self.chat_history.append({"role": "assistant", "content": full_response})
+            
+            # WICHTIG: Session SOFORT save nach AI-Antwort
+            # Nicht waiting auf auto_save_timer (200ms), sondern direkt save
+            if self.current_session_id in self.sessions:
+                if self.save_current_session():
+                    self.console_print(f"💾 Session saved", "success")
+        elif not generation.stopped:
+            self.store_background_reply(generation, metrics, error)
         
-        # Thread start und save
-        self.current_generation_thread = threading.Thread(target=get_response, daemon=True)
-        self.current_generation_thread.start()
+        self.update_generation_controls()
+        self.update_session_list()
     
-    def send_message_programmatic(self, message):
-        """Sendet eine Message programmatisch (z.B. aus Textbox statt Entry)"""
-        if not message or not message.strip():
+    def store_background_reply(self, generation, metrics=None, error=None):
+        """Schreibt die Antwort einer nicht angezeigten Session in deren Session-Daten"""
+        session_id = generation.session_id
+        if session_id not in self.sessions:
+            print(f"⚠️ Session {session_id} was deleted - response discarded")
             return
         
-        message = message.strip()
+        try:
+            session_data = self.load_session_data(session_id)
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            if generation.response_text:
+                msg_data = {
+                    "timestamp": timestamp,
+                    "sender": generation.sender,
+                    "message": self.format_ai_response(generation.response_text)
+                }
+                if metrics:
+                    msg_data["metrics"] = metrics
+                    model_stats = session_data.setdefault("model_stats", {})
+                    accumulate_model_stats(model_stats.setdefault(generation.model, {}), metrics)
+                session_counters.append_session_message(session_data, msg_data)
+            if error is not None:
+                session_counters.append_session_message(session_data, {
+                    "timestamp": timestamp,
+                    "sender": "System",
+                    "message": f"❌ Error: {str(error)}"
+                })
+            session_data["total_messages"] = len(
+                [msg for msg in session_data.get("messages", []) if msg.get("sender") != "System"]
+            )
+            session_data["last_modified"] = datetime.now().isoformat()
+            self.persist_session(session_data)
+            self.unload_session_messages(session_id, session_data)
+            self.console_print(
+                f"💾 Background response saved: {session_data.get('name', session_id)}", "success"
+            )
+        except Exception as e:
+            self.console_print(f"❌ Error beim Save der Antwort für Session {session_id}: {e}", "error")
+    
+    def detach_generation_view(self, session_id):
+        """Nimmt die Bubbles einer laufenden Antwort aus dem Transcript (vor dem Wegschalten)
         
-        if not self.current_model:
-            messagebox.showwarning("Warning", "No model selected!")
+        Der Text läuft in generation.response_text weiter; gespeichert wird die
+        Antwort erst vollständig in finish_generation.
+        """
+        generation = self.generations.get(session_id)
+        if generation is None:
+            return
+        for bubble in (generation.thinking_bubble, generation.response_bubble):
+            if bubble is not None:
+                bubble.destroy()
+        generation.thinking_bubble = None
+        generation.response_bubble = None
+    
+    def attach_generation_view(self, session_id):
+        """Zeigt eine weiterlaufende Antwort wieder an (nach dem Load der Session)"""
+        generation = self.generations.get(session_id)
+        if generation is None:
+            return
+        if generation.response_text:
+            generation.response_bubble = self.add_to_chat(generation.sender, generation.response_text)
+        else:
+            self.add_thinking_indicator(generation)
+    
+    def cancel_session_generation(self, session_id):
+        """Bricht die laufende Antwort einer Session ab (z.B. vor dem Delete)"""
+        generation = self.generations.get(session_id)
+        if generation is None:
             return
+        generation.stop()
+        if generation.task is None or generation.task.started_at is None:
+            # Noch nicht gestartet: der Worker führt den Task nicht mehr aus
+            self.finish_generation(generation)
+    
+    def ollama_limit(self, config_key, env_name, default):
+        """Limit aus der Config; 0 = wie der Ollama-Server (Umgebungsvariable), sonst default"""
+        limit = self.config.get(config_key, 0)
+        if not limit:
+            try:
+                limit = int(os.environ.get(env_name) or default)
+            except ValueError:
+                limit = default
+        return max(1, limit)
+    
+    def compare_parallel_limit(self):
+        """Wie viele Vergleichs-Generierungen gleichzeitig laufen dürfen
         
-        # Reset Stop-Flag
-        self.generation_stopped = False
+        Ohne Config-Wert gilt OLLAMA_NUM_PARALLEL (falls gesetzt), sonst 2 - mehr
+        gleichzeitige Requests würde Ollama ohnehin nur in die Warteschlange stellen.
+        """
+        return self.ollama_limit("compare_max_parallel", "OLLAMA_NUM_PARALLEL", 2)
+    
+    def open_compare_mode(self):
+        """Öffnet den Vergleichsmodus (ein Prompt an mehrere installierte Modelle)"""
+        if self.compare_window is not None and self.compare_window.winfo_exists():
+            self.compare_window.focus()
+            return
         
-        # Message zur Historie hinzufügen
-        if message and message not in self.message_history:
-            self.message_history.append(message)
-        self.history_index = -1
+        models = list(self.model_dropdown.models_dict) if hasattr(self, 'model_dropdown') else []
+        if not models:
+            messagebox.showwarning("Warning", "No installed models available!")
+            return
         
-        # Prüfe, ob Session leer war
-        session_empty = False
-        if self.current_session_id and self.current_session_id in self.sessions:
-            session_data = self.sessions[self.current_session_id]
-            if not session_data.get("messages"):
-                session_empty = True
+        self.compare_window = CompareWindow(
+            self.root,
+            models,
+            selected=[self.current_model] if self.current_model else [],
+            prompt=self.message_entry.get().strip() if hasattr(self, 'message_entry') else "",
+            on_run=self.run_compare,
+            on_stop=self.stop_compare,
+            max_parallel=self.runtime.lanes["compare"].workers
+        )
+    
+    def run_compare(self, prompt, models):
+        """Schickt Prompt + Session-History an alle gewählten Modelle (Main-Thread)
         
-        # Message show
-        self.add_to_chat("You", message)
+        Jedes Model läuft als eigener Task in der Lane "compare"; mehr Modelle als
+        Worker warten dort, bis ein Platz frei wird.
+        """
+        window = self.compare_window
+        session_bias = (self.current_session_bias or "").strip()
+        messages, window_report = build_history_window(
+            self.chat_history,
+            prompt,
+            bias=session_bias,
+            num_ctx=self.config.get("context_num_ctx", 4096),
+            reserve_tokens=self.config.get("context_reserve_tokens", 512)
+        )
+        options = {"num_ctx": self.config.get("context_num_ctx", 4096)}
+        
+        window.show_columns(models)
+        window.set_running(True)
+        window.set_status(f"⏳ {len(models)} models, ≈{window_report['used_tokens']} prompt tokens each")
+        
+        run = {"pending": len(models), "started": time.monotonic(), "serial_ms": 0.0, "count": len(models)}
+        self.compare_tokens = []
+        for model_name in models:
+            column = window.column(model_name)
+            token = CancelToken()
+            renderer = StreamRenderer(
+                self.root,
+                column.append_text,
+                max_fps=self.config.get("stream_render_fps", 30),
+                dispatch=self.runtime.call_soon
+            )
+            try:
+                self.runtime.submit(
+                    "compare", self._compare_generation,
+                    model_name, messages, options, token, renderer, column, run,
+                    name=f"compare {model_name}", token=token
+                )
+            except LaneFullError as e:
+                column.set_state(f"❌ {e}", "#E74C3C")
+                self._compare_finished(run, None)
+                continue
+            self.compare_tokens.append(token)
+    
+    def _compare_generation(self, model_name, messages, options, token, renderer, column, run):
+        """Task: streamt die Antwort eines Models in seine Spalte (Hintergrund-Priorität)"""
+        def on_wait(position, waited):
+            if position is None:
+                self.runtime.call_soon(column.set_state, "▶ Generating...", "#3498DB")
+            else:
+                self.runtime.call_soon(column.set_state, f"⏳ Queue #{position} • {waited:.0f}s", "orange")
         
-        # Session-List refresh wenn vorher leer
-        if session_empty:
-            self.update_session_list()
-            self.update_current_session_display()
-            if self.config.get("auto_scroll_chat", True):
-                if hasattr(self, 'chat_display_frame') and hasattr(self.chat_display_frame, '_parent_canvas'):
-                    self.chat_display_frame._parent_canvas.yview_moveto(1.0)
+        self.runtime.call_soon(column.set_state, "▶ Generating...", "#3498DB")
+        generation = self.ollama.chat_stream(model_name, messages, options=options,
+                                             priority="background", on_wait=on_wait)
+        token.on_cancel(generation.cancel)
+        error = None
+        try:
+            for content in generation.iter_content():
+                renderer.push(content)
+        except Exception as e:
+            error = e
+        metrics = generation.metrics
+        
+        def finish():
+            renderer.close()
+            if error is not None:
+                column.set_state(f"❌ {error}", "#E74C3C")
+            elif token.cancelled:
+                column.set_state("🛑 Stopped", "orange")
+            else:
+                column.set_state("✅ Done", "#2ECC71")
+            column.set_metrics(metrics)
+            self._compare_finished(run, metrics)
         
-        # UI während Generation anpassen
-        if hasattr(self, 'stop_btn'):
-            self.stop_btn.configure(state="normal")
-        if hasattr(self, 'send_btn'):
-            self.send_btn.configure(state="disabled", text="⏳ Generiert...")
-        if hasattr(self, 'message_entry'):
-            self.message_entry.configure(state="disabled")
+        self.runtime.call_soon(finish)
+    
+    def _compare_finished(self, run, metrics):
+        """Zählt fertige Modelle; nach dem letzten: Gesamtzeit vs. serielle Summe"""
+        run["pending"] -= 1
+        run["serial_ms"] += (metrics or {}).get("total_ms") or 0
+        if run["pending"] > 0:
+            return
+        self.compare_tokens = []
+        window = self.compare_window
+        if window is None or not window.winfo_exists():
+            return
+        window.set_running(False)
+        wall_s = time.monotonic() - run["started"]
+        serial_text = f" (one after another ≈{run['serial_ms'] / 1000:.1f}s)" if run["serial_ms"] else ""
+        window.set_status(f"✅ {run['count']} models in {wall_s:.1f}s{serial_text}")
+    
+    def stop_compare(self):
+        """Bricht alle laufenden/wartenden Vergleichs-Generierungen ab"""
+        for token in self.compare_tokens:
+            token.cancel()
+    
+    def preload_model(self, model_name):
+        """Lädt model_name vorab in Ollamas Speicher, damit die erste Antwort ohne Load startet"""
+        if not model_name or not self.config.get("residency_preload", True):
+            return
+        self.residency.touch(model_name)
+        if self.residency.is_loaded(model_name):
+            return
         
-        # Antwort abrufen
-        def get_response():
+        def preload():
+            if model_name != self.current_model:
+                # Inzwischen ein anderes Model gewählt - nicht umsonst laden
+                return
+            started = time.monotonic()
             try:
-                self.root.after(0, self.add_thinking_indicator)
-                
-                # Session-BIAS berücksichtigen
-                session_bias = ""
-                if hasattr(self, 'current_session_bias') and self.current_session_bias:
-                    session_bias = self.current_session_bias.strip()
-                
-                # Chat-Historie mit BIAS vorbereiten
-                modified_history = self.chat_history.copy()
-                if session_bias:
-                    modified_history = [
-                        {"role": "system", "content": session_bias}
-                    ] + modified_history
-                
-                # Message zur Chat-History hinzufügen
-                self.chat_history.append({"role": "user", "content": message})
-                modified_history.append({"role": "user", "content": message})
-                
-                # Ollama API aufrufen mit Streaming
-                response_text = ""
-                self.current_response_text = ""
-                self.response_message_widget = None
-                
-                for chunk in self.ollama.chat_stream(self.current_model, modified_history):
-                    if self.generation_stopped:
-                        break
-                    response_text += chunk
-                    self.root.after(0, lambda c=chunk: self.update_progressive_response(c))
-                
-                # Finale Antwort zur History hinzufügen
-                if not self.generation_stopped and response_text:
-                    self.chat_history.append({"role": "assistant", "content": response_text})
-                    self.root.after(0, self.save_current_session)
-                    
+                self.ollama.preload_model(model_name)
             except Exception as e:
-                if not self.generation_stopped:
-                    self.root.after(0, lambda: self.add_to_chat("System", f"❌ Error: {str(e)}"))
-            finally:
-                self.root.after(0, self.reset_generation_ui)
+                print(f"⚠️ Preload of {model_name} failed: {e}")
+                return
+            self.runtime.call_soon(self.on_model_preloaded, model_name, time.monotonic() - started)
         
-        # Thread start
-        self.current_generation_thread = threading.Thread(target=get_response, daemon=True)
-        self.current_generation_thread.start()
+        try:
+            self.runtime.submit("residency", preload, name=f"preload {model_name}",
+                                key=("preload", model_name))
+        except LaneFullError as e:
+            print(f"⚠️ Preload of {model_name} skipped: {e}")
+    
+    def on_model_preloaded(self, model_name, seconds):
+        """Preload fertig (Main-Thread): melden und Residency-Anzeige refresh"""
+        self.residency.preloads += 1
+        self.console_print(f"🔥 {model_name} loaded into memory ({seconds:.1f}s)", "success")
+        self.poll_residency()
+    
+    def poll_residency(self):
+        """Fragt /api/ps im Hintergrund ab und plant die nächste Abfrage"""
+        if self.residency_poll_timer is not None:
+            self.root.after_cancel(self.residency_poll_timer)
+            self.residency_poll_timer = None
+        interval = self.config.get("residency_poll_seconds", 15)
+        if not interval:
+            return
+        
+        def poll():
+            try:
+                models = self.ollama.list_running_models()
+            except Exception:
+                models = None
+            self.runtime.call_soon(self.apply_residency, models)
+        
+        self.runtime.submit("metadata", poll, name="residency-poll", key="residency-poll")
+        self.residency_poll_timer = self.root.after(int(interval * 1000), self.poll_residency)
+    
+    def apply_residency(self, models):
+        """Übernimmt das /api/ps-Ergebnis, zeigt es an und entlädt ungenutzte Modelle"""
+        self.residency.update(models)
+        if hasattr(self, 'residency_label'):
+            self.residency_label.configure(text=self.residency.format_status())
+        
+        # Gewähltes Model, laufende und wartende Anfragen bleiben geladen
+        keep = {self.current_model} | self.ollama.scheduler.busy_models()
+        keep.update(generation.model for generation in self.generations.values())
+        for model_name in self.residency.select_unloads(keep):
+            self.unload_model(model_name)
+    
+    def unload_model(self, model_name):
+        """Entlädt ein Model im Hintergrund (Residency-Policy)"""
+        def unload():
+            try:
+                self.ollama.unload_model(model_name)
+            except Exception as e:
+                print(f"⚠️ Unload of {model_name} failed: {e}")
+                return
+            self.runtime.call_soon(self.on_model_unloaded, model_name)
+        
+        try:
+            self.runtime.submit("residency", unload, name=f"unload {model_name}",
+                                key=("unload", model_name))
+        except LaneFullError as e:
+            print(f"⚠️ Unload of {model_name} skipped: {e}")
+    
+    def on_model_unloaded(self, model_name):
+        self.residency.unloads += 1
+        self.console_print(f"💤 {model_name} unloaded from memory (not used)", "info")
+        self.poll_residency()
     
     def download_model_by_name(self, model_name):
         """Lädt ein Model nach Namen herunter"""
@@ -3511,14 +4188,13 @@ class A1Terminal:
                 if not self.download_stopped:
                     self.console_print(f"✅ Download abgeschlossen: {model_name}", "success")
                     # Model-List refresh
-                    self.root.after(0, self.refresh_models)
+                    self.runtime.call_soon(self.refresh_models)
                     
             except Exception as e:
                 self.console_print(f"❌ Download-Error: {str(e)}", "error")
         
-        # Thread start
-        self.current_download_thread = threading.Thread(target=download, daemon=True)
-        self.current_download_thread.start()
+        # Task start
+        self.current_download_task = self.runtime.submit("downloads", download, name=f"download {model_name}")
     
     def export_session_markdown(self):
         """Exportiert die aktuelle Session als Markdown-File"""
@@ -3653,43 +4329,154 @@ class A1Terminal:
         # Reset Historie-Index wenn der Benutzer tippt (außer bei Pfeiltasten)
         if event and event.keysym not in ['Up', 'Down']:
             self.history_index = -1
+            if event.keysym != 'Return':
+                # Erst nach dem Tastendruck steht der Text im Entry
+                self.root.after_idle(self.maybe_prefill_prompt)
         return None  # Normale Tastatureingabe continue
     
+    def maybe_prefill_prompt(self):
+        """Startet beim Tippen einen Prefill von BIAS + History (opt-in, rate-limitiert)
+        
+        Ollama wertet den Prompt aus und erzeugt nur ein Token; beim Senden ist
+        der gemeinsame Anfang (BIAS, History, getippter Text) schon im Prompt-Cache.
+        """
+        if not self.config.get("prompt_prefill", False):
+            return
+        if self.config.get("ollama_context_cache", False):
+            # Mit Kontext-Cache setzt Ollama ohnehin auf dem gespeicherten Zustand auf
+            return
+        session_id = self.current_session_id
+        model_name = self.current_model
+        if not session_id or not model_name or session_id in self.generations:
+            return
+        bias = (self.current_session_bias or "").strip()
+        if not self.chat_history and not bias:
+            # Nichts vorzuwärmen
+            return
+        typed = self.message_entry.get().strip()
+        if not typed:
+            return
+        
+        key = (session_id, model_name, bias, len(self.chat_history))
+        if not self.prefill.should_start(key):
+            return
+        
+        # Gleiches Fenster wie run_generation (gleicher Prompt-Anfang = Cache-Treffer)
+        num_ctx = self.config.get("context_num_ctx", 4096)
+        window, _ = build_history_window(
+            list(self.chat_history),
+            typed,
+            bias=bias,
+            num_ctx=num_ctx,
+            reserve_tokens=self.config.get("context_reserve_tokens", 512)
+        )
+        token = CancelToken()
+        self.prefill.begin(key, token)
+        # Auch Abbrüche durch die Lane (verdrängt/abgelehnt) geben den Prefill wieder frei
+        token.on_cancel(lambda: self.runtime.call_soon(self.prefill.finish, token))
+        
+        def prefill():
+            handle = self.ollama.chat_stream(
+                model_name, window, options={"num_ctx": num_ctx, "num_predict": 1},
+                priority="speculative"
+            )
+            token.on_cancel(handle.cancel)
+            try:
+                for _ in handle:
+                    if token.cancelled:
+                        break
+            except Exception as e:
+                print(f"⚠️ Prompt prefill failed: {e}")
+            metrics = handle.metrics if handle.final_chunk and not token.cancelled else None
+            self.runtime.call_soon(self.on_prompt_prefilled, token, model_name, metrics)
+        
+        try:
+            self.runtime.submit("prefill", prefill, name=f"prefill {session_id}", token=token)
+        except LaneFullError as e:
+            print(f"⚠️ Prompt prefill skipped: {e}")
+            self.prefill.cancel()
+            return
+        self.residency.touch(model_name)
+    
+    def on_prompt_prefilled(self, token, model_name, metrics):
+        """Prefill fertig (Main-Thread)"""
+        self.prefill.finish(token, metrics)
+        if metrics:
+            print(f"[INFO] Prompt prefilled for {model_name}: "
+                  f"{metrics.get('prompt_eval_count') or 0} tokens in "
+                  f"{(metrics.get('prompt_eval_ms') or 0) / 1000:.1f}s")
+    
+    def cancel_prefill(self):
+        """Bricht einen Prefill ab (Session-/Model-Wechsel, Senden)"""
+        if self.prefill.cancel():
+            print("[INFO] Prompt prefill cancelled")
+    
     def stop_generation(self):
-        """Stoppt die aktuelle Generation oder den Download sofort"""
-        if self.current_generation_thread is not None:
-            # Stop chat generation
-            self.generation_stopped = True
-            self.reset_generation_ui()
+        """Stoppt die Generation der angezeigten Session oder den Download sofort"""
+        if self.current_session_id in self.generations:
+            # Token abbrechen: schließt den HTTP-Stream sofort - Ollama bricht serverseitig ab
+            self.cancel_session_generation(self.current_session_id)
             print("\n🛑 Generation stopped by user")
         
-        if self.current_download_thread is not None:
+        if self.current_download_task is not None:
             # Stop download
             self.download_stopped = True
+            self.current_download_task.cancel()
             self.reset_download_ui()
             print("\n🛑 Download stopped by user")
     
-    def reset_generation_ui(self):
-        """Setzt die UI nach Generation back"""
-        self.stop_btn.configure(state="disabled", text="Stop")
-        self.send_btn.configure(state="normal", text="Send")
+    def update_generation_controls(self):
+        """Setzt Send/Stop/Eingabefeld passend zur angezeigten Session
         
-        # Eingabefeld wieder aktivieren
+        Nur die angezeigte Session ist blockiert, solange ihre Antwort läuft -
+        in anderen Sessions kann parallel weitergechattet werden.
+        """
+        if not hasattr(self, 'send_btn') or self.current_download_task is not None:
+            # Während eines Downloads gehören die Buttons dem Download
+            return
+        busy = self.current_session_id in self.generations
+        self.stop_btn.configure(state="normal" if busy else "disabled", text="Stop")
+        self.send_btn.configure(state="disabled" if busy else "normal",
+                                text="⏳ Generiert..." if busy else "Send")
+        
+        # Eingabefeld nur für die wartende Session sperren
         if hasattr(self, 'message_entry'):
-            self.message_entry.configure(state="normal")
+            self.message_entry.configure(state="disabled" if busy else "normal")
+        self.update_queue_status_label()
+    
+    def update_generation_queue(self, generation, position, waited):
+        """Merkt sich Position/Wartezeit einer Antwort in der Warteschlange (Main-Thread)"""
+        generation.queue_position = position
+        generation.queue_wait = waited
+        self.update_queue_status_label()
+    
+    def update_queue_status_label(self):
+        """Zeigt die Warteposition der angezeigten Session bzw. die Auslastung von Ollama"""
+        if not hasattr(self, 'queue_status_label'):
+            return
+        
+        generation = self.generations.get(self.current_session_id)
+        if generation is not None and generation.queue_position:
+            self.queue_status_label.configure(
+                text=f"🚦 Waiting for Ollama: position {generation.queue_position} • "
+                     f"{generation.queue_wait:.0f}s",
+                text_color="#F39C12"
+            )
+            return
         
-        self.current_generation_thread = None
+        stats = self.ollama.scheduler.stats()
+        if stats["waiting"]:
+            text = f"🚦 Ollama: {stats['active']}/{stats['max_active']} running, {stats['waiting']} queued"
+        elif len(self.generations) > 1:
+            text = f"🚦 {len(self.generations)} sessions generating"
+        else:
+            text = ""
+        self.queue_status_label.configure(text=text, text_color="gray")
     
     def reset_download_ui(self):
         """Setzt die UI nach Download back"""
-        self.stop_btn.configure(state="disabled", text="Stop")
-        self.send_btn.configure(state="normal", text="Send")
-        
-        # Eingabefeld wieder aktivieren
-        if hasattr(self, 'message_entry'):
-            self.message_entry.configure(state="normal")
-        
-        self.current_download_thread = None
+        self.current_download_task = None
+        self.update_generation_controls()
     
     def format_ai_response(self, content):
         """Formatiert AI-Antworten für bessere Lesbarkeit"""
@@ -3742,7 +4529,7 @@ class A1Terminal:
                     "sender": sender,
                     "message": message
                 }
-                self.sessions[self.current_session_id]["messages"].append(msg_data)
+                session_counters.append_session_message(self.sessions[self.current_session_id], msg_data)
                 self.sessions[self.current_session_id]["last_modified"] = datetime.now().isoformat()
                 self.auto_save_session()
             return None  # Keine UI-Bubble create
@@ -3764,12 +4551,10 @@ class A1Terminal:
             
             # Erweitere die letzte System-Bubble
             last_bubble = self.chat_bubbles[-1]
-            current_message = last_bubble.message_label.get("1.0", "end-1c")
-            new_combined_message = current_message + "\n" + message
+            new_combined_message = last_bubble.message + "\n" + message
             
             # Aktualisiere die Bubble
-            last_bubble.message_label.delete("1.0", "end")
-            last_bubble.message_label.insert("1.0", new_combined_message)
+            last_bubble.set_message(new_combined_message)
             
             # Aktualisiere auch die Session-Daten
             if (self.current_session_id and 
@@ -3778,7 +4563,9 @@ class A1Terminal:
                 
                 last_msg = self.sessions[self.current_session_id]["messages"][-1]
                 if last_msg["sender"] == "System":
-                    last_msg["message"] = new_combined_message
+                    session_counters.set_session_message_text(
+                        self.sessions[self.current_session_id], last_msg, new_combined_message
+                    )
                     last_msg["timestamp"] = timestamp  # Aktualisiere Timestamp
                     
             # Scrolle nach unten
@@ -3791,17 +4578,8 @@ class A1Terminal:
             
             return last_bubble
         
-        # Erstelle neue Chat-Bubble mit aktueller Config (normale Logik)
-        bubble = ChatBubble(
-            self.chat_display_frame,
-            sender=sender,
-            message=message,
-            timestamp=timestamp,
-            app_config=self.config
-        )
-        
-        # Füge Bubble zur List hinzu
-        self.chat_bubbles.append(bubble)
+        # Neue Message im Transcript (landet auch in self.chat_bubbles)
+        bubble = self.chat_display_frame.append(sender, message, timestamp)
         
         # Füge Message zur aktuellen Session hinzu
         if self.current_session_id and self.current_session_id in self.sessions:
@@ -3810,8 +4588,9 @@ class A1Terminal:
                 "sender": sender,
                 "message": message
             }
-            self.sessions[self.current_session_id]["messages"].append(msg_data)
+            session_counters.append_session_message(self.sessions[self.current_session_id], msg_data)
             self.sessions[self.current_session_id]["total_messages"] = self.count_chat_messages()
+            self.update_context_budget_label()
             self.sessions[self.current_session_id]["last_modified"] = datetime.now().isoformat()
             
             # ✅ Automatisches Save nach jeder Message
@@ -3852,74 +4631,154 @@ class A1Terminal:
                     self.chat_display_frame.update()
                     self.chat_display_frame._parent_canvas.update()
                     
-                    # Zum Ende scrollen
-                    self.chat_display_frame._parent_canvas.yview_moveto(1.0)
-                    
-                    # Canvas-Größe new berechnen
-                    self.chat_display_frame._parent_canvas.configure(scrollregion=self.chat_display_frame._parent_canvas.bbox("all"))
-                    
-                    # Nochmals zum Ende
+                    # Zum Ende scrollen (Scroll-Region verwaltet der Transcript selbst)
                     self.chat_display_frame._parent_canvas.yview_moveto(1.0)
                 
         except Exception as e:
             self.console_print(f"❌ Error beim erzwungenen Scrollen: {e}", "error")
     
-    def add_thinking_indicator(self):
-        """Zeigt dezenten Denkprozess-Indikator an"""
+    def add_thinking_indicator(self, generation):
+        """Zeigt dezenten Denkprozess-Indikator für eine laufende Antwort an"""
         thinking_message = "💭 thinks..."
-        bubble = self.add_to_chat(f"🤖 {self.current_model}", thinking_message)
-        self.current_thinking_bubble = bubble
+        bubble = self.add_to_chat(generation.sender, thinking_message)
+        generation.thinking_bubble = bubble
+        generation.thinking_message = None
+        messages = self.sessions.get(generation.session_id, {}).get("messages")
+        if messages and messages[-1].get("message") == thinking_message:
+            # Merken, damit er auch dann entfernt wird, wenn danach noch Messages dazukamen
+            generation.thinking_message = messages[-1]
         return bubble
     
-    def update_progressive_response(self, chunk):
-        """Aktualisiert die progressive Antwort mit neuem Chunk"""
-        if not hasattr(self, 'current_response_text'):
-            self.current_response_text = ""
+    def notify_history_window(self, report, session_id=None):
+        """Meldet im Chat, welche History nicht mehr ins Kontextfenster passt
+        
+        Nur bei Änderung gegenüber der letzten Meldung, damit lange Sessions nicht
+        nach jeder Nachricht denselben Hinweis bekommen. Meldungen für eine Session
+        im Hintergrund entfallen.
+        """
+        if session_id is not None and session_id != self.current_session_id:
+            return
+        notice = format_window_report(report)
+        key = (report.get("dropped"), report.get("truncated"))
+        if not notice or key == getattr(self, '_last_window_notice', None):
+            self._last_window_notice = key if notice else None
+            return
+        self._last_window_notice = key
+        self.console_print(notice, "warning")
+        self.add_to_chat("System", notice)
+    
+    def record_generation_metrics(self, model_name, metrics):
+        """Summiert die Metriken einer Antwort pro Model in der aktuellen Session auf"""
+        print(f"⏱️ {model_name}: {format_metrics(metrics)}")
         
-        self.current_response_text += chunk
+        if self.current_session_id and self.current_session_id in self.sessions:
+            session_data = self.sessions[self.current_session_id]
+            model_stats = session_data.setdefault("model_stats", {})
+            accumulate_model_stats(model_stats.setdefault(model_name, {}), metrics)
+        
+        self.update_model_stats_label()
+    
+    def update_context_budget_label(self):
+        """Zeigt, wie viel des Kontextfensters die Session belegt (BIAS + Chat-History)"""
+        if not hasattr(self, 'context_budget_label'):
+            return
+        
+        session_data = self.sessions.get(self.current_session_id) if self.current_session_id else None
+        if not session_data:
+            self.context_budget_label.configure(text="")
+            return
+        
+        budget = max(1, self.config.get("context_num_ctx", 4096) - self.config.get("context_reserve_tokens", 512))
+        tokens = session_data.get("token_count", 0)
+        usage = tokens / budget
+        if usage > 1:
+            text_color = "#E74C3C"  # Rot: ältere Messages werden weggelassen
+        elif usage > 0.8:
+            text_color = "#F39C12"
+        else:
+            text_color = "gray"
+        self.context_budget_label.configure(
+            text=f"🧮 Context: ≈{tokens}/{budget} tokens ({usage:.0%})",
+            text_color=text_color
+        )
+    
+    def update_model_stats_label(self):
+        """Zeigt die aufsummierten Metriken des aktuellen Models in der Session an"""
+        if not hasattr(self, 'model_stats_label'):
+            return
+        
+        stats = None
+        if self.current_model and self.current_session_id in self.sessions:
+            stats = self.sessions[self.current_session_id].get("model_stats", {}).get(self.current_model)
+        self.model_stats_label.configure(text=format_model_stats(self.current_model, stats))
+    
+    def finish_stream_response(self, generation):
+        """Finalisiert die Antwort-Bubble einer angezeigten Session (Main-Thread)"""
+        bubble = generation.response_bubble
+        generation.response_bubble = None
+        
+        if bubble is None:
+            # Kein einziges Token empfangen - Denk-Indikator entfernen
+            self.remove_thinking_indicator(generation)
+            return None
+        
+        if generation.response_text and not generation.stopped:
+            bubble.set_message(self.format_ai_response(generation.response_text))
+        return bubble
+    
+    def update_progressive_response(self, generation, chunk):
+        """Hängt einen (frame-gebündelten) Stream-Chunk an die Antwort einer Session an"""
+        generation.response_text += chunk
+        
+        if generation.session_id != self.current_session_id:
+            # Session im Hintergrund: Text sammelt sich, die Bubble entsteht beim Öffnen
+            return
         
         # Wenn noch kein Response-Widget existiert, erstelle eines
-        if not hasattr(self, 'response_message_widget') or self.response_message_widget is None:
+        if generation.response_bubble is None:
             # Entferne Thinking-Indikator wenn vorhanden
-            if hasattr(self, 'current_thinking_bubble') and self.current_thinking_bubble:
-                self.remove_last_message()
+            self.remove_thinking_indicator(generation)
             
             # Erstelle neues Widget für die Antwort
-            self.response_message_widget = self.add_to_chat(
-                f"🤖 {self.current_model}", 
-                self.current_response_text
-            )
+            generation.response_bubble = self.add_to_chat(generation.sender, generation.response_text)
         else:
-            # Aktualisiere bestehendes Widget
+            # Text direkt in die Textbox der Bubble anhängen
             try:
-                # Finde das Text-Label im Widget und aktualisiere es
-                for child in self.response_message_widget.winfo_children():
-                    if isinstance(child, ctk.CTkLabel):
-                        child.configure(text=self.current_response_text)
-                        break
-            except:
-                pass
+                generation.response_bubble.append_text(chunk)
+                if self.config.get("auto_scroll_chat", True):
+                    self.chat_display_frame._parent_canvas.yview_moveto(1.0)
+            except Exception as e:
+                print(f"Stream-Render-Error: {e}")
     
-    def remove_last_message(self):
-        """Entfernt die letzte Message (Thinking-Indikator)"""
-        # Stoppe die ASCII-Animation
-        self._thinking_animation_running = False
-        if hasattr(self, 'current_thinking_bubble') and self.current_thinking_bubble:
-            try:
-                self.current_thinking_bubble.destroy()
-                if self.current_thinking_bubble in self.chat_bubbles:
-                    self.chat_bubbles.remove(self.current_thinking_bubble)
-                
-                # WICHTIG: Entferne auch aus der Session-Daten
-                if self.current_session_id and self.current_session_id in self.sessions:
-                    messages = self.sessions[self.current_session_id].get("messages", [])
-                    # Entferne die letzte Message wenn sie der Thinking-Indikator ist
-                    if messages and "Verarbeitet Ihre Anfrage" in messages[-1].get("message", ""):
-                        messages.pop()
-                        self.sessions[self.current_session_id]["last_modified"] = datetime.now().isoformat()
-            except:
-                pass
-            self.current_thinking_bubble = None
+    def remove_thinking_indicator(self, generation):
+        """Entfernt den Denk-Indikator einer Antwort aus Transcript und Session-Daten"""
+        bubble = generation.thinking_bubble
+        placeholder = generation.thinking_message
+        if bubble is None:
+            return
+        generation.thinking_bubble = None
+        generation.thinking_message = None
+        try:
+            bubble.destroy()
+            
+            # WICHTIG: Entferne auch aus der Session-Daten
+            if generation.session_id == self.current_session_id and self.current_session_id in self.sessions:
+                session_data = self.sessions[self.current_session_id]
+                messages = session_data.get("messages", [])
+                # Nicht unbedingt die letzte Message: z.B. notify_history_window hängt
+                # eine System-Message hinter den Indikator. Erst nach Identität suchen,
+                # dann (nach save_current_session sind es neue Dicts) nach Inhalt
+                index = next((i for i in range(len(messages) - 1, -1, -1)
+                              if messages[i] is placeholder), None)
+                if index is None:
+                    index = next((i for i in range(len(messages) - 1, -1, -1)
+                                  if messages[i].get("sender") == bubble.sender
+                                  and messages[i].get("message") == bubble.message), None)
+                if index is not None:
+                    session_counters.pop_session_message(session_data, index)
+                    session_data["last_modified"] = datetime.now().isoformat()
+        except Exception:
+            pass
 
     def export_session(self):
         """Exportiert die aktuelle Chat-Session"""
@@ -4389,19 +5248,23 @@ Kannst du ein einfaches Beispiel geben?
             # Clear chat history
             self.chat_history = []
             
-            # Session refresh
+            # Chat-Anzeige leeren
+            self.chat_display_frame.clear()
+            
+            # Session refresh (Messages kommen beim Save aus dem nun leeren Transcript)
             if self.current_session_id in self.sessions:
-                self.sessions[self.current_session_id]["messages"] = []
                 self.save_current_session()
             
-            # Chat-Anzeige leeren
-            for bubble in self.chat_bubbles:
-                bubble.destroy()
-            self.chat_bubbles.clear()
-            
             # System-Message
             self.add_to_chat("System", "✨ Chat wurde geleert")
     
     def run(self):
         """Starts the application"""
         self.root.mainloop()
+        # Ausstehende Session-Saves schreiben, dann Index
+        self.persistence.close()
+        self.runtime.shutdown()
+        self.save_session_index()
+        if self.session_db:
+            self.session_db.close()
+        self.ollama.close()
@@ -0,0 +1,90 @@
+"""Persistenter Ollama-Kontext-State pro Session (context-Array von /api/generate)"""
+
+import json
+import os
+import threading
+
+
+class SessionContextCache:
+    """Speichert das context-Array der letzten Antwort neben der Session-Datei
+
+    Ein gespeicherter Kontext ist nur gültig, solange Model, BIAS und Anzahl der
+    History-Einträge unverändert sind - sonst würde Ollama auf einem Zustand
+    aufsetzen, der nicht mehr zur sichtbaren Historie passt.
+    """
+
+    def __init__(self, sessions_dir):
+        self.sessions_dir = sessions_dir
+        self._lock = threading.Lock()
+        self._entries = {}
+
+    def _path(self, session_id):
+        return os.path.join(self.sessions_dir, f"session_{session_id}.ctx")
+
+    def _read(self, session_id):
+        with self._lock:
+            if session_id in self._entries:
+                return self._entries[session_id]
+        entry = None
+        try:
+            with open(self._path(session_id), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Context cache for {session_id} unreadable: {e}")
+        with self._lock:
+            self._entries[session_id] = entry
+        return entry
+
+    def get(self, session_id, model, bias, turns):
+        """Liefert den gespeicherten Kontext oder None, wenn er nicht (mehr) passt"""
+        entry = self._read(session_id)
+        if not entry or not entry.get("context"):
+            return None
+        if entry.get("model") != model or entry.get("bias", "") != (bias or ""):
+            return None
+        if entry.get("turns") != turns:
+            return None
+        return entry["context"]
+
+    def put(self, session_id, model, bias, turns, context):
+        """Speichert den Kontext nach einer abgeschlossenen Antwort (Worker-Thread)"""
+        entry = {"model": model, "bias": bias or "", "turns": turns, "context": context}
+        with self._lock:
+            self._entries[session_id] = entry
+        try:
+            tmp_path = self._path(session_id) + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(session_id))
+        except Exception as e:
+            print(f"⚠️ Context cache for {session_id} not saved: {e}")
+
+    def delete(self, session_id):
+        """Entfernt den Kontext einer Session (Delete oder ungültig gewordene Historie)"""
+        with self._lock:
+            self._entries.pop(session_id, None)
+        try:
+            os.remove(self._path(session_id))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Context cache for {session_id} not deleted: {e}")
+
+
+def history_as_prompt(history, message):
+    """Fasst bisherige Historie und neue Nachricht zu einem Prompt zusammen
+
+    Wird einmalig genutzt, wenn für eine Session noch kein Kontext existiert;
+    ab der Antwort darauf setzt jede weitere Nachricht auf dem Kontext auf.
+    """
+    lines = []
+    for entry in history:
+        role = "User" if entry.get("role") == "user" else "Assistant"
+        lines.append(f"{role}: {entry.get('content', '')}")
+    if not lines:
+        return message
+    lines.append(f"User: {message}")
+    lines.append("Assistant:")
+    return "\n\n".join(lines)
@@ -0,0 +1,98 @@
+"""Latenz-Metriken für Generierungen (TTFT, Tokens/s, Prompt-Eval, Model-Load)"""
+
+NS_PER_MS = 1_000_000
+
+
+def metrics_from_final_chunk(final_chunk, ttft_ms=None, queue_ms=None):
+    """Baut das Metrik-Dict einer Antwort aus dem finalen Ollama-Chunk
+
+    Args:
+        final_chunk (dict): Letzter Stream-Chunk (done=True) mit den Server-Zeiten in ns
+        ttft_ms (float): Client-seitige Zeit bis zum ersten Token in ms
+        queue_ms (float): Wartezeit in der Generierungs-Warteschlange in ms
+
+    Returns:
+        dict: Nur die tatsächlich vorhandenen Werte (Zeiten in ms)
+    """
+    final_chunk = final_chunk or {}
+
+    def to_ms(key):
+        value = final_chunk.get(key)
+        return round(value / NS_PER_MS, 1) if value else None
+
+    eval_count = final_chunk.get("eval_count")
+    eval_ms = to_ms("eval_duration")
+    prompt_eval_count = final_chunk.get("prompt_eval_count")
+    prompt_eval_ms = to_ms("prompt_eval_duration")
+
+    metrics = {
+        "ttft_ms": round(ttft_ms, 1) if ttft_ms is not None else None,
+        "eval_count": eval_count,
+        "eval_ms": eval_ms,
+        "tokens_per_s": round(eval_count / (eval_ms / 1000), 2) if eval_count and eval_ms else None,
+        "prompt_eval_count": prompt_eval_count,
+        "prompt_eval_ms": prompt_eval_ms,
+        "load_ms": to_ms("load_duration"),
+        "total_ms": to_ms("total_duration"),
+        "queue_ms": round(queue_ms, 1) if queue_ms else None,
+    }
+    return {key: value for key, value in metrics.items() if value is not None}
+
+
+def format_metrics(metrics):
+    """Kompakte Anzeige der Metriken einer einzelnen Antwort"""
+    if not metrics:
+        return ""
+
+    parts = []
+    if "ttft_ms" in metrics:
+        parts.append(f"⚡ TTFT {metrics['ttft_ms'] / 1000:.2f}s")
+    if "tokens_per_s" in metrics:
+        parts.append(f"{metrics['tokens_per_s']:.1f} tok/s")
+    if "prompt_eval_ms" in metrics:
+        prompt_tokens = metrics.get("prompt_eval_count", 0)
+        parts.append(f"Prompt {prompt_tokens} tok/{metrics['prompt_eval_ms'] / 1000:.2f}s")
+    if "load_ms" in metrics:
+        parts.append(f"Load {metrics['load_ms'] / 1000:.2f}s")
+    if "queue_ms" in metrics:
+        parts.append(f"⏳ Queue {metrics['queue_ms'] / 1000:.1f}s")
+    return " • ".join(parts)
+
+
+def accumulate_model_stats(stats, metrics):
+    """Addiert die Metriken einer Antwort auf die Summen eines Models
+
+    Args:
+        stats (dict): Bisherige Summen (is being in-place aktualisiert)
+        metrics (dict): Metriken der neuen Antwort
+
+    Returns:
+        dict: Die aktualisierten Summen
+    """
+    stats["generations"] = stats.get("generations", 0) + 1
+    if "ttft_ms" in metrics:
+        stats["ttft_ms"] = stats.get("ttft_ms", 0) + metrics["ttft_ms"]
+        stats["ttft_samples"] = stats.get("ttft_samples", 0) + 1
+    for key in ("eval_count", "eval_ms", "prompt_eval_count", "prompt_eval_ms", "load_ms"):
+        if key in metrics:
+            stats[key] = round(stats.get(key, 0) + metrics[key], 1)
+    stats["load_samples"] = stats.get("load_samples", 0) + (1 if "load_ms" in metrics else 0)
+    return stats
+
+
+def format_model_stats(model_name, stats):
+    """Anzeige der aufsummierten Metriken eines Models (Durchschnittswerte)"""
+    if not stats or not stats.get("generations"):
+        return ""
+
+    parts = [f"📈 {model_name}: {stats['generations']} answers"]
+    if stats.get("ttft_samples"):
+        parts.append(f"Ø TTFT {stats['ttft_ms'] / stats['ttft_samples'] / 1000:.2f}s")
+    if stats.get("eval_ms"):
+        parts.append(f"Ø {stats['eval_count'] / (stats['eval_ms'] / 1000):.1f} tok/s")
+    if stats.get("prompt_eval_ms"):
+        prompt_rate = stats.get("prompt_eval_count", 0) / (stats["prompt_eval_ms"] / 1000)
+        parts.append(f"Prompt {prompt_rate:.0f} tok/s")
+    if stats.get("load_samples"):
+        parts.append(f"Ø Load {stats['load_ms'] / stats['load_samples'] / 1000:.2f}s")
+    return " • ".join(parts)
@@ -0,0 +1,255 @@
+"""Zulassungssteuerung für Generierungen gegen den lokalen Ollama-Server
+
+Jede Generierung (Chat, Vergleichsmodus, ...) holt sich vor dem HTTP-Request
+einen Slot. Der Scheduler begrenzt die gleichzeitigen Requests insgesamt und
+pro Model sowie die Zahl verschiedener Modelle, die gleichzeitig laufen dürfen
+- ein Model-Wechsel bedeutet bei wenig RAM, dass Ollama ein anderes Model
+entladen und neu laden muss. Wartende Anfragen werden nach Priorität und dann
+nach Model gruppiert zugelassen: Anfragen für ein bereits geladenes Model
+ziehen vor, bis eine Anfrage zu lange wartet (Fairness).
+"""
+
+import itertools
+import threading
+import time
+
+# Prioritätsklassen (kleiner = früher)
+PRIORITIES = {
+    "interactive": 0,   # Chat-Nachricht, auf die der User wartet
+    "background": 1,    # Vergleichsmodus, Batch-Jobs
+    "speculative": 2,   # Prompt-Prefill beim Tippen - nur, wenn sonst nichts wartet
+}
+# Wie oft Wartende ihre Position/Wartezeit gemeldet bekommen (Sekunden)
+WAIT_REPORT_SECONDS = 1.0
+
+
+class GenerationTicket:
+    """Platz einer Generierung in der Warteschlange bzw. belegter Slot"""
+
+    __slots__ = ("model", "priority", "rank", "seq", "on_wait", "enqueued_at",
+                 "admitted_at", "released", "cancelled", "position")
+
+    def __init__(self, model, priority, seq, on_wait=None):
+        self.model = model
+        self.priority = priority
+        self.rank = PRIORITIES.get(priority, PRIORITIES["background"])
+        self.seq = seq
+        self.on_wait = on_wait
+        self.enqueued_at = time.monotonic()
+        self.admitted_at = None
+        self.released = False
+        self.cancelled = False
+        self.position = None
+
+    @property
+    def wait_seconds(self):
+        end = self.admitted_at if self.admitted_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+
+class GenerationScheduler:
+    """Warteschlange mit Prioritäten und Limits vor den Generierungs-Requests
+
+    acquire() blockiert (im Worker-Thread), bis die Anfrage zugelassen oder
+    abgebrochen wurde; release() gibt den Slot wieder frei.
+
+    Args:
+        max_active (int): gleichzeitige Generierungen insgesamt
+        max_per_model (int): gleichzeitige Generierungen pro Model (vgl. OLLAMA_NUM_PARALLEL)
+        max_models (int): verschiedene Modelle gleichzeitig (vgl. OLLAMA_MAX_LOADED_MODELS)
+        fairness_seconds (float): ab dieser Wartezeit zählt eine Anfrage wie eine
+            für das geladene Model - danach wird notfalls das Model gewechselt
+    """
+
+    def __init__(self, max_active=2, max_per_model=4, max_models=3, fairness_seconds=30.0):
+        self.max_active = max(1, max_active)
+        self.max_per_model = max(1, max_per_model)
+        self.max_models = max(1, max_models)
+        self.fairness_seconds = fairness_seconds
+
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._waiting = []
+        self._active = {}        # model -> Anzahl laufender Generierungen
+        self._last_model = None  # zuletzt zugelassenes Model (vermutlich noch geladen)
+
+        # Statistik
+        self.admitted = 0
+        self.queued = 0          # Anfragen, die warten mussten
+        self.cancelled = 0
+        self.model_switches = 0
+        self.max_depth = 0
+        self._wait_total = 0.0
+        self.max_wait = 0.0
+
+    # ---------- Slots ----------
+
+    def acquire(self, model, priority="interactive", on_wait=None):
+        """Wartet auf einen Slot für model (enqueue() + wait())
+
+        Returns:
+            GenerationTicket: zugelassenes Ticket, oder None wenn es abgebrochen wurde
+        """
+        ticket = self.enqueue(model, priority, on_wait)
+        return ticket if self.wait(ticket) else None
+
+    def enqueue(self, model, priority="interactive", on_wait=None):
+        """Stellt eine Anfrage in die Warteschlange (wird sofort zugelassen, wenn frei)
+
+        Args:
+            on_wait: on_wait(position, wait_seconds) - solange die Anfrage wartet
+                (Position ab 1) und einmal mit position=None bei Zulassung/Abbruch;
+                wird im Thread ausgeführt, der wait() aufruft
+        """
+        with self._cond:
+            ticket = GenerationTicket(model, priority, next(self._seq), on_wait)
+            self._waiting.append(ticket)
+            self._admit()
+            if ticket.admitted_at is None:
+                self.queued += 1
+                self.max_depth = max(self.max_depth, len(self._waiting))
+        return ticket
+
+    def wait(self, ticket):
+        """Blockiert, bis das Ticket zugelassen oder per cancel() abgebrochen wurde
+
+        Returns:
+            bool: True wenn zugelassen (danach release() aufrufen)
+        """
+        if ticket.admitted_at is not None:
+            return True
+        reported = None
+        while True:
+            with self._cond:
+                if ticket.admitted_at is None and not ticket.cancelled:
+                    # Zeit vergeht: gealterte Anfragen dürfen jetzt evtl. ein Model wechseln
+                    self._admit()
+                if ticket.admitted_at is not None or ticket.cancelled:
+                    break
+                report = (ticket.position, int(ticket.wait_seconds))
+            if ticket.on_wait is not None and report != reported:
+                reported = report
+                self._report(ticket, *report)
+            with self._cond:
+                if ticket.admitted_at is None and not ticket.cancelled:
+                    self._cond.wait(WAIT_REPORT_SECONDS)
+        self._report(ticket, None, ticket.wait_seconds)
+        return not ticket.cancelled
+
+    @staticmethod
+    def _report(ticket, position, wait_seconds):
+        if ticket.on_wait is None:
+            return
+        try:
+            ticket.on_wait(position, wait_seconds)
+        except Exception as e:
+            print(f"⚠️ Queue listener failed: {e}")
+
+    def release(self, ticket):
+        """Gibt den Slot eines zugelassenen Tickets frei"""
+        with self._cond:
+            if ticket is None or ticket.admitted_at is None or ticket.released:
+                return
+            ticket.released = True
+            count = self._active.get(ticket.model, 0) - 1
+            if count > 0:
+                self._active[ticket.model] = count
+            else:
+                self._active.pop(ticket.model, None)
+            self._admit()
+            self._cond.notify_all()
+
+    def cancel(self, ticket):
+        """Nimmt ein wartendes Ticket aus der Warteschlange (laufende: release())"""
+        with self._cond:
+            if ticket.admitted_at is not None or ticket.cancelled:
+                return
+            ticket.cancelled = True
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                self.cancelled += 1
+            self._admit()
+            self._cond.notify_all()
+
+    # ---------- Zulassung ----------
+
+    def _order_key(self, ticket, hot_models, now):
+        aged = now - ticket.enqueued_at >= self.fairness_seconds
+        hot = ticket.model in hot_models or aged
+        return (ticket.rank, 0 if hot else 1, ticket.seq)
+
+    def _admit(self):
+        """Lässt wartende Tickets zu, solange die Limits es erlauben (Lock gehalten)"""
+        if not self._waiting:
+            return
+        now = time.monotonic()
+        hot_models = set(self._active)
+        if self._last_model is not None:
+            hot_models.add(self._last_model)
+        self._waiting.sort(key=lambda ticket: self._order_key(ticket, hot_models, now))
+
+        admitted = []
+        for ticket in self._waiting:
+            if sum(self._active.values()) >= self.max_active:
+                break
+            running = self._active.get(ticket.model, 0)
+            if running == 0 and len(self._active) >= self.max_models:
+                # Model-Wechsel nötig: alles dahinter wartet mit, sonst käme die
+                # Anfrage nie dran, solange das geladene Model Nachschub bekommt
+                break
+            if running >= self.max_per_model:
+                continue
+            if running == 0 and self._last_model not in (None, ticket.model):
+                self.model_switches += 1
+            self._active[ticket.model] = running + 1
+            self._last_model = ticket.model
+            ticket.admitted_at = now
+            admitted.append(ticket)
+            self.admitted += 1
+            wait = now - ticket.enqueued_at
+            self._wait_total += wait
+            self.max_wait = max(self.max_wait, wait)
+
+        if admitted:
+            self._waiting = [ticket for ticket in self._waiting if ticket.admitted_at is None]
+            self._cond.notify_all()
+        for position, ticket in enumerate(self._waiting, 1):
+            ticket.position = position
+
+    def busy_models(self):
+        """Modelle mit laufenden oder wartenden Generierungen"""
+        with self._cond:
+            return set(self._active) | {ticket.model for ticket in self._waiting}
+
+    # ---------- Statistik ----------
+
+    def stats(self):
+        with self._cond:
+            return {
+                "active": sum(self._active.values()),
+                "active_models": dict(self._active),
+                "waiting": len(self._waiting),
+                "max_active": self.max_active,
+                "max_per_model": self.max_per_model,
+                "max_models": self.max_models,
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "cancelled": self.cancelled,
+                "model_switches": self.model_switches,
+                "max_depth": self.max_depth,
+                "avg_wait_ms": self._wait_total / self.admitted * 1000 if self.admitted else 0.0,
+                "max_wait_ms": self.max_wait * 1000,
+            }
+
+    def format_stats(self):
+        """Statistik als Text (Debug-Dialog)"""
+        stats = self.stats()
+        models = ", ".join(f"{model} ×{count}" for model, count in stats["active_models"].items()) or "-"
+        return (
+            f"   running: {stats['active']}/{stats['max_active']} ({models}), "
+            f"waiting: {stats['waiting']} (max {stats['max_depth']})\n"
+            f"   limits: {stats['max_per_model']} per model, {stats['max_models']} model(s) at once\n"
+            f"   admitted: {stats['admitted']}, had to wait: {stats['queued']}, "
+            f"cancelled: {stats['cancelled']}, model switches: {stats['model_switches']}\n"
+            f"   wait ≈{stats['avg_wait_ms']:.0f}ms avg, {stats['max_wait_ms']:.0f}ms max"
+        )
@@ -0,0 +1,114 @@
+"""Token-Budget-basiertes Fenster über die Chat-History"""
+
+import math
+
+# Grobe Schätzung: ~4 Zeichen pro Token (BPE-Tokenizer der gängigen Modelle)
+CHARS_PER_TOKEN = 4.0
+# Pro Message kommen Template-Token (Rolle, Start/Ende-Marker) dazu
+MESSAGE_OVERHEAD_TOKENS = 4
+# Einzelne Messages dürfen höchstens diesen Anteil des Budgets belegen
+MAX_MESSAGE_SHARE = 0.5
+# Kleinere Reste lohnen sich nicht für eine gekürzte Message
+MIN_TRUNCATED_TOKENS = 32
+TRUNCATION_MARKER = "\n[…]\n"
+
+
+def estimate_tokens(text):
+    """Schätzt die Token-Anzahl eines Textes (ohne Tokenizer des Models)"""
+    if not text:
+        return 0
+    # Wörter und Zeichen kombinieren: kurze Wörter/Satzzeichen zählen einzeln
+    by_chars = len(text) / CHARS_PER_TOKEN
+    by_words = len(text.split()) * 0.75
+    return int(math.ceil(max(by_chars, by_words)))
+
+
+def message_tokens(message):
+    """Token-Schätzung einer Chat-Message inklusive Template-Overhead"""
+    return estimate_tokens(message.get("content", "")) + MESSAGE_OVERHEAD_TOKENS
+
+
+def truncate_to_tokens(text, max_tokens):
+    """Kürzt einen Text auf max_tokens - Anfang und Ende bleiben erhalten"""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    max_chars = max(0, int(max_tokens * CHARS_PER_TOKEN) - len(TRUNCATION_MARKER))
+    head = max_chars * 2 // 3
+    tail = max_chars - head
+    return text[:head] + TRUNCATION_MARKER + (text[-tail:] if tail else "")
+
+
+def build_history_window(history, message, bias="", num_ctx=4096, reserve_tokens=512):
+    """Baut die an das Model gesendeten Messages passend zum Kontextfenster
+
+    BIAS und aktuelle User-Message sind fest gesetzt, danach werden so viele der
+    neuesten History-Einträge übernommen, wie das Budget (num_ctx minus Reserve
+    für die Antwort) zulässt. Übergroße Einzel-Messages werden gekürzt.
+
+    Args:
+        history (list): Bisherige Chat-History (user/assistant, älteste zuerst)
+        message (str): Aktuelle User-Message
+        bias (str): Session-BIAS als System-Prompt
+        num_ctx (int): Kontextgröße des Models in Token
+        reserve_tokens (int): Für die Antwort freigehaltene Token
+
+    Returns:
+        tuple: (messages, report) - messages inkl. System-Prompt und aktueller
+        User-Message, report mit dropped, truncated, used_tokens und budget
+    """
+    budget = max(MIN_TRUNCATED_TOKENS * 2, num_ctx - reserve_tokens)
+    max_message_tokens = max(MIN_TRUNCATED_TOKENS, int(budget * MAX_MESSAGE_SHARE))
+    truncated = 0
+
+    def fit(entry, limit):
+        """Liefert die Message (ggf. gekürzt auf limit Token) und ob gekürzt wurde"""
+        content = entry.get("content", "")
+        if estimate_tokens(content) + MESSAGE_OVERHEAD_TOKENS <= limit:
+            return entry, False
+        return {**entry, "content": truncate_to_tokens(content, limit - MESSAGE_OVERHEAD_TOKENS)}, True
+
+    # Fest gesetzt: BIAS und aktuelle User-Message
+    pinned_head = []
+    if bias:
+        bias_entry, was_truncated = fit({"role": "system", "content": bias}, max_message_tokens)
+        pinned_head.append(bias_entry)
+        truncated += was_truncated
+    used = sum(map(message_tokens, pinned_head))
+    user_entry, was_truncated = fit({"role": "user", "content": message}, budget - used)
+    truncated += was_truncated
+    used += message_tokens(user_entry)
+
+    # Neueste History-Einträge zuerst, bis das Budget erschöpft ist
+    window = []
+    for entry in reversed(history):
+        limit = min(max_message_tokens, budget - used)
+        if limit - MESSAGE_OVERHEAD_TOKENS < MIN_TRUNCATED_TOKENS and message_tokens(entry) > limit:
+            break
+        entry, was_truncated = fit(entry, limit)
+        tokens = message_tokens(entry)
+        if tokens > budget - used:
+            break
+        window.append(entry)
+        used += tokens
+        truncated += was_truncated
+
+    report = {
+        "dropped": len(history) - len(window),
+        "truncated": truncated,
+        "used_tokens": used,
+        "budget": budget,
+    }
+    return pinned_head + list(reversed(window)) + [user_entry], report
+
+
+def format_window_report(report):
+    """Hinweistext für den User, falls History weggelassen oder gekürzt wurde"""
+    parts = []
+    if report.get("dropped"):
+        parts.append(f"{report['dropped']} older messages omitted")
+    if report.get("truncated"):
+        parts.append(f"{report['truncated']} messages shortened")
+    if not parts:
+        return ""
+    return (f"✂️ Context window: {', '.join(parts)} "
+            f"(≈{report['used_tokens']}/{report['budget']} tokens)")
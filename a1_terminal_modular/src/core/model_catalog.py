@@ -0,0 +1,191 @@
+"""Lokaler Cache des Ollama-Registry-Katalogs (Download-List)
+
+Der Katalog wird mit Zeitstempel, ETag und Last-Modified auf der Platte
+gehalten und beim Start sofort ausgeliefert. Das Neu-Validieren gegen die
+Registry läuft als Task in der Metadata-Lane der App, über den gemeinsamen
+httpx-Pool und mit bedingten Requests (If-None-Match / If-Modified-Since) -
+ein unveränderter Katalog kostet nur eine 304-Antwort.
+Fehlschläge werden mit exponentiell wachsender Pause wiederholt, im
+Offline-Modus wird das Netzwerk nie angefasst.
+"""
+
+import json
+import os
+import threading
+import time
+
+import httpx
+
+REGISTRY_CATALOG_URL = "https://registry.ollama.ai/v2/_catalog"
+# Größen-Varianten, mit denen jedes Registry-Repository in der Download-List erscheint
+CATALOG_VARIANTS = (":7b", ":13b", ":34b", ":70b")
+BACKOFF_INITIAL_SECONDS = 30.0
+BACKOFF_MAX_SECONDS = 6 * 3600.0
+
+
+def expand_catalog(repositories):
+    """Repository-Namen plus beliebte Größen-Varianten, sortiert"""
+    expanded_models = set()
+    for model in repositories:
+        expanded_models.add(model)
+        for size in CATALOG_VARIANTS:
+            expanded_models.add(f"{model}{size}")
+    return sorted(expanded_models)
+
+
+class ModelCatalog:
+    """Registry-Katalog mit Platten-Cache, Hintergrund-Revalidierung und Backoff
+
+    models() liefert immer sofort (Cache, sonst None) und macht nie Netzwerk.
+    Einen eigenen Thread hat der Katalog nicht: der Aufrufer führt revalidate()
+    in einem Worker aus und plant die nächste Prüfung nach
+    seconds_until_next_check() (max_age bzw. Ablauf des Backoffs).
+
+    Args:
+        http (httpx.Client): gemeinsamer Client (Connection-Pool) für die Registry-Requests
+    """
+
+    def __init__(self, cache_path, http=None, offline=False, max_age=24 * 3600.0,
+                 timeout=10.0, connect_timeout=5.0):
+        self.cache_path = cache_path
+        self.http = http or httpx.Client()
+        self.offline = offline
+        self.max_age = max_age
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+
+        self._lock = threading.Lock()
+        self._revalidating = False
+        self._failures = 0
+        self._next_attempt = 0.0   # monotonic: vorher kein neuer Versuch (Backoff)
+        self._entry = self._load()
+        self._expanded = None
+
+    # ---------- Platten-Cache ----------
+
+    def _load(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            if isinstance(entry.get("repositories"), list):
+                return entry
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"⚠️ Model catalog cache unreadable: {e}")
+        return None
+
+    def _save(self, entry):
+        try:
+            tmp_path = self.cache_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self.cache_path)
+        except Exception as e:
+            print(f"⚠️ Model catalog cache not saved: {e}")
+
+    # ---------- Abfragen ----------
+
+    def models(self):
+        """Gecachte Download-List (mit Varianten) oder None, falls noch nie geladen"""
+        with self._lock:
+            if self._entry is None:
+                return None
+            if self._expanded is None:
+                self._expanded = expand_catalog(self._entry["repositories"])
+            return self._expanded
+
+    def age(self):
+        """Sekunden seit der letzten erfolgreichen Validierung (None ohne Cache)"""
+        with self._lock:
+            entry = self._entry
+        if entry is None:
+            return None
+        return max(0.0, time.time() - entry.get("fetched_at", 0))
+
+    def seconds_until_next_check(self):
+        """Wann revalidate() wieder etwas tun würde (0 = jetzt, None = nie/offline)"""
+        if self.offline:
+            return None
+        with self._lock:
+            backoff = self._next_attempt - time.monotonic()
+        if backoff > 0:
+            return backoff
+        age = self.age()
+        return 0.0 if age is None else max(0.0, self.max_age - age)
+
+    # ---------- Revalidierung ----------
+
+    def revalidate(self, force=False):
+        """Gleicht den Cache mit der Registry ab (blockierend, im Worker-Thread aufrufen)
+
+        Args:
+            force (bool): auch einen noch frischen Cache prüfen (Refresh-Button;
+                der Backoff nach Fehlern gilt weiter)
+
+        Returns:
+            bool: True wenn sich die List geändert hat
+        """
+        if self.offline:
+            return False
+        with self._lock:
+            if self._revalidating or time.monotonic() < self._next_attempt:
+                return False
+            entry = self._entry
+            if not force and entry is not None and \
+                    time.time() - entry.get("fetched_at", 0) < self.max_age:
+                return False
+            self._revalidating = True
+
+        try:
+            return self._fetch(entry)
+        finally:
+            with self._lock:
+                self._revalidating = False
+
+    def _fetch(self, entry):
+        headers = {
+            'User-Agent': 'A1-Terminal/1.0',
+            'Accept': 'application/json'
+        }
+        if entry is not None:
+            if entry.get("etag"):
+                headers["If-None-Match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            response = self.http.get(REGISTRY_CATALOG_URL, headers=headers, timeout=self.timeout)
+            if response.status_code == 304 and entry is not None:
+                # Unverändert: nur den Zeitstempel erneuern
+                updated = dict(entry, fetched_at=time.time())
+                changed = False
+            elif response.status_code == 200:
+                repositories = response.json().get('repositories', [])
+                updated = {
+                    "fetched_at": time.time(),
+                    "etag": response.headers.get("ETag"),
+                    "last_modified": response.headers.get("Last-Modified"),
+                    "repositories": repositories
+                }
+                changed = entry is None or entry.get("repositories") != repositories
+            else:
+                raise RuntimeError(f"HTTP {response.status_code}")
+        except Exception as e:
+            self._record_failure(e)
+            return False
+
+        with self._lock:
+            self._entry = updated
+            if changed:
+                self._expanded = None
+            self._failures = 0
+            self._next_attempt = 0.0
+        self._save(updated)
+        return changed
+
+    def _record_failure(self, error):
+        with self._lock:
+            self._failures += 1
+            delay = min(BACKOFF_MAX_SECONDS, BACKOFF_INITIAL_SECONDS * 2 ** (self._failures - 1))
+            self._next_attempt = time.monotonic() + delay
+        print(f"⚠️ Model catalog revalidation failed ({error}), next attempt in {delay:.0f}s")
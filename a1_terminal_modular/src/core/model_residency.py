@@ -0,0 +1,127 @@
+"""Welche Modelle Ollama im Speicher hält (/api/ps) - Anzeige und Entlade-Policy
+
+Der Zustand wird nur im Tk-Main-Thread verändert (Poll-Ergebnisse kommen per
+call_soon), deshalb ohne Lock. Entladen werden nur Modelle, die die App selbst
+benutzt oder vorgeladen hat - was andere Clients geladen haben, bleibt Ollamas
+eigenem keep_alive überlassen.
+"""
+
+import time
+from datetime import datetime
+
+BYTES_PER_GB = 1024 ** 3
+
+
+class LoadedModel:
+    """Ein Eintrag aus /api/ps"""
+
+    __slots__ = ("name", "size", "size_vram", "expires_at")
+
+    def __init__(self, entry):
+        self.name = entry.get("name") or entry.get("model", "?")
+        self.size = entry.get("size") or 0
+        self.size_vram = entry.get("size_vram") or 0
+        self.expires_at = entry.get("expires_at")
+
+    def describe(self):
+        """Kurzanzeige: Name • RAM • GPU-Anteil • entladen um"""
+        parts = [self.name, f"{self.size / BYTES_PER_GB:.1f} GB"]
+        if self.size:
+            share = self.size_vram / self.size
+            parts.append(f"GPU {share:.0%}" if share else "CPU")
+        expires = _format_expiry(self.expires_at)
+        if expires:
+            parts.append(f"until {expires}")
+        return " • ".join(parts)
+
+
+def _format_expiry(expires_at):
+    if not expires_at:
+        return ""
+    try:
+        return datetime.fromisoformat(expires_at).astimezone().strftime("%H:%M")
+    except (TypeError, ValueError):
+        # Nanosekunden o.ä., die fromisoformat nicht kennt
+        return ""
+
+
+class ModelResidency:
+    """Geladene Modelle plus Leerlauf-Zeiten der von der App benutzten Modelle
+
+    Args:
+        idle_unload_seconds (float): benutzte Modelle nach dieser Leerlaufzeit entladen (0 = nie)
+        max_loaded (int): höchstens so viele geladene Modelle, ältere zuerst entladen (0 = egal)
+    """
+
+    def __init__(self, idle_unload_seconds=600.0, max_loaded=0):
+        self.idle_unload_seconds = idle_unload_seconds
+        self.max_loaded = max_loaded
+        self.loaded = []          # LoadedModel aus der letzten /api/ps-Antwort
+        self.updated_at = None    # monotonic, None = noch nie abgefragt
+        self.reachable = False
+        self._last_used = {}      # model -> monotonic (nur von der App benutzte Modelle)
+
+        # Statistik
+        self.preloads = 0
+        self.unloads = 0
+
+    def touch(self, model_name):
+        """Model wurde gerade benutzt (Auswahl, Preload, Generierung)"""
+        if model_name:
+            self._last_used[model_name] = time.monotonic()
+
+    def update(self, entries):
+        """Übernimmt die Antwort von /api/ps (None = Ollama nicht erreichbar)"""
+        self.updated_at = time.monotonic()
+        self.reachable = entries is not None
+        self.loaded = [LoadedModel(entry) for entry in entries or []]
+
+    def is_loaded(self, model_name):
+        return any(model.name == model_name for model in self.loaded)
+
+    def select_unloads(self, keep=(), now=None):
+        """Modelle, die laut Policy entladen werden sollen
+
+        Args:
+            keep: Modelle, die gerade gebraucht werden (gewähltes Model, laufende Anfragen)
+
+        Returns:
+            list: Model-Namen; sie gelten danach als nicht mehr von der App benutzt
+        """
+        now = time.monotonic() if now is None else now
+        candidates = sorted(
+            (model.name for model in self.loaded
+             if model.name in self._last_used and model.name not in keep),
+            key=lambda name: self._last_used[name]
+        )
+
+        unloads = []
+        if self.idle_unload_seconds:
+            unloads = [name for name in candidates
+                       if now - self._last_used[name] >= self.idle_unload_seconds]
+        if self.max_loaded:
+            # Über dem Limit: zusätzlich die am längsten ungenutzten entladen
+            excess = len(self.loaded) - len(unloads) - self.max_loaded
+            for name in candidates:
+                if excess <= 0:
+                    break
+                if name not in unloads:
+                    unloads.append(name)
+                    excess -= 1
+
+        for name in unloads:
+            del self._last_used[name]
+        return unloads
+
+    def format_status(self):
+        """Anzeige der geladenen Modelle (eine Zeile pro Model)"""
+        if self.updated_at is None:
+            return ""
+        if not self.reachable:
+            return "🧠 Loaded models: unknown (Ollama not reachable)"
+        if not self.loaded:
+            return "🧠 No model loaded"
+        total = sum(model.size for model in self.loaded) / BYTES_PER_GB
+        lines = [f"🧠 Loaded ({total:.1f} GB):"]
+        lines.extend(f"   {model.describe()}" for model in self.loaded)
+        return "\n".join(lines)
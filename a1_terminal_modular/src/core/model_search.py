@@ -0,0 +1,123 @@
+"""Suchindex für Model-Listen (Type-ahead im ModelInfoDropdown)
+
+Der Index wird einmal pro Model-Liste aufgebaut (Namen, Familie, Größen-Tag
+und Info-Text kleingeschrieben), die Suche selbst ist dann nur noch
+String-Vergleiche. Wird die Suchanfrage verlängert (Tippen), wird nur im
+vorherigen Ergebnis weitergefiltert statt wieder im ganzen Katalog.
+"""
+
+
+def model_info_text(model_info):
+    """Info-Zeile eines Models (📦 Größe • 🔢 Parameter • 🏷️ Typ)"""
+    size = model_info.get("size", "?")
+    param_count = model_info.get("parameters", "")
+    model_type = model_info.get("type", "")
+
+    info_parts = []
+    if size:
+        info_parts.append(f"📦 {size}")
+    if param_count:
+        info_parts.append(f"🔢 {param_count}")
+    if model_type:
+        info_parts.append(f"🏷️ {model_type}")
+
+    return " • ".join(info_parts) if info_parts else "Model available"
+
+
+def is_subsequence(needle, haystack):
+    """True wenn alle Zeichen von needle in dieser Reihenfolge in haystack vorkommen"""
+    position = 0
+    for char in needle:
+        position = haystack.find(char, position) + 1
+        if position == 0:
+            return False
+    return True
+
+
+class _IndexEntry:
+    __slots__ = ("position", "name", "info", "info_text", "name_lower",
+                 "family", "tag", "compact", "details")
+
+    def __init__(self, position, name, info):
+        self.position = position
+        self.name = name
+        self.info = info
+        self.info_text = model_info_text(info)
+        self.name_lower = name.lower()
+        family, _, tag = self.name_lower.partition(":")
+        self.family = family
+        self.tag = tag
+        # Familie + Größe ohne Trenner für unscharfe Treffer wie "cl13" -> codellama:13b
+        self.compact = family + tag
+        self.details = " ".join(
+            str(info.get(key, "")) for key in ("size", "parameters")
+        ).lower()
+
+
+class ModelSearchIndex:
+    """Vorberechneter Index über ein models_dict ({name: {"size", "parameters", "type"}})
+
+    Jedes Wort der Anfrage muss treffen. Rangfolge pro Wort: Name beginnt
+    damit, Familie/Größe beginnt damit, Teilstring im Namen, Teilstring in
+    Größenangabe, unscharf (Buchstabenfolge in Familie + Größe). Bei gleichem
+    Rang bleibt die ursprüngliche Reihenfolge der Liste erhalten.
+    """
+
+    def __init__(self, models_dict=None):
+        self.entries = [
+            _IndexEntry(position, name, info or {})
+            for position, (name, info) in enumerate((models_dict or {}).items())
+        ]
+        self._last_query = None
+        self._last_matches = self.entries   # Treffer der letzten Anfrage (Listenreihenfolge)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _token_rank(entry, token):
+        if entry.name_lower.startswith(token):
+            return 0
+        if entry.family.startswith(token) or entry.tag.startswith(token):
+            return 1
+        if token in entry.name_lower:
+            return 2
+        if token in entry.details:
+            return 3
+        if is_subsequence(token, entry.compact):
+            return 4
+        return None
+
+    def search(self, query):
+        """Liefert die passenden Index-Einträge, beste Treffer zuerst"""
+        query = query.strip().lower()
+        if not query:
+            self._last_query = None
+            self._last_matches = self.entries
+            return self.entries
+
+        # Alle Kriterien werden mit längerer Anfrage nur strenger - die
+        # vorherigen Treffer reichen als Kandidaten (inkrementelle Suche)
+        if self._last_query and query.startswith(self._last_query):
+            candidates = self._last_matches
+        else:
+            candidates = self.entries
+
+        tokens = query.split()
+        matches = []
+        ranked = []
+        for entry in candidates:
+            score = 0
+            for token in tokens:
+                rank = self._token_rank(entry, token)
+                if rank is None:
+                    break
+                score += rank
+            else:
+                matches.append(entry)
+                ranked.append((score, entry.position, entry))
+
+        self._last_query = query
+        self._last_matches = matches
+        ranked.sort(key=lambda item: (item[0], item[1]))
+        return [item[2] for item in ranked]
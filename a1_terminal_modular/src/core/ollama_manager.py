@@ -1,9 +1,167 @@
 """OllamaManager für Ollama-API-Interaktionen"""
 
 import ollama
-import requests
+import httpx
+import json
+import socket
+import threading
 import time
 
+from src.core.generation_metrics import metrics_from_final_chunk
+from src.core.generation_scheduler import GenerationScheduler
+from src.core.model_catalog import ModelCatalog
+from src.core.single_flight import SingleFlight
+
+# Wie lange eine /api/tags-Antwort (z.B. vom Health-Check) wiederverwendet werden darf
+TAGS_REUSE_SECONDS = 2.0
+
+
+class ChatGeneration:
+    """Abbrechbarer Stream einer laufenden Generierung
+    
+    cancel() schließt die HTTP-Verbindung sofort (auch während Ollama noch das Model
+    lädt oder den Prompt auswertet) - Ollama bricht die Anfrage dann serverseitig ab,
+    statt bis zum nächsten Token oder zum Antwortende weiterzurechnen.
+    
+    Mit scheduler wartet der Request beim Iterieren zuerst auf einen Slot
+    (on_wait meldet Position und Wartezeit); cancel() nimmt ihn auch aus der
+    Warteschlange.
+    """
+    
+    def __init__(self, http, endpoint, payload, scheduler=None, priority="interactive", on_wait=None):
+        self._http = http
+        self.endpoint = endpoint
+        self.payload = payload
+        self.scheduler = scheduler
+        self.priority = priority
+        self.on_wait = on_wait
+        self._lock = threading.Lock()
+        self._network_stream = None
+        self._response = None
+        self._ticket = None
+        self.cancelled = False
+        self.final_chunk = None
+        self.started_at = None
+        self.ttft_ms = None
+        self.queue_ms = None
+    
+    @property
+    def metrics(self):
+        """Latenz-Metriken der Generierung (Server-Zeiten aus dem finalen Chunk + TTFT, Wartezeit)"""
+        return metrics_from_final_chunk(self.final_chunk, self.ttft_ms, self.queue_ms)
+    
+    def _trace(self, event_name, info):
+        """httpcore-Trace: merkt sich den Socket der Verbindung für cancel()"""
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self._network_stream = info.get("return_value")
+    
+    def __iter__(self):
+        """Liefert die Chunks der Antwort als Dicts"""
+        if self.cancelled:
+            return
+        ticket = None
+        if self.scheduler is not None:
+            ticket = self.scheduler.enqueue(self.payload.get("model"), self.priority, self.on_wait)
+            with self._lock:
+                self._ticket = ticket
+            if self.cancelled:
+                self.scheduler.cancel(ticket)
+            if not self.scheduler.wait(ticket):
+                return
+            if self.cancelled:
+                # Abgebrochen, nachdem das Ticket schon zugelassen war: Slot freigeben,
+                # nichts an Ollama schicken
+                self.scheduler.release(ticket)
+                return
+            if ticket.position is not None:
+                # Musste warten (sofort zugelassene Tickets bekommen keine Position)
+                self.queue_ms = ticket.wait_seconds * 1000
+        self.started_at = time.monotonic()
+        try:
+            request = self._http.build_request(
+                "POST", self.endpoint, json=self.payload,
+                extensions={"trace": self._trace}
+            )
+            response = self._http.send(request, stream=True)
+            with self._lock:
+                self._response = response
+            try:
+                if self.cancelled:
+                    return
+                if response.status_code >= 400:
+                    response.read()
+                    try:
+                        error = response.json().get("error", response.text)
+                    except ValueError:
+                        error = response.text
+                    raise ollama.ResponseError(error, response.status_code)
+                
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if "error" in chunk:
+                        raise ollama.ResponseError(chunk["error"])
+                    if "response" in chunk and "message" not in chunk:
+                        # /api/generate: gleiches Chunk-Format wie /api/chat liefern
+                        chunk["message"] = {"role": "assistant", "content": chunk["response"]}
+                    if self.ttft_ms is None and chunk.get("message", {}).get("content"):
+                        self.ttft_ms = (time.monotonic() - self.started_at) * 1000
+                    if chunk.get("done"):
+                        self.final_chunk = chunk
+                    yield chunk
+            finally:
+                response.close()
+        except Exception:
+            # Abbruch durch cancel() ist kein Fehler
+            if self.cancelled:
+                return
+            raise
+        finally:
+            if ticket is not None:
+                self.scheduler.release(ticket)
+    
+    def iter_content(self):
+        """Liefert nur die Content-Chunks der Antwort"""
+        for chunk in self:
+            content = chunk.get("message", {}).get("content", "")
+            if content:
+                yield content
+    
+    def cancel(self):
+        """Bricht die Generierung sofort ab (thread-safe, z.B. aus dem UI-Thread)"""
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            network_stream = self._network_stream
+            response = self._response
+            ticket = self._ticket
+        
+        # Noch in der Warteschlange: Platz freigeben, der Worker kehrt sofort zurück
+        if ticket is not None:
+            self.scheduler.cancel(ticket)
+        
+        # Socket hart schließen - weckt den lesenden Thread sofort und Ollama sieht den Disconnect
+        sock = None
+        if network_stream is not None:
+            try:
+                sock = network_stream.get_extra_info("socket")
+            except Exception:
+                sock = None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        elif response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+
+
 class OllamaManager:
     def _get_fallback_models(self):
         """Fallback-List mit bewährten Modellen"""
@@ -62,60 +220,226 @@ class OllamaManager:
         return categories
     """Klasse für Ollama-API-Interaktionen"""
     
-    def __init__(self):
-        self.base_url = "http://localhost:11434"
-        self.client = ollama.Client()
+    def __init__(self, base_url="http://localhost:11434", pool_size=10,
+                 connect_timeout=5.0, read_timeout=300.0, health_timeout=5.0,
+                 catalog_path="model_catalog.json", offline_mode=False,
+                 catalog_max_age=24 * 3600.0, scheduler=None, keep_alive=None):
+        self.base_url = base_url
+        self.health_timeout = health_timeout
+        # Wie lange Ollama ein Model nach einer Anfrage im Speicher hält (None = Server-Default)
+        self.keep_alive = keep_alive
+        
+        # Alle Generierungen holen sich vor dem Request einen Slot (Limits, Prioritäten)
+        self.scheduler = scheduler or GenerationScheduler()
+        
+        # Ein gemeinsamer Keep-Alive Connection-Pool für eigene REST-Calls UND ollama.Client
+        # (beide httpx-Clients teilen sich denselben Transport = dieselben TCP-Verbindungen)
+        self._transport = httpx.HTTPTransport(
+            limits=httpx.Limits(
+                max_connections=pool_size,
+                max_keepalive_connections=pool_size,
+                keepalive_expiry=60.0
+            )
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.http = httpx.Client(base_url=base_url, transport=self._transport, timeout=self.timeout)
+        self.client = ollama.Client(host=base_url, transport=self._transport, timeout=self.timeout)
+        
+        # Registry-Katalog (Download-List) aus dem Platten-Cache; die Revalidierung
+        # geht über denselben Pool (absolute URL statt base_url)
+        self.catalog = ModelCatalog(catalog_path, http=self.http, offline=offline_mode,
+                                    max_age=catalog_max_age, connect_timeout=connect_timeout)
+        
+        # Generierungen laufen auf eigenen (nicht wiederverwendeten) Verbindungen,
+        # damit cancel() den Socket jederzeit schließen kann ohne den Pool zu stören
+        self._stream_http = httpx.Client(
+            base_url=base_url,
+            transport=httpx.HTTPTransport(limits=httpx.Limits(max_keepalive_connections=0)),
+            timeout=self.timeout
+        )
+        
+        # Gleichzeitige Abfragen derselben Ressource (/api/tags, /api/show) teilen sich
+        # einen Request; die letzte /api/tags-Antwort bleibt kurz wiederverwendbar
+        self._flights = SingleFlight()
+        self._tags_lock = threading.Lock()
+        self._installed = {}     # model_name -> Eintrag aus /api/tags (mit digest)
+        
+        # /api/show-Details nach Model-Digest - ein neu gepulltes Model hat einen neuen Digest
+        self._details_lock = threading.Lock()
+        self._details_cache = {}  # digest -> details
+    
+    def close(self):
+        """Schließt den Connection-Pool"""
+        for client in (self.http, self._stream_http):
+            try:
+                client.close()
+            except Exception:
+                pass
+    
+    def _fetch_tags(self, timeout=None):
+        """Holt /api/tags (läuft schon ein Request, wird dessen Antwort geteilt)"""
+        return self._flights.do("tags", lambda: self._request_tags(timeout))
+    
+    def _request_tags(self, timeout=None):
+        """/api/tags über den gepoolten Client, merkt sich die installierten Modelle"""
+        response = self.http.get("/api/tags", timeout=timeout or self.timeout)
+        response.raise_for_status()
+        data = response.json()
+        installed = {model['name']: model for model in data.get('models', [])}
+        with self._tags_lock:
+            self._installed = installed
+        
+        # Details gelöschter oder überschriebener Modelle verwerfen
+        digests = {model.get('digest') for model in installed.values()}
+        with self._details_lock:
+            for digest in [d for d in self._details_cache if d not in digests]:
+                del self._details_cache[digest]
+        return data
+    
+    def _get_tags(self, max_age=TAGS_REUSE_SECONDS):
+        """Gibt die /api/tags-Antwort back - frische Antworten werden wiederverwendet"""
+        return self._flights.do("tags", self._request_tags, fresh_for=max_age)
+    
+    def _invalidate_tags(self):
+        """Verwirft die gemerkte /api/tags-Antwort (nach Download/Delete)"""
+        self._flights.forget("tags")
     
     def is_ollama_running(self):
-        """Prüft ob Ollama running"""
+        """Prüft ob Ollama running (Antwort is being für get_available_models wiederverwendet)"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return response.status_code == 200
-        except:
+            self._fetch_tags(timeout=self.health_timeout)
+            return True
+        except Exception:
             return False
     
     def get_available_models(self):
         """Holt verfügbare Modelle"""
         try:
-            if not self.is_ollama_running():
-                return []
-            response = requests.get(f"{self.base_url}/api/tags")
-            if response.status_code == 200:
-                data = response.json()
-                return [model['name'] for model in data.get('models', [])]
-            return []
+            data = self._get_tags()
+            return [model['name'] for model in data.get('models', [])]
         except Exception as e:
             print(f"Error beim Abrufen der Modelle: {e}")
             return []
     
+    def _installed_entry(self, model_name):
+        """/api/tags-Eintrag eines installierten Models (None wenn nicht installiert)"""
+        with self._tags_lock:
+            entry = self._installed.get(model_name)
+        if entry is None and self._flights.peek("tags") is None:
+            try:
+                self._get_tags()
+            except Exception:
+                return None
+            with self._tags_lock:
+                entry = self._installed.get(model_name)
+        return entry
+    
+    def cached_model_details(self, model_name):
+        """Details aus dem Cache (ohne Netzwerk) oder None"""
+        with self._tags_lock:
+            entry = self._installed.get(model_name)
+        if not entry or not entry.get('digest'):
+            return None
+        with self._details_lock:
+            return self._details_cache.get(entry['digest'])
+    
+    def get_model_details(self, model_name):
+        """Details eines Models (/api/show plus size/modified_at/digest aus /api/tags)
+        
+        Installierte Modelle werden nach Digest gecacht; ein Cache-Treffer kostet
+        keinen Request. Wirft bei Verbindungs- oder HTTP-Fehlern.
+        """
+        entry = self._installed_entry(model_name)
+        digest = entry.get('digest') if entry else None
+        if digest:
+            with self._details_lock:
+                details = self._details_cache.get(digest)
+            if details is not None:
+                return details
+        
+        # Panel und Prewarm fragen oft gleichzeitig nach demselben Model
+        details = self._flights.do(("show", model_name), lambda: self._request_show(model_name),
+                                   remember=False)
+        if entry:
+            details = dict(details)
+            for key in ("size", "modified_at", "digest"):
+                if key in entry:
+                    details.setdefault(key, entry[key])
+        if digest:
+            with self._details_lock:
+                self._details_cache[digest] = details
+        return details
+    
+    def _request_show(self, model_name):
+        response = self.http.post("/api/show", json={"model": model_name})
+        response.raise_for_status()
+        return response.json()
+    
+    def prewarm_model_details(self, model_names=None):
+        """Lädt die Details aller (oder der angegebenen) installierten Modelle in den Cache"""
+        if model_names is None:
+            with self._tags_lock:
+                model_names = list(self._installed)
+        for model_name in model_names:
+            if self.cached_model_details(model_name) is not None:
+                continue
+            try:
+                self.get_model_details(model_name)
+            except Exception as e:
+                print(f"⚠️ Model details for {model_name} not prefetched: {e}")
+    
+    def list_running_models(self):
+        """Modelle, die Ollama gerade im Speicher hält (/api/ps, inkl. size/size_vram/expires_at)"""
+        def request():
+            response = self.http.get("/api/ps", timeout=self.health_timeout)
+            response.raise_for_status()
+            return response.json().get("models", [])
+        return self._flights.do("ps", request, remember=False)
+    
+    def preload_model(self, model_name, priority="background"):
+        """Lädt ein Model per leerer Generierung in den Speicher (blockierend)
+        
+        Läuft wie jede Generierung über den Scheduler, damit das Laden kein
+        anderes, gerade generierendes Model verdrängt.
+        
+        Returns:
+            ChatGeneration: abgeschlossenes Handle (metrics["load_ms"] = Ladezeit)
+        """
+        payload = {"model": model_name, "stream": True}
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        generation = ChatGeneration(self._stream_http, "/api/generate", payload,
+                                    scheduler=self.scheduler, priority=priority)
+        for _ in generation:
+            pass
+        return generation
+    
+    def unload_model(self, model_name):
+        """Entlädt ein Model sofort aus Ollamas Speicher (keep_alive=0)"""
+        response = self.http.post(
+            "/api/generate", json={"model": model_name, "keep_alive": 0}, timeout=self.timeout
+        )
+        response.raise_for_status()
+    
     def get_all_ollama_models(self):
-        """Holt alle verfügbaren Ollama-Modelle direkt von der offiziellen API"""
-        try:
-            # Versuche zuerst die offizielle Ollama Library API
-            url = "https://registry.ollama.ai/v2/_catalog"
-            headers = {
-                'User-Agent': 'A1-Terminal/1.0',
-                'Accept': 'application/json'
-            }
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                models = data.get('repositories', [])
-                # Erweitere mit beliebten Varianten falls available
-                expanded_models = []
-                for model in models:
-                    expanded_models.append(model)
-                    for size in [':7b', ':13b', ':34b', ':70b']:
-                        variant = f"{model}{size}"
-                        if variant not in expanded_models:
-                            expanded_models.append(variant)
-                return sorted(expanded_models)
-            else:
-                # Fallback auf bewährte Model-List
-                return self._get_fallback_models()
-        except Exception as e:
-            print(f"Error beim Abrufen der Live-Modelle: {e}")
-            return self._get_fallback_models()
+        """Alle Ollama-Modelle für die Download-List - sofort, ohne Netzwerk
+        
+        Kommt aus dem Platten-Cache des Registry-Katalogs; ohne Cache (erster Start,
+        Offline-Modus) die Fallback-List. Aktualisiert wird über revalidate_catalog().
+        """
+        return self.catalog.models() or self._get_fallback_models()
+    
+    def revalidate_catalog(self, force=False):
+        """Gleicht den Katalog mit der Registry ab (blockierend, Worker-Thread)
+        
+        Returns:
+            bool: True wenn sich die Download-List geändert hat
+        """
+        return self.catalog.revalidate(force=force)
+    
+    def catalog_check_delay(self):
+        """Sekunden bis zur nächsten fälligen Katalog-Prüfung (None = offline, nie)"""
+        return self.catalog.seconds_until_next_check()
     
     def download_model(self, model_name, progress_callback=None, parent_messenger=None):
         """Lädt ein Model mit optimierter Performance, detailliertem Logging und Stop-Funktionalität herunter"""
@@ -209,6 +533,7 @@ class OllamaManager:
                 
                 # Erfolgs-Check
                 if chunk.get('status') == 'success':
+                    self._invalidate_tags()
                     elapsed_time = time.time() - start_time
                     print(f"✅ DOWNLOAD COMPLETE: {model_name}")
                     print(f"⏱️  Total time: {elapsed_time:.1f}s ({elapsed_time/60:.1f}min)")
@@ -230,10 +555,12 @@ class OllamaManager:
     def delete_model(self, model_name):
         """Löscht ein Model"""
         try:
-            url = f"{self.base_url}/api/delete"
             data = {"name": model_name}
-            response = requests.delete(url, json=data)
-            return response.status_code == 200
+            response = self.http.request("DELETE", "/api/delete", json=data)
+            if response.status_code == 200:
+                self._invalidate_tags()
+                return True
+            return False
         except Exception as e:
             print(f"Error beim Delete: {e}")
             return False
@@ -242,23 +569,48 @@ class OllamaManager:
         """Alias für get_available_models"""
         return self.get_available_models()
     
-    def chat_stream(self, model_name, messages):
-        """Stream-Chat mit einem Model - gibt nur Content-Chunks back"""
-        try:
-            response = self.client.chat(
-                model=model_name,
-                messages=messages,
-                stream=True
-            )
-            
-            for chunk in response:
-                if 'message' in chunk:
-                    content = chunk['message'].get('content', '')
-                    if content:
-                        yield content
-        except Exception as e:
-            print(f"Chat-Stream-Error: {e}")
-            yield ""
+    def chat_stream(self, model_name, messages, options=None, priority="interactive", on_wait=None):
+        """Stream-Chat mit einem Model - gibt ein abbrechbares ChatGeneration-Handle back
+        
+        Die Content-Chunks liefert handle.iter_content(), handle.cancel() bricht ab.
+        options werden unverändert an Ollama weitergereicht (z.B. num_ctx).
+        priority/on_wait gehen an den Scheduler (siehe GenerationScheduler.enqueue).
+        """
+        payload = {
+            "model": model_name,
+            "messages": messages,
+            "stream": True
+        }
+        if options:
+            payload["options"] = options
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return ChatGeneration(self._stream_http, "/api/chat", payload,
+                              scheduler=self.scheduler, priority=priority, on_wait=on_wait)
+    
+    def generate_with_context(self, model_name, prompt, system=None, context=None, options=None,
+                              priority="interactive", on_wait=None):
+        """Generierung über /api/generate mit Ollama-Kontext-State
+        
+        Mit dem context-Array einer früheren Antwort setzt Ollama direkt auf dem
+        gecachten Zustand auf, statt die gesamte Historie erneut auszuwerten.
+        Der neue Kontext steht nach dem Stream in handle.final_chunk["context"].
+        """
+        payload = {
+            "model": model_name,
+            "prompt": prompt,
+            "stream": True
+        }
+        if system:
+            payload["system"] = system
+        if context:
+            payload["context"] = context
+        if options:
+            payload["options"] = options
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        return ChatGeneration(self._stream_http, "/api/generate", payload,
+                              scheduler=self.scheduler, priority=priority, on_wait=on_wait)
     
     def download_model_stream(self, model_name):
         """Download eines Modells mit Progress-Stream"""
@@ -270,7 +622,8 @@ class OllamaManager:
             print(f"Download-Error: {e}")
             yield {"status": "error", "error": str(e)}
     
-    def chat_with_model(self, model_name, message, chat_history=None):
+    def chat_with_model(self, model_name, message, chat_history=None, options=None,
+                        priority="interactive", on_wait=None):
         """Chat mit einem Model mit Anti-Redundanz Konsolen-Output"""
         import sys
         try:
@@ -280,16 +633,14 @@ class OllamaManager:
             # Startmeldung in Konsole
             print(f"\n🤖 {model_name}: ", end="", flush=True)
             
-            response = self.client.chat(
-                model=model_name,
-                messages=messages,
-                stream=True
-            )
+            generation = self.chat_stream(model_name, messages, options=options,
+                                          priority=priority, on_wait=on_wait)
             
             # Anti-Redundanz Wrapper
             class AntiRedundancyWrapper:
-                def __init__(self, response_stream):
-                    self.response_stream = response_stream
+                def __init__(self, generation):
+                    self.generation = generation
+                    self.response_stream = iter(generation)
                     self.total_content = ""
                     self.last_display = ""
                     self.char_count = 0
@@ -297,6 +648,15 @@ class OllamaManager:
                 def __iter__(self):
                     return self
                 
+                def cancel(self):
+                    """Bricht die zugrundeliegende Generierung sofort ab"""
+                    self.generation.cancel()
+                
+                @property
+                def metrics(self):
+                    """Latenz-Metriken der Generierung (TTFT, Tokens/s, Prompt-Eval, Load)"""
+                    return self.generation.metrics
+                
                 def __next__(self):
                     try:
                         chunk = next(self.response_stream)
@@ -344,7 +704,7 @@ class OllamaManager:
                             print("✓")
                         raise
             
-            return AntiRedundancyWrapper(response)
+            return AntiRedundancyWrapper(generation)
             
         except Exception as e:
             print(f"\n❌ Error beim Chat: {e}")
@@ -0,0 +1,146 @@
+"""Write-Behind-Worker: Session-Saves im Hintergrund statt im Tk-Main-Thread"""
+
+import copy
+import threading
+
+
+def session_snapshot(session_data):
+    """Kopie einer Session, die der Main-Thread danach gefahrlos weiter ändern kann
+
+    Jedes Message-Dict wird kopiert: add_to_chat ändert z.B. zusammengefasste
+    System-Messages im Main-Thread, während der Worker schreibt. Die Werte einer
+    Message (Text, Timestamp, metrics) werden nur ersetzt, nie verändert - flach
+    kopieren reicht. Die kleinen Metadaten (z.B. model_stats) werden tief kopiert.
+    """
+    snapshot = {}
+    for key, value in session_data.items():
+        if key == "messages":
+            snapshot[key] = [dict(message) for message in value]
+        else:
+            snapshot[key] = copy.deepcopy(value)
+    return snapshot
+
+
+class PersistenceWorker:
+    """Schreibt markierte Sessions im Hintergrund
+
+    submit() merkt sich pro Session nur den neuesten Stand: Kommen mehrere Saves,
+    bevor der Worker dazu kommt, is being nur der letzte geschrieben. release()
+    is being in derselben Reihenfolge nach dem Schreiben ausgeführt.
+
+    Mit runtime läuft das Schreiben als Task in der Lane "persistence" der
+    TaskRuntime (höchstens ein Drain-Task gleichzeitig), sonst in einem eigenen
+    Thread.
+    """
+
+    def __init__(self, write, release=None, on_error=None, runtime=None):
+        self.write = write
+        self.release_fn = release
+        self.on_error = on_error
+
+        self._cond = threading.Condition()
+        self._pending = {}  # session_id -> {"data": ..., "release": bool}
+        self._busy = False
+        self._closed = False
+        self._scheduled = False
+        self.runtime = runtime
+
+        # Statistik: angefragte vs. tatsächlich geschriebene Saves
+        self.submitted = 0
+        self.written = 0
+
+        self._thread = None
+        if runtime is None:
+            self._thread = threading.Thread(target=self._run, name="session-persistence", daemon=True)
+            self._thread.start()
+
+    def submit(self, session_id, session_data):
+        """Markiert eine Session als dirty (Main-Thread, kehrt sofort zurück)"""
+        snapshot = session_snapshot(session_data)
+        with self._cond:
+            entry = self._pending.setdefault(session_id, {"data": None, "release": False})
+            entry["data"] = snapshot
+            entry["release"] = False
+            self.submitted += 1
+            self._cond.notify()
+            self._schedule_drain()
+
+    def release(self, session_id):
+        """Gibt den Store-Zustand einer Session frei, sobald ihre Saves geschrieben sind"""
+        with self._cond:
+            entry = self._pending.setdefault(session_id, {"data": None, "release": False})
+            entry["release"] = True
+            self._cond.notify()
+            self._schedule_drain()
+
+    def discard(self, session_id):
+        """Verwirft noch nicht geschriebene Saves einer Session (z.B. vor dem Delete)"""
+        with self._cond:
+            self._pending.pop(session_id, None)
+
+    def _schedule_drain(self):
+        """Plant einen Drain-Task in der Runtime ein (mit gehaltenem _cond)"""
+        if self.runtime is None or self._scheduled:
+            return
+        self._scheduled = True
+        self.runtime.submit("persistence", self._drain, name="session-persistence")
+
+    def _drain(self):
+        """Runtime-Task: schreibt, bis nichts mehr aussteht"""
+        while True:
+            with self._cond:
+                if not self._pending:
+                    self._scheduled = False
+                    self._cond.notify_all()
+                    return
+                batch = self._pending
+                self._pending = {}
+                self._busy = True
+            self._write_batch(batch)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                batch = self._pending
+                self._pending = {}
+                self._busy = True
+            self._write_batch(batch)
+
+    def _write_batch(self, batch):
+        try:
+            for session_id, entry in batch.items():
+                try:
+                    if entry["data"] is not None:
+                        self.write(entry["data"])
+                        self.written += 1
+                    if entry["release"] and self.release_fn:
+                        self.release_fn(session_id)
+                except Exception as e:
+                    if self.on_error:
+                        self.on_error(session_id, e)
+                    else:
+                        print(f"❌ Error saving session {session_id}: {e}")
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def flush(self, timeout=None):
+        """Wartet, bis alle angefragten Saves geschrieben sind"""
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._busy and not self._scheduled, timeout
+            )
+
+    def close(self, timeout=10.0):
+        """Schreibt alles Ausstehende und beendet den Worker (beim Beenden der App)"""
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,83 @@
+"""Spekulatives Prompt-Prefill, während der User tippt
+
+BIAS und History stehen schon fest, bevor die Nachricht fertig getippt ist.
+Ein Prefill schickt sie (plus den bisher getippten Text) mit num_predict=1 an
+Ollama: der Server wertet den Prompt aus und behält ihn im Prompt-Cache, beim
+Senden muss dann nur noch die neue Nachricht ausgewertet werden. Lohnt sich vor
+allem auf CPU-only-Rechnern, wo die Prompt-Auswertung langer Historien den
+Großteil der Wartezeit ausmacht.
+
+Der Zustand wird nur im Tk-Main-Thread verändert, deshalb ohne Lock.
+"""
+
+import time
+
+
+class PromptPrefill:
+    """Rate-Limit und Abbruch für Prefill-Anfragen (höchstens eine gleichzeitig)
+
+    Ein Prefill gilt für einen Schlüssel (Session, Model, BIAS, History-Länge);
+    für denselben Schlüssel wird nicht erneut vorgewärmt.
+
+    Args:
+        min_interval (float): Mindestabstand zwischen zwei Prefills (Sekunden)
+    """
+
+    def __init__(self, min_interval=10.0):
+        self.min_interval = min_interval
+        self.key = None           # Schlüssel des laufenden bzw. letzten Prefills
+        self.token = None         # CancelToken des laufenden Prefills (None = keiner läuft)
+        self.started_at = None    # monotonic
+
+        # Statistik
+        self.started = 0
+        self.completed = 0
+        self.cancelled = 0
+        self.prompt_tokens = 0
+        self.prompt_eval_ms = 0.0
+
+    @property
+    def running(self):
+        return self.token is not None
+
+    def should_start(self, key, now=None):
+        """True, wenn für key jetzt ein Prefill gestartet werden darf"""
+        if self.running or key == self.key:
+            return False
+        now = time.monotonic() if now is None else now
+        return self.started_at is None or now - self.started_at >= self.min_interval
+
+    def begin(self, key, token):
+        self.key = key
+        self.token = token
+        self.started_at = time.monotonic()
+        self.started += 1
+
+    def finish(self, token, metrics=None):
+        """Prefill beendet (Main-Thread); Ergebnisse alter Prefills werden ignoriert"""
+        if token is not self.token:
+            return
+        self.token = None
+        if metrics:
+            self.completed += 1
+            self.prompt_tokens += metrics.get("prompt_eval_count") or 0
+            self.prompt_eval_ms += metrics.get("prompt_eval_ms") or 0.0
+
+    def cancel(self):
+        """Bricht den laufenden Prefill ab (gibt auch seinen Scheduler-Slot frei)"""
+        if self.token is None:
+            return False
+        self.token.cancel()
+        self.token = None
+        # Abgebrochen heißt nicht vorgewärmt: derselbe Schlüssel darf wieder
+        self.key = None
+        self.cancelled += 1
+        return True
+
+    def format_stats(self):
+        """Statistik als Text (Debug-Dialog)"""
+        return (
+            f"   started: {self.started}, completed: {self.completed}, cancelled: {self.cancelled}\n"
+            f"   prompt tokens prefilled: {self.prompt_tokens} "
+            f"(≈{self.prompt_eval_ms / 1000:.1f}s evaluation moved before send)"
+        )
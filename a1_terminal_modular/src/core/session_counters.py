@@ -0,0 +1,109 @@
+"""Laufende Wort- und Token-Zähler pro Session
+
+Die Zähler stehen als word_count / token_count direkt in den Session-Daten und
+werden bei jeder Änderung nur um die betroffenen Messages korrigiert - die
+Session-List und die Kontext-Anzeige müssen so nie alle Messages neu zählen.
+
+word_count: Wörter aller Messages plus BIAS (wie bisher in der Session-List)
+token_count: geschätzte Token von BIAS und Chat-Messages (You/AI) inklusive
+Template-Overhead, also ungefähr das, was der Verlauf im Kontextfenster belegt
+"""
+
+from src.core.history_window import MESSAGE_OVERHEAD_TOKENS, estimate_tokens
+
+
+def count_words(text):
+    if not isinstance(text, str):
+        return 0
+    return len(text.split())
+
+
+def is_chat_sender(sender):
+    """Messages, die als Chat-History an das Model gehen (keine System-Messages)"""
+    return sender == "You" or (sender.startswith("🤖") and not sender.startswith("System"))
+
+
+def message_counts(message):
+    """(words, tokens) einer gespeicherten Message"""
+    text = message.get("message", "")
+    words = count_words(text)
+    if not is_chat_sender(message.get("sender", "")):
+        return words, 0
+    return words, estimate_tokens(text) + MESSAGE_OVERHEAD_TOKENS
+
+
+def bias_counts(bias):
+    if not bias or not bias.strip():
+        return 0, 0
+    return count_words(bias), estimate_tokens(bias) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _add(session_data, counts, sign=1):
+    words, tokens = counts
+    session_data["word_count"] = session_data.get("word_count", 0) + sign * words
+    session_data["token_count"] = session_data.get("token_count", 0) + sign * tokens
+
+
+def ensure_session_counters(session_data):
+    """Zählt einmalig komplett (alte Sessions ohne Zähler), sonst nichts zu tun"""
+    if "word_count" in session_data and "token_count" in session_data:
+        return
+    if "messages" not in session_data:
+        # Nur Metadaten im Speicher - beim nächsten Öffnen nachholen
+        return
+    words, tokens = bias_counts(session_data.get("bias", ""))
+    for message in session_data["messages"]:
+        message_words, message_tokens = message_counts(message)
+        words += message_words
+        tokens += message_tokens
+    session_data["word_count"] = words
+    session_data["token_count"] = tokens
+
+
+def append_session_message(session_data, message):
+    """Hängt eine Message an und zählt nur diese"""
+    session_data["messages"].append(message)
+    _add(session_data, message_counts(message))
+
+
+def pop_session_message(session_data, index=-1):
+    """Entfernt eine Message (Standard: die letzte) und zieht ihre Zähler ab"""
+    message = session_data["messages"].pop(index)
+    _add(session_data, message_counts(message), -1)
+    return message
+
+
+def set_session_message_text(session_data, message, text):
+    """Ändert den Text einer Message der Session (z.B. zusammengefasste System-Messages)"""
+    _add(session_data, message_counts(message), -1)
+    message["message"] = text
+    _add(session_data, message_counts(message))
+
+
+def replace_session_messages(session_data, messages):
+    """Ersetzt die Messages und korrigiert die Zähler nur um die geänderten
+
+    Gleiche Message-Anfänge (meist alles bis auf die letzten ein, zwei
+    Messages) werden übersprungen, gezählt werden nur die abweichenden Enden.
+    """
+    ensure_session_counters(session_data)
+    old_messages = session_data.get("messages", [])
+    common = 0
+    limit = min(len(old_messages), len(messages))
+    while common < limit and old_messages[common] == messages[common]:
+        common += 1
+    for message in old_messages[common:]:
+        _add(session_data, message_counts(message), -1)
+    for message in messages[common:]:
+        _add(session_data, message_counts(message))
+    session_data["messages"] = messages
+
+
+def set_session_bias(session_data, bias):
+    """Setzt den BIAS und korrigiert die Zähler um die Differenz"""
+    old_bias = session_data.get("bias", "")
+    if bias == old_bias:
+        return
+    _add(session_data, bias_counts(old_bias), -1)
+    session_data["bias"] = bias
+    _add(session_data, bias_counts(bias))
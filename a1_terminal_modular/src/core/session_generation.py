@@ -0,0 +1,48 @@
+"""Generierungs-Zustand pro Session: jede Session kann eine eigene laufende Antwort haben"""
+
+import time
+
+
+class SessionGeneration:
+    """Eine laufende Antwort einer Session
+
+    Hält alles, was vorher global am A1Terminal hing (Task, Stop-Flag, Antwort-
+    und Denk-Bubble). Model, BIAS und History werden beim Start festgehalten,
+    damit ein Session-Wechsel die laufende Anfrage nicht verändert. Die Bubbles
+    gibt es nur, solange die Session angezeigt wird - der gestreamte Text
+    sammelt sich in response_text auch im Hintergrund.
+    """
+
+    __slots__ = ("session_id", "model", "message", "bias", "history", "token", "task",
+                 "renderer", "stopped", "finished", "response_text", "response_bubble",
+                 "thinking_bubble", "thinking_message", "started_at", "queue_position",
+                 "queue_wait")
+
+    def __init__(self, session_id, model, message, bias, history, token):
+        self.session_id = session_id
+        self.model = model
+        self.message = message
+        self.bias = bias
+        self.history = history
+        self.token = token
+        self.task = None
+        self.renderer = None
+        self.stopped = False
+        self.finished = False
+        self.response_text = ""
+        self.response_bubble = None
+        self.thinking_bubble = None
+        self.thinking_message = None   # Eintrag des Denk-Indikators in den Session-Messages
+        self.started_at = time.monotonic()
+        self.queue_position = None   # Platz in der Generierungs-Warteschlange (None = läuft)
+        self.queue_wait = 0.0
+
+    @property
+    def sender(self):
+        """Absender der Antwort-Bubble"""
+        return f"🤖 {self.model}"
+
+    def stop(self):
+        """Bricht die Anfrage ab (schließt auch den HTTP-Stream)"""
+        self.stopped = True
+        self.token.cancel()
@@ -0,0 +1,114 @@
+"""Persistierter Session-Index: Metadaten aller Sessions ohne Messages"""
+
+import json
+import os
+import threading
+
+
+class SessionIndex:
+    """Hält pro Session nur die Metadaten für die Session-List
+
+    Jeder Eintrag kennt auch den aktuellen Dateinamen der Session, so dass Save,
+    Rename und Delete ohne Directory-Scan auskommen.
+
+    Die Einträge werden in sessions/session_index.json gespeichert und beim Start
+    gegen die mtimes von Snapshot und Journal geprüft. Nur Sessions, deren Dateien
+    sich seitdem geändert haben (oder neu sind), müssen geparst werden - die
+    Startzeit hängt damit nicht mehr von der Gesamtgröße aller Chats ab.
+    """
+
+    FILE_NAME = "session_index.json"
+    VERSION = 2
+    META_KEYS = (
+        "session_id", "name", "color", "model", "created_at", "last_modified",
+        "total_messages", "word_count", "token_count",
+    )
+
+    def __init__(self, sessions_dir):
+        self.sessions_dir = sessions_dir
+        self.path = os.path.join(sessions_dir, self.FILE_NAME)
+        self.entries = {}
+        self.dirty = False
+        # update() läuft im Persistence-Worker, save() im Main-Thread
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        """Liest den Index von der Platte (fehlend/defekt = leerer Index)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self.entries = data.get("sessions", {})
+        except FileNotFoundError:
+            self.entries = {}
+        except Exception as e:
+            print(f"⚠️ Session index unreadable, rebuilding: {e}")
+            self.entries = {}
+        self.dirty = False
+        return self.entries
+
+    def is_fresh(self, session_id, file_name, journal_path):
+        """Prüft, ob der Eintrag noch zu Snapshot- und Journal-File passt"""
+        entry = self.entries.get(session_id)
+        if not entry or entry.get("file") != file_name:
+            return False
+        snapshot_mtime = self._mtime(os.path.join(self.sessions_dir, file_name))
+        return (snapshot_mtime is not None
+                and entry.get("mtime") == snapshot_mtime
+                and entry.get("journal_mtime") == self._mtime(journal_path))
+
+    def file_path(self, session_id):
+        """Aktueller Snapshot-Pfad einer Session (id -> Dateiname), None wenn unbekannt"""
+        entry = self.entries.get(session_id)
+        if not entry or not entry.get("file"):
+            return None
+        return os.path.join(self.sessions_dir, entry["file"])
+
+    def metadata(self, session_id):
+        """Metadaten eines Eintrags als (messagelose) Session-Daten"""
+        entry = self.entries[session_id]
+        return {key: entry[key] for key in self.META_KEYS if key in entry}
+
+    def update(self, session_data, snapshot_path, journal_path):
+        """Übernimmt die Metadaten einer gerade gespeicherten/geladenen Session"""
+        entry = {key: session_data[key] for key in self.META_KEYS if key in session_data}
+        entry["file"] = os.path.basename(snapshot_path)
+        entry["mtime"] = self._mtime(snapshot_path)
+        entry["journal_mtime"] = self._mtime(journal_path)
+        with self._lock:
+            self.entries[session_data["session_id"]] = entry
+            self.dirty = True
+        return entry
+
+    def remove(self, session_id):
+        with self._lock:
+            if self.entries.pop(session_id, None) is not None:
+                self.dirty = True
+
+    def retain(self, session_ids):
+        """Entfernt Einträge, deren Session-File nicht mehr existiert"""
+        for session_id in set(self.entries) - set(session_ids):
+            self.remove(session_id)
+
+    def save(self):
+        """Schreibt den Index (Temp-File + os.replace), nur wenn sich etwas geändert hat"""
+        with self._lock:
+            if not self.dirty:
+                return
+            data = json.dumps({"version": self.VERSION, "sessions": self.entries}, ensure_ascii=False)
+            self.dirty = False
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(data)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            self.dirty = True
+            raise
@@ -0,0 +1,214 @@
+"""Journal-basierte Session-Persistenz (Snapshot + append-only JSONL)"""
+
+import json
+import os
+import threading
+import uuid
+
+
+def session_file_name(session_id, session_name):
+    """Dateiname des Session-Snapshots: Name am Anfang, dann _session_<SessionID>.json"""
+    safe_name = "_".join((session_name or "").split()).replace("/", "_").replace("\\", "_")
+    return f"{safe_name}_session_{session_id}.json"
+
+
+class SessionStore:
+    """Speichert Sessions als Snapshot-Datei plus Journal mit den Änderungen seitdem
+
+    Der Snapshot ist das bisherige Session-JSON. Jedes Save hängt nur noch die
+    Differenz zum zuletzt geschriebenen Stand an sessions/session_<id>.jsonl an:
+
+        {"type": "journal", "base": ...}      erste Zeile, gehört zu genau einem Snapshot
+        {"type": "header", "data": {...}}     Metadaten (alles außer messages)
+        {"type": "message", "data": {...}}    angehängte Message
+        {"type": "truncate", "count": n}      Messages ab Index n entfernt/ersetzt
+
+    Nach compact_every Journal-Einträgen (oder beim Umbenennen) is being der Stand
+    in einen neuen Snapshot geschrieben und das Journal verworfen. Load liest den
+    Snapshot und spielt das Journal darauf ab.
+    """
+
+    JOURNAL_BASE_KEY = "journal_base"
+
+    def __init__(self, sessions_dir, compact_every=200, locate=None):
+        self.sessions_dir = sessions_dir
+        self.compact_every = max(1, compact_every)
+        # locate(session_id) -> bekannter Snapshot-Pfad einer noch nicht geladenen Session
+        self.locate = locate
+        self._lock = threading.RLock()
+        # session_id -> zuletzt persistierter Stand (path, base, header, messages, records)
+        self._state = {}
+
+    def snapshot_path(self, session_data):
+        return os.path.join(
+            self.sessions_dir,
+            session_file_name(session_data["session_id"], session_data.get("name", ""))
+        )
+
+    def journal_path(self, session_id):
+        return os.path.join(self.sessions_dir, f"session_{session_id}.jsonl")
+
+    @staticmethod
+    def _header(session_data):
+        return {key: value for key, value in session_data.items() if key != "messages"}
+
+    def load(self, path):
+        """Liest einen Snapshot und spielt das zugehörige Journal ab"""
+        with open(path, "r", encoding="utf-8") as f:
+            session_data = json.load(f)
+        base = session_data.pop(self.JOURNAL_BASE_KEY, None)
+        session_id = session_data.get("session_id")
+        if not session_id:
+            return session_data
+
+        with self._lock:
+            records = self._replay(session_id, base, session_data)
+            self._state[session_id] = {
+                "path": path,
+                "base": base,
+                "header": self._header(session_data),
+                "messages": [dict(message) for message in session_data.get("messages", [])],
+                "records": records,
+            }
+        return session_data
+
+    def _replay(self, session_id, base, session_data):
+        """Wendet das Journal auf die Snapshot-Daten an, liefert die Anzahl Einträge"""
+        journal_path = self.journal_path(session_id)
+        if base is None or not os.path.exists(journal_path):
+            return 0
+
+        messages = session_data.setdefault("messages", [])
+        records = 0
+        with open(journal_path, "r", encoding="utf-8") as f:
+            for index, line in enumerate(f):
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Abgebrochener Schreibvorgang am Ende - Rest ignorieren
+                    print(f"⚠️ Journal {session_id}: incomplete entry at line {index + 1} skipped")
+                    break
+                if index == 0:
+                    if record.get("type") != "journal" or record.get("base") != base:
+                        # Journal gehört zu einem älteren Snapshot (Compaction unterbrochen)
+                        return 0
+                    continue
+
+                kind = record.get("type")
+                if kind == "message":
+                    messages.append(record["data"])
+                elif kind == "truncate":
+                    del messages[record["count"]:]
+                elif kind == "header":
+                    session_data.update(record["data"])
+                records += 1
+        return records
+
+    def save(self, session_data):
+        """Persistiert die Änderungen seit dem letzten Save als Journal-Einträge"""
+        if "messages" not in session_data:
+            # Nur Metadaten im Speicher - ein Snapshot daraus würde die Messages löschen
+            raise ValueError(f"Session {session_data['session_id']} is not loaded")
+        session_id = session_data["session_id"]
+        with self._lock:
+            state = self._state.get(session_id)
+            if (state is None or state["base"] is None
+                    or state["path"] != self.snapshot_path(session_data)):
+                # Neue, umbenannte oder alte (journal-lose) Session: vollständiger Snapshot
+                self.compact(session_data)
+                return
+
+            messages = session_data.get("messages", [])
+            persisted = state["messages"]
+            common = 0
+            limit = min(len(persisted), len(messages))
+            while common < limit and persisted[common] == messages[common]:
+                common += 1
+
+            records = []
+            if common < len(persisted):
+                records.append({"type": "truncate", "count": common})
+            for message in messages[common:]:
+                records.append({"type": "message", "data": message})
+            header = self._header(session_data)
+            if header != state["header"]:
+                records.append({"type": "header", "data": header})
+            if not records:
+                return
+
+            if state["records"] + len(records) >= self.compact_every:
+                self.compact(session_data)
+                return
+
+            journal_path = self.journal_path(session_id)
+            lines = [json.dumps(record, ensure_ascii=False) for record in records]
+            mode = "a"
+            if state["records"] == 0:
+                # Neues Journal - ein evtl. verwaistes altes Journal überschreiben
+                lines.insert(0, json.dumps({"type": "journal", "base": state["base"]}))
+                mode = "w"
+            with open(journal_path, mode, encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+            state["messages"] = persisted[:common] + [dict(message) for message in messages[common:]]
+            state["header"] = header
+            state["records"] += len(records)
+
+    def compact(self, session_data):
+        """Schreibt den kompletten Stand als neuen Snapshot und verwirft das Journal"""
+        session_id = session_data["session_id"]
+        path = self.snapshot_path(session_data)
+        base = uuid.uuid4().hex
+
+        with self._lock:
+            old_state = self._state.get(session_id)
+            snapshot = dict(session_data)
+            snapshot[self.JOURNAL_BASE_KEY] = base
+
+            # Temp-File + os.replace: ein Absturz hinterlässt nie einen halben Snapshot
+            tmp_path = path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+
+            # Ab jetzt passt ein altes Journal nicht mehr zur base und kann weg
+            try:
+                os.remove(self.journal_path(session_id))
+            except FileNotFoundError:
+                pass
+
+            # Snapshots mit altem Namen dieser Session entfernen
+            if old_state is not None:
+                old_path = old_state["path"]
+            else:
+                old_path = self.locate(session_id) if self.locate else None
+            if old_path and old_path != path:
+                try:
+                    os.remove(old_path)
+                except FileNotFoundError:
+                    pass
+
+            self._state[session_id] = {
+                "path": path,
+                "base": base,
+                "header": self._header(session_data),
+                "messages": [dict(message) for message in session_data.get("messages", [])],
+                "records": 0,
+            }
+
+    def release(self, session_id):
+        """Vergisst den persistierten Stand einer nicht mehr geöffneten Session
+        
+        Vor dem nächsten save() muss die Session wieder per load() gelesen werden.
+        """
+        with self._lock:
+            self._state.pop(session_id, None)
+
+    def delete(self, session_id):
+        """Entfernt Journal und gemerkten Stand einer gelöschten Session"""
+        with self._lock:
+            self._state.pop(session_id, None)
+            try:
+                os.remove(self.journal_path(session_id))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,85 @@
+"""Single-Flight: gleichzeitige Anfragen nach derselben Ressource teilen sich einen Request"""
+
+import threading
+import time
+
+
+class _Call:
+    __slots__ = ("done", "value", "error", "stale")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+        self.stale = False
+
+
+class SingleFlight:
+    """Fasst parallele Aufrufe pro Schlüssel zu einem zusammen
+
+    Der erste Aufrufer führt fn aus, alle weiteren warten auf genau dieses
+    Ergebnis (oder dieselbe Exception). Das letzte Ergebnis bleibt mit
+    Zeitstempel stehen; Aufrufer mit fresh_for > 0 bekommen es ohne neuen
+    Request, solange es jünger ist.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}     # key -> _Call (läuft gerade)
+        self._results = {}   # key -> (monotonic_timestamp, value)
+        self.executed = 0    # tatsächlich ausgeführte Requests
+        self.shared = 0      # Aufrufe, die ein laufendes oder frisches Ergebnis bekamen
+
+    def do(self, key, fn, fresh_for=0.0, remember=True):
+        """Führt fn() für key aus - oder schließt sich einem laufenden Aufruf an
+
+        Args:
+            fresh_for (float): gemerktes Ergebnis bis zu diesem Alter (s) ohne Request liefern
+            remember (bool): Ergebnis für spätere fresh_for-Aufrufe aufheben
+        """
+        with self._lock:
+            if fresh_for > 0:
+                cached = self._results.get(key)
+                if cached and time.monotonic() - cached[0] <= fresh_for:
+                    self.shared += 1
+                    return cached[1]
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if remember and call.error is None and not call.stale:
+                    self._results[key] = (time.monotonic(), call.value)
+            call.done.set()
+        return call.value
+
+    def peek(self, key):
+        """Letztes Ergebnis für key (ohne Request) oder None"""
+        with self._lock:
+            cached = self._results.get(key)
+        return cached[1] if cached else None
+
+    def forget(self, key):
+        """Verwirft das gemerkte Ergebnis; ein laufender Aufruf wird nicht mehr gemerkt"""
+        with self._lock:
+            self._results.pop(key, None)
+            call = self._calls.get(key)
+            if call is not None:
+                call.stale = True
@@ -0,0 +1,225 @@
+"""Optionales SQLite-Backend für Sessions (WAL + FTS5-Volltextsuche)"""
+
+import json
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    name TEXT,
+    color TEXT,
+    model TEXT,
+    created_at TEXT,
+    last_modified TEXT,
+    total_messages INTEGER,
+    word_count INTEGER,
+    token_count INTEGER,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL REFERENCES sessions(session_id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    sender TEXT,
+    timestamp TEXT,
+    message TEXT,
+    extra TEXT,
+    UNIQUE (session_id, position)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    message, content='messages', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, message) VALUES (new.id, new.message);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, message) VALUES ('delete', old.id, old.message);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_au AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, message) VALUES ('delete', old.id, old.message);
+    INSERT INTO messages_fts(rowid, message) VALUES (new.id, new.message);
+END;
+"""
+
+# Spalten der Session-Tabelle, die die Session-List ohne JSON-Parsing braucht
+META_COLUMNS = (
+    "session_id", "name", "color", "model", "created_at", "last_modified",
+    "total_messages", "word_count", "token_count",
+)
+MESSAGE_COLUMNS = ("sender", "timestamp", "message")
+
+
+def fts_query(text):
+    """Macht aus der Eingabe eine sichere FTS5-Query (alle Wörter, letztes als Präfix)"""
+    terms = [term.replace('"', '""') for term in text.split()]
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class SqliteSessionStore:
+    """Hält Sessions und Messages in einer lokalen SQLite-Datenbank
+
+    Gleiche Aufgaben wie SessionStore + SessionIndex für das JSON-Backend: Save
+    schreibt nur die geänderten Messages, die Session-List kommt aus einer
+    schmalen Tabelle, Messages werden erst beim Öffnen gelesen. Zusätzlich
+    indiziert FTS5 alle Messages für eine gerankte Suche über alle Sessions.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        # Saves laufen im Persistence-Worker, Load/Suche im Main-Thread
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        with self._conn:
+            self._conn.executescript(SCHEMA)
+            self._migrate()
+        # session_id -> zuletzt gespeicherte Messages (für die Differenz beim Save)
+        self._state = {}
+
+    def _migrate(self):
+        """Ergänzt Spalten, die ältere Datenbanken noch nicht haben"""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(sessions)")}
+        if "token_count" not in columns:
+            self._conn.execute("ALTER TABLE sessions ADD COLUMN token_count INTEGER")
+            self._conn.execute("UPDATE sessions SET token_count = json_extract(data, '$.token_count')")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def count_sessions(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def has_session(self, session_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return row is not None
+
+    def list_sessions(self):
+        """Metadaten aller Sessions (ohne Messages) für die Session-List"""
+        with self._lock:
+            rows = self._conn.execute(f"SELECT {', '.join(META_COLUMNS)} FROM sessions").fetchall()
+        return [{key: row[key] for key in META_COLUMNS if row[key] is not None} for row in rows]
+
+    def load(self, session_id):
+        """Liest eine Session vollständig inkl. Messages"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(f"Session {session_id} not found in database")
+            session_data = json.loads(row["data"])
+            messages = []
+            for message_row in self._conn.execute(
+                "SELECT sender, timestamp, message, extra FROM messages "
+                "WHERE session_id = ? ORDER BY position", (session_id,)
+            ):
+                message = json.loads(message_row["extra"]) if message_row["extra"] else {}
+                for key in MESSAGE_COLUMNS:
+                    message[key] = message_row[key]
+                messages.append(message)
+            session_data["messages"] = messages
+            self._state[session_id] = [dict(message) for message in messages]
+        return session_data
+
+    def save(self, session_data):
+        """Speichert Metadaten und nur die seit dem letzten Save geänderten Messages"""
+        if "messages" not in session_data:
+            raise ValueError(f"Session {session_data['session_id']} is not loaded")
+        session_id = session_data["session_id"]
+        messages = session_data["messages"]
+        header = {key: value for key, value in session_data.items() if key != "messages"}
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT INTO sessions ({', '.join(META_COLUMNS)}, data) "
+                f"VALUES ({', '.join('?' * (len(META_COLUMNS) + 1))}) "
+                "ON CONFLICT(session_id) DO UPDATE SET "
+                + ", ".join(f"{key} = excluded.{key}" for key in META_COLUMNS[1:] + ("data",)),
+                [header.get(key) for key in META_COLUMNS] + [json.dumps(header, ensure_ascii=False)]
+            )
+
+            persisted = self._state.get(session_id)
+            common = 0
+            if persisted is not None:
+                limit = min(len(persisted), len(messages))
+                while common < limit and persisted[common] == messages[common]:
+                    common += 1
+            self._conn.execute(
+                "DELETE FROM messages WHERE session_id = ? AND position >= ?", (session_id, common)
+            )
+            self._conn.executemany(
+                "INSERT INTO messages (session_id, position, sender, timestamp, message, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [self._message_row(session_id, position, message)
+                 for position, message in enumerate(messages[common:], start=common)]
+            )
+            self._state[session_id] = (persisted or [])[:common] + [dict(m) for m in messages[common:]]
+
+    @staticmethod
+    def _message_row(session_id, position, message):
+        extra = {key: value for key, value in message.items() if key not in MESSAGE_COLUMNS}
+        return (
+            session_id, position,
+            message.get("sender"), message.get("timestamp"), message.get("message"),
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+        )
+
+    def release(self, session_id):
+        """Vergisst die gemerkten Messages einer nicht mehr geöffneten Session"""
+        with self._lock:
+            self._state.pop(session_id, None)
+
+    def delete(self, session_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._state.pop(session_id, None)
+
+    def search(self, text, limit=50):
+        """Gerankte Volltextsuche (BM25) über die Messages aller Sessions
+
+        Returns:
+            list: Treffer als dict mit session_id, name, color, sender, timestamp, snippet
+        """
+        query = fts_query(text)
+        if not query:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT m.session_id, s.name, s.color, m.sender, m.timestamp, "
+                "snippet(messages_fts, 0, '»', '«', '…', 12) AS snippet "
+                "FROM messages_fts "
+                "JOIN messages m ON m.id = messages_fts.rowid "
+                "JOIN sessions s ON s.session_id = m.session_id "
+                "WHERE messages_fts MATCH ? ORDER BY rank LIMIT ?",
+                (query, limit)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def import_sessions(self, sessions):
+        """Übernimmt vollständige Session-Daten (z.B. aus JSON-Files), bestehende IDs bleiben
+
+        Returns:
+            int: Anzahl neu importierter Sessions
+        """
+        imported = 0
+        for session_data in sessions:
+            session_id = session_data.get("session_id")
+            if not session_id or self.has_session(session_id):
+                continue
+            self.save(session_data)
+            self.release(session_id)
+            imported += 1
+        return imported
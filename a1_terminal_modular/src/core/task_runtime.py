@@ -0,0 +1,379 @@
+"""Zentrale Task-Runtime: benannte Worker-Lanes statt Ad-hoc-Threads
+
+Jede Lane (generation, downloads, metadata, persistence, residency, prefill) hat
+eine feste Anzahl Worker-Threads und eine begrenzte Warteschlange. Ergebnisse für
+die UI laufen über eine thread-sichere Dispatch-Queue, die der Tk-Main-Thread in
+einem festen Takt abarbeitet - Worker rufen nie direkt Tk-Methoden auf.
+"""
+
+import threading
+import time
+from collections import deque
+
+# Standard-Lanes: (Worker, max. wartende Tasks, Verhalten bei voller Queue)
+DEFAULT_LANES = {
+    "generation": (4, 8, "reject"),
+    "downloads": (1, 8, "reject"),
+    "metadata": (4, 32, "drop_oldest"),
+    "persistence": (1, 64, "reject"),
+    "residency": (1, 8, "drop_oldest"),
+    "prefill": (1, 2, "drop_oldest"),
+}
+# Zeitbudget pro Dispatch-Tick, damit ein Stau die UI nicht blockiert (Sekunden)
+DISPATCH_BUDGET_SECONDS = 0.008
+
+
+class TaskCancelled(Exception):
+    """Wird von Tasks geworfen, die ihren CancelToken abgebrochen vorfinden"""
+
+
+class LaneFullError(RuntimeError):
+    """Die Warteschlange einer Lane ist voll (Overflow "reject")"""
+
+
+class CancelToken:
+    """Abbruch-Signal für einen Task
+
+    Callbacks (z.B. ChatGeneration.cancel) werden beim Abbruch sofort
+    ausgeführt - auch wenn sie erst nach dem Abbruch registriert werden.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._callbacks = []
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def cancel(self):
+        with self._lock:
+            if self._cancelled:
+                return
+            self._cancelled = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            self._run_callback(callback)
+
+    def on_cancel(self, callback):
+        with self._lock:
+            if not self._cancelled:
+                self._callbacks.append(callback)
+                return
+        self._run_callback(callback)
+
+    def raise_if_cancelled(self):
+        if self._cancelled:
+            raise TaskCancelled()
+
+    @staticmethod
+    def _run_callback(callback):
+        try:
+            callback()
+        except Exception as e:
+            print(f"⚠️ Cancel callback failed: {e}")
+
+
+class Task:
+    """Handle eines eingereichten Tasks (Status, Ergebnis, Abbruch, Zeiten)"""
+
+    __slots__ = ("name", "lane", "fn", "args", "key", "token", "submitted_at",
+                 "started_at", "finished_at", "done", "result", "error")
+
+    def __init__(self, name, lane, fn, args, key, token):
+        self.name = name
+        self.lane = lane
+        self.fn = fn
+        self.args = args
+        self.key = key
+        self.token = token
+        self.submitted_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    @property
+    def cancelled(self):
+        return self.token.cancelled
+
+    def cancel(self):
+        self.token.cancel()
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+
+class Lane:
+    """Worker-Pool mit begrenzter FIFO-Queue
+
+    Tasks mit gleichem key, die noch warten, werden zusammengefasst (der zweite
+    submit liefert den bereits wartenden Task). Bei voller Queue wird je nach
+    overflow abgelehnt (LaneFullError) oder der älteste wartende Task verworfen.
+    """
+
+    def __init__(self, name, workers, max_queue, overflow="reject"):
+        self.name = name
+        self.workers = max(1, workers)
+        self.max_queue = max(1, max_queue)
+        self.overflow = overflow
+
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._threads = []
+        self._idle = 0
+        self._running = set()
+        self._closed = False
+
+        # Statistik
+        self.submitted = 0
+        self.coalesced = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+        self._started = 0
+
+    def submit(self, task):
+        with self._cond:
+            if self._closed:
+                raise LaneFullError(f"Lane '{self.name}' is shut down")
+            if task.key is not None:
+                for queued in self._queue:
+                    if queued.key == task.key and not queued.cancelled:
+                        self.coalesced += 1
+                        return queued
+            if len(self._queue) >= self.max_queue:
+                if self.overflow != "drop_oldest":
+                    self.rejected += 1
+                    raise LaneFullError(f"Lane '{self.name}' is full ({self.max_queue} tasks queued)")
+                dropped = self._queue.popleft()
+                self.dropped += 1
+                self._finish_unrun(dropped)
+            self._queue.append(task)
+            self.submitted += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            if self._idle == 0 and len(self._threads) < self.workers:
+                thread = threading.Thread(
+                    target=self._work, name=f"{self.name}-{len(self._threads) + 1}", daemon=True
+                )
+                self._threads.append(thread)
+                thread.start()
+            else:
+                self._cond.notify()
+        return task
+
+    @property
+    def depth(self):
+        with self._cond:
+            return len(self._queue)
+
+    def _finish_unrun(self, task):
+        task.token.cancel()
+        task.finished_at = time.monotonic()
+        task.done.set()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._idle += 1
+                    self._cond.wait()
+                    self._idle -= 1
+                if not self._queue:
+                    return
+                task = self._queue.popleft()
+                if task.cancelled:
+                    self.cancelled += 1
+                    self._finish_unrun(task)
+                    continue
+                self._running.add(task)
+
+            task.started_at = time.monotonic()
+            outcome = "completed"
+            try:
+                task.result = task.fn(*task.args)
+            except TaskCancelled:
+                outcome = "cancelled"
+            except Exception as e:
+                task.error = e
+                outcome = "failed"
+                print(f"❌ Task '{task.name}' ({self.name}) failed: {e}")
+            task.finished_at = time.monotonic()
+
+            with self._cond:
+                self._running.discard(task)
+                setattr(self, outcome, getattr(self, outcome) + 1)
+                self._started += 1
+                self._wait_total += task.started_at - task.submitted_at
+                self._run_total += task.finished_at - task.started_at
+            task.done.set()
+
+    def shutdown(self, timeout=None):
+        """Verwirft wartende Tasks, bricht laufende ab und wartet auf die Worker"""
+        with self._cond:
+            self._closed = True
+            queued = list(self._queue)
+            self._queue.clear()
+            running = list(self._running)
+            self._cond.notify_all()
+        for task in queued:
+            self._finish_unrun(task)
+        for task in running:
+            task.cancel()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(None if deadline is None else max(0.0, deadline - time.monotonic()))
+
+    def stats(self):
+        with self._cond:
+            started = self._started
+            return {
+                "workers": len(self._threads),
+                "max_workers": self.workers,
+                "queued": len(self._queue),
+                "running": len(self._running),
+                "max_depth": self.max_depth,
+                "submitted": self.submitted,
+                "coalesced": self.coalesced,
+                "completed": self.completed,
+                "failed": self.failed,
+                "cancelled": self.cancelled,
+                "rejected": self.rejected,
+                "dropped": self.dropped,
+                "avg_wait_ms": self._wait_total / started * 1000 if started else 0.0,
+                "avg_run_ms": self._run_total / started * 1000 if started else 0.0,
+            }
+
+
+class TaskRuntime:
+    """Alle Worker-Lanes der App plus Dispatch-Queue in den Tk-Main-Thread
+
+    submit() reicht Arbeit in eine Lane ein, call_soon() stellt einen Aufruf
+    für den Main-Thread ein (aus jedem Thread erlaubt). Nach attach(root)
+    arbeitet ein Tk-Tick alle tick_ms die Dispatch-Queue ab.
+    """
+
+    def __init__(self, lanes=None, tick_ms=16):
+        self.lanes = {}
+        for name, (workers, max_queue, overflow) in (lanes or DEFAULT_LANES).items():
+            self.add_lane(name, workers, max_queue, overflow)
+        self.tick_ms = max(1, int(tick_ms))
+
+        self._dispatch_lock = threading.Lock()
+        self._dispatch = deque()
+        self._root = None
+        self._tick_id = None
+
+        # Statistik der Dispatch-Queue
+        self.dispatched = 0
+        self.dispatch_max_depth = 0
+        self._dispatch_latency_total = 0.0
+
+    def add_lane(self, name, workers, max_queue, overflow="reject"):
+        self.lanes[name] = Lane(name, workers, max_queue, overflow)
+        return self.lanes[name]
+
+    # ---------- Worker-Lanes ----------
+
+    def submit(self, lane, fn, *args, name=None, key=None, token=None):
+        """Reicht fn(*args) in eine Lane ein und gibt das Task-Handle zurück
+
+        Args:
+            key: wartende Tasks mit gleichem key werden zusammengefasst
+            token (CancelToken): eigener Token, wenn der Task ihn selbst prüfen soll
+        """
+        task = Task(name or getattr(fn, "__name__", "task"), lane, fn, args, key,
+                    token or CancelToken())
+        return self.lanes[lane].submit(task)
+
+    # ---------- Dispatch in den Main-Thread ----------
+
+    def call_soon(self, fn, *args):
+        """Führt fn(*args) beim nächsten Tick im Tk-Main-Thread aus (thread-safe)"""
+        with self._dispatch_lock:
+            self._dispatch.append((time.monotonic(), fn, args))
+            depth = len(self._dispatch)
+            if depth > self.dispatch_max_depth:
+                self.dispatch_max_depth = depth
+
+    def attach(self, root):
+        """Startet den Dispatch-Tick im Event-Loop von root"""
+        self._root = root
+        if self._tick_id is None:
+            self._tick_id = root.after(self.tick_ms, self._tick)
+
+    def _tick(self):
+        self._tick_id = None
+        deadline = time.monotonic() + DISPATCH_BUDGET_SECONDS
+        while True:
+            with self._dispatch_lock:
+                if not self._dispatch:
+                    break
+                queued_at, fn, args = self._dispatch.popleft()
+            now = time.monotonic()
+            self.dispatched += 1
+            self._dispatch_latency_total += now - queued_at
+            try:
+                fn(*args)
+            except Exception as e:
+                print(f"❌ UI callback {getattr(fn, '__name__', fn)} failed: {e}")
+            if time.monotonic() >= deadline:
+                # Rest im nächsten Tick, Tk soll zwischendurch zeichnen können
+                break
+        if self._root is not None:
+            self._tick_id = self._root.after(self.tick_ms, self._tick)
+
+    # ---------- Statistik & Shutdown ----------
+
+    def stats(self):
+        """Queue-Tiefen und Latenzen aller Lanes und der Dispatch-Queue"""
+        with self._dispatch_lock:
+            dispatch_depth = len(self._dispatch)
+        return {
+            "lanes": {name: lane.stats() for name, lane in self.lanes.items()},
+            "dispatch": {
+                "queued": dispatch_depth,
+                "max_depth": self.dispatch_max_depth,
+                "dispatched": self.dispatched,
+                "avg_latency_ms": (self._dispatch_latency_total / self.dispatched * 1000
+                                   if self.dispatched else 0.0),
+            },
+        }
+
+    def format_stats(self):
+        """Statistik als Text (Debug-Dialog)"""
+        stats = self.stats()
+        lines = []
+        for name, lane in stats["lanes"].items():
+            lines.append(
+                f"   {name}: {lane['running']}/{lane['max_workers']} running, "
+                f"{lane['queued']} queued (max {lane['max_depth']}) | "
+                f"✅ {lane['completed']} ❌ {lane['failed']} 🛑 {lane['cancelled']} "
+                f"⏭️ {lane['coalesced'] + lane['dropped'] + lane['rejected']} | "
+                f"wait ≈{lane['avg_wait_ms']:.0f}ms, run ≈{lane['avg_run_ms']:.0f}ms"
+            )
+        dispatch = stats["dispatch"]
+        lines.append(
+            f"   UI dispatch: {dispatch['queued']} queued (max {dispatch['max_depth']}), "
+            f"{dispatch['dispatched']} calls, latency ≈{dispatch['avg_latency_ms']:.1f}ms"
+        )
+        return "\n".join(lines)
+
+    def shutdown(self, timeout=5.0):
+        """Bricht alle Tasks ab und beendet die Worker (beim Beenden der App)"""
+        if self._root is not None and self._tick_id is not None:
+            try:
+                self._root.after_cancel(self._tick_id)
+            except Exception:
+                pass
+        self._root = None
+        deadline = time.monotonic() + timeout
+        for lane in self.lanes.values():
+            lane.shutdown(max(0.0, deadline - time.monotonic()))
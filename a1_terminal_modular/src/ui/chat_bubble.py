@@ -3,36 +3,72 @@
 import customtkinter as ctk
 from tkinter import messagebox
 
+from src.core.generation_metrics import format_metrics
+from src.ui.text_measure import text_measurer
+
+# Horizontaler Abstand zwischen Bubble-Rand und Textfläche (padx=10 je Seite + Textbox-Rand)
+TEXT_INSET_X = 2 * 10 + 12
+# CTkTextbox hat intern ca. 12px Padding
+TEXTBOX_PADDING = 12
+MIN_TEXT_HEIGHT = 50
+
+
+def bubble_style(sender, app_config):
+    """Farben und Font einer Bubble je nach Sender (You / AI / System)"""
+    if sender == "You":
+        return {
+            "bubble_color": app_config.get("user_bg_color", "#003300"),
+            "text_color": app_config.get("user_text_color", "#00FF00"),
+            "font": app_config.get("user_font", "Courier New"),
+            "font_size": app_config.get("user_font_size", 11),
+        }
+    if "🤖" in sender:
+        return {
+            "bubble_color": app_config.get("ai_bg_color", "#1E3A5F"),
+            "text_color": app_config.get("ai_text_color", "white"),
+            "font": app_config.get("ai_font", "Consolas"),
+            "font_size": app_config.get("ai_font_size", 11),
+        }
+    return {
+        "bubble_color": app_config.get("system_bg_color", "#722F37"),
+        "text_color": app_config.get("system_text_color", "white"),
+        "font": app_config.get("system_font", "Arial"),
+        "font_size": app_config.get("system_font_size", 10),
+    }
+
+
+def content_height(sender, message, app_config, width, scaling=1.0):
+    """Höhe der Textbox (unskalierte CTk-Pixel) für eine Bubble mit width Pixeln Breite"""
+    style = bubble_style(sender, app_config)
+    text_width = width - TEXT_INSET_X * scaling
+    text_height = text_measurer.text_height(
+        message, (style["font"], style["font_size"]), text_width, scaling
+    )
+    return max(round(text_height / scaling) + TEXTBOX_PADDING, MIN_TEXT_HEIGHT)
+
+
 class ChatBubble(ctk.CTkFrame):
     """Ein einzelne Chat-Bubble mit Kopier-Funktionalität"""
     
-    def __init__(self, master, sender, message, timestamp, app_config=None, **kwargs):
+    def __init__(self, master, sender, message, timestamp, app_config=None, auto_pack=True, **kwargs):
         super().__init__(master, **kwargs)
         
         self.sender = sender
         self.message = message
         self.timestamp = timestamp
         self.app_config = app_config or {}
+        self.metrics = None
+        self.metrics_label = None
+        self.text_height = None   # aktuell gesetzte Höhe der Textbox
+        self._measured_width = None
         
         # Bestimme Bubble-Stil basierend auf Sender und Config
-        if sender == "You":
-            bubble_color = self.app_config.get("user_bg_color", "#003300")
-            text_color = self.app_config.get("user_text_color", "#00FF00")
-            font = self.app_config.get("user_font", "Courier New")
-            font_size = self.app_config.get("user_font_size", 11)
-            anchor = "e"  # Rechts ausrichten
-        elif "🤖" in sender:
-            bubble_color = self.app_config.get("ai_bg_color", "#1E3A5F")
-            text_color = self.app_config.get("ai_text_color", "white")
-            font = self.app_config.get("ai_font", "Consolas")
-            font_size = self.app_config.get("ai_font_size", 11)
-            anchor = "w"  # Links ausrichten
-        else:  # System
-            bubble_color = self.app_config.get("system_bg_color", "#722F37")
-            text_color = self.app_config.get("system_text_color", "white")
-            font = self.app_config.get("system_font", "Arial")
-            font_size = self.app_config.get("system_font_size", 10)
-            anchor = "w"
+        style = bubble_style(sender, self.app_config)
+        bubble_color = style["bubble_color"]
+        text_color = style["text_color"]
+        font = style["font"]
+        font_size = style["font_size"]
+        anchor = "e" if sender == "You" else "w"  # You rechts, AI/System links
         
         self.configure(fg_color=bubble_color, corner_radius=10)
         
@@ -83,7 +119,7 @@ class ChatBubble(ctk.CTkFrame):
             font=message_font,
             text_color=text_color,
             fg_color="transparent",
-            height=60  # Initiale Minimalhöhe
+            height=MIN_TEXT_HEIGHT  # Initiale Minimalhöhe, endgültige Höhe nach der Breite
         )
         self.message_label.pack(fill="both", expand=True, padx=10, pady=(0, 10))
         
@@ -91,117 +127,112 @@ class ChatBubble(ctk.CTkFrame):
         self.message_label.insert("1.0", message)
         self.message_label.configure(state="disabled")
         
-        # Nach dem Rendering: Passe Höhe automatic an den gesamten Inhalt an
-        self.after(10, self.adjust_height_to_content)
+        # Höhe aus der tatsächlichen Breite berechnen, sobald die Bubble gelayoutet ist
+        self.bind("<Configure>", self._on_configure)
+        
+        # Im VirtualTranscript platziert der Transcript die Bubble selbst
+        if not auto_pack:
+            return
         
         # Packe Bubble mit korrekter Ausrichtung
         self.pack(fill="x", padx=20 if anchor == "e" else 5, 
                  pady=5, anchor=anchor)
     
-    def adjust_height_to_content(self):
-        """Passt die Höhe der Textbox dynamisch an den gesamten Inhalt an - kein Scrollen nötig"""
-        try:
-            # Warte bis Widget vollständig gerendert ist
-            self.update_idletasks()
-            
-            # Aktiviere temporär für Messungen
-            self.message_label.configure(state="normal")
-            
-            # Hole die aktuelle Schriftgröße und Font
-            if self.sender == "You":
-                font_size = self.app_config.get("user_font_size", 11)
-                font_name = self.app_config.get("user_font", "Courier New")
-            elif "🤖" in self.sender:
-                font_size = self.app_config.get("ai_font_size", 11)
-                font_name = self.app_config.get("ai_font", "Consolas")
-            else:
-                font_size = self.app_config.get("system_font_size", 10)
-                font_name = self.app_config.get("system_font", "Arial")
-            
-            # Hole die aktuelle Breite der Textbox in Pixeln
-            textbox_width = self.message_label.winfo_width()
-            
-            # Falls Breite noch nicht bekannt (Widget nicht gerendert), verwende Standardwert
-            if textbox_width <= 1:
-                textbox_width = 600  # Schätzwert, is being beim nächsten Update korrigiert
-                # Plane erneute Anpassung nach vollständigem Rendering
-                self.after(100, self.adjust_height_to_content)
-            
-            # Berechne durchschnittliche Zeichenbreite basierend auf Font
-            # Monospace-Fonts haben feste Breite, andere variabel
-            if font_name in ["Courier New", "Consolas", "Courier"]:
-                char_width = font_size * 0.6  # Monospace
-            else:
-                char_width = font_size * 0.5  # Proportionale Schrift (etwas kleiner für mehr Genauigkeit)
-            
-            # Berechne Zeichen pro Zeile basierend auf Textbox-Breite (minus Padding)
-            usable_width = textbox_width - 20  # Reduziertes Padding für genauere Berechnung
-            chars_per_line = max(20, int(usable_width / char_width))
-            
-            # Analysiere den Text und zähle die tatsächlichen Zeilen nach Umbruch
-            lines = self.message.split('\n')
-            total_wrapped_lines = 0
-            
-            for line in lines:
-                if len(line) == 0:
-                    # Leere Zeile (Absatz) - zählt als volle Zeile für Spacing
-                    total_wrapped_lines += 1
-                else:
-                    # Berechne wie viele Zeilen diese Zeile nach Umbruch benötigt
-                    line_length = len(line)
-                    wrapped_lines = max(1, (line_length + chars_per_line - 1) // chars_per_line)
-                    total_wrapped_lines += wrapped_lines
-            
-            # Berechne die benötigte Höhe - präziser für CTkTextbox
-            line_height = font_size + 3  # Etwas mehr Zeilenabstand für bessere Lesbarkeit
-            # CTkTextbox hat intern ca. 12px Padding
-            needed_height = total_wrapped_lines * line_height + 12
-            
-            # Setze Mindesthöhe von 50px
-            needed_height = max(needed_height, 50)
-            
-            # Aktualisiere die Höhe der Textbox
-            self.message_label.configure(height=needed_height)
-            
-            # Disable again
-            self.message_label.configure(state="disabled")
-            
-        except Exception as e:
-            print(f"Error during automatic height adjustment: {e}")
-            # On error: Disable textbox anyway
-            try:
-                self.message_label.configure(state="disabled")
-            except:
-                pass
+    def _on_configure(self, event):
+        self.adjust_height_to_content(event.width)
+    
+    def adjust_height_to_content(self, width=None):
+        """Setzt die Textbox-Höhe passend zum Inhalt - ein Pass, gemessen mit echten Font-Metriken
+        
+        Args:
+            width (int): Breite der Bubble in Pixeln (Default: aktuelle Breite)
+        """
+        if width is None:
+            width = self._measured_width or self.winfo_width()
+        if width <= 1:
+            # Noch nicht gelayoutet - <Configure> liefert die Breite nach
+            return
+        self._measured_width = width
+        
+        height = content_height(self.sender, self.message, self.app_config, width,
+                                self._get_widget_scaling())
+        if height != self.text_height:
+            self.text_height = height
+            self.message_label.configure(height=height)
     
+    def append_text(self, text):
+        """Hängt gestreamten Text an die Message an (ein Aufruf pro gerendertem Frame)"""
+        if not text:
+            return
+        self.message += text
+        self.message_label.configure(state="normal")
+        self.message_label.insert("end", text)
+        self.message_label.configure(state="disabled")
+        self.adjust_height_to_content()
+
+    def set_message(self, message):
+        """Ersetzt den kompletten Message-Text (z.B. finale, formatierte Antwort)"""
+        self.message = message
+        self.message_label.configure(state="normal")
+        self.message_label.delete("1.0", "end")
+        self.message_label.insert("1.0", message)
+        self.message_label.configure(state="disabled")
+        self.adjust_height_to_content()
+
+    def bind_message(self, sender, message, timestamp, metrics=None):
+        """Belegt eine recycelte Bubble mit einer anderen Message (VirtualTranscript)"""
+        self.sender = sender
+        self.timestamp = timestamp
+        self.sender_label.configure(text=f"{sender} • {timestamp}")
+        self.apply_style()
+        self.set_metrics(metrics)
+        self.set_message(message)
+
+    def set_metrics(self, metrics):
+        """Zeigt die Latenz-Metriken der Antwort im Header an"""
+        self.metrics = metrics or None
+        text = format_metrics(metrics) if metrics else ""
+        if not text:
+            # Recycelte Bubble: Metriken der vorherigen Message ausblenden
+            if self.metrics_label is not None:
+                self.metrics_label.configure(text="")
+            return
+        
+        if self.metrics_label is None:
+            self.metrics_label = ctk.CTkLabel(
+                self.header_frame,
+                text=text,
+                font=("Arial", 9),
+                text_color="gray70"
+            )
+            self.metrics_label.pack(side="left", padx=(10, 0))
+        else:
+            self.metrics_label.configure(text=text)
+
     def update_style(self, new_config):
         """Aktualisiert das Bubble-Styling basierend auf neuer Configuration"""
         self.app_config = new_config
+        self.apply_style()
         
-        # Bestimme neue Styling-Parameter
-        if self.sender == "You":
-            bubble_color = self.app_config.get("user_bg_color", "#003300")
-            text_color = self.app_config.get("user_text_color", "#00FF00")
-            font = self.app_config.get("user_font", "Courier New")
-            font_size = self.app_config.get("user_font_size", 11)
-            border_color = text_color
-        elif "🤖" in self.sender:
-            bubble_color = self.app_config.get("ai_bg_color", "#1E3A5F")
-            text_color = self.app_config.get("ai_text_color", "white")
-            font = self.app_config.get("ai_font", "Consolas")
-            font_size = self.app_config.get("ai_font_size", 11)
-            border_color = None
-        else:  # System
-            bubble_color = self.app_config.get("system_bg_color", "#722F37")
-            text_color = self.app_config.get("system_text_color", "white")
-            font = self.app_config.get("system_font", "Arial")
-            font_size = self.app_config.get("system_font_size", 10)
-            border_color = None
+        # Neuberechnung der Höhe mit neuer Schriftgröße (Zeilenhöhe/Umbruch ändern sich)
+        self.text_height = None
+        self.adjust_height_to_content()
+    
+    def apply_style(self):
+        """Setzt Farben und Fonts passend zu Sender und app_config"""
+        style = bubble_style(self.sender, self.app_config)
+        bubble_color = style["bubble_color"]
+        text_color = style["text_color"]
+        font = style["font"]
+        font_size = style["font_size"]
+        border_color = text_color if self.sender == "You" else None
         
-        # Aktualisiere Bubble-Farben
+        # Aktualisiere Bubble-Farben (Rahmen nur für "You", wichtig für recycelte Bubbles)
         self.configure(fg_color=bubble_color)
         if self.sender == "You" and border_color:
-            self.configure(border_color=border_color)
+            self.configure(border_width=2, border_color=border_color)
+        else:
+            self.configure(border_width=0)
         
         # Aktualisiere Header-Styling
         header_font = (font, 10, "bold")
@@ -217,50 +248,8 @@ class ChatBubble(ctk.CTkFrame):
         message_font = (font, font_size)
         self.message_label.configure(
             font=message_font,
-            text_color=text_color,
-            state="normal"  # Temporär aktivieren für Updates
+            text_color=text_color
         )
-        
-        # Neuberechnung der Höhe mit neuer Schriftgröße
-        self.recalculate_height(font_size)
-        
-        # Wieder deaktivieren
-        self.message_label.configure(state="disabled")
-    
-    def recalculate_height(self, font_size):
-        """Berechnet die Bubble-Höhe new basierend auf neuer Schriftgröße"""
-        try:
-            # Optimierte Höhenberechnung - identisch zur initialen Berechnung
-            chars_per_line = 70
-            
-            # Analysiere jede Zeile einzeln für genauere Schätzung
-            lines = self.message.split('\n')
-            actual_lines = 0
-            for line in lines:
-                if len(line.strip()) == 0:  # Leere Zeile
-                    actual_lines += 1
-                else:
-                    # Berechne Umbrüche für diese Zeile
-                    line_wraps = max(1, len(line) // chars_per_line)
-                    actual_lines += line_wraps
-            
-            # Berechne Höhe mit optimiertem Puffer
-            line_height = font_size + 3  # Kompakter Zeilenabstand
-            # Berechne Höhe mit optimiertem Puffer
-            line_height = font_size + 3  # Kompakter Zeilenabstand
-            new_height = actual_lines * line_height + 25  # Minimaler Puffer
-            
-            # Minimum 60px, keine Maximalbegrenzung mehr
-            new_height = max(new_height, 60)
-            
-            # Aktualisiere die Höhe
-            self.message_label.configure(height=new_height)
-            
-            # After short time exact measurement
-            self.after(25, self.adjust_height_to_content)
-            
-        except Exception as e:
-            print(f"Height recalculation failed: {e}")
     
     def copy_message(self):
         """Copies the message to clipboard"""
@@ -0,0 +1,147 @@
+"""Vergleichsfenster: ein Prompt an mehrere Modelle, Antworten nebeneinander"""
+
+import customtkinter as ctk
+
+from src.core.generation_metrics import format_metrics
+
+
+class CompareColumn(ctk.CTkFrame):
+    """Spalte eines Models: Status, gestreamte Antwort, Metriken"""
+
+    def __init__(self, master, model_name, **kwargs):
+        super().__init__(master, corner_radius=8, **kwargs)
+        self.model_name = model_name
+        self.text = ""
+
+        header = ctk.CTkLabel(self, text=f"🤖 {model_name}", font=("Arial", 12, "bold"), anchor="w")
+        header.pack(fill="x", padx=8, pady=(8, 0))
+
+        self.state_label = ctk.CTkLabel(self, text="⏳ Waiting...", font=("Arial", 9),
+                                        text_color="gray", anchor="w")
+        self.state_label.pack(fill="x", padx=8)
+
+        self.textbox = ctk.CTkTextbox(self, wrap="word", font=("Consolas", 11))
+        self.textbox.pack(fill="both", expand=True, padx=8, pady=4)
+        self.textbox.configure(state="disabled")
+
+        self.metrics_label = ctk.CTkLabel(self, text="", font=("Arial", 9),
+                                          text_color="gray70", anchor="w", justify="left",
+                                          wraplength=260)
+        self.metrics_label.pack(fill="x", padx=8, pady=(0, 8))
+
+    def append_text(self, text):
+        """Hängt gestreamten Text an (ein Aufruf pro gerendertem Frame)"""
+        if not self.winfo_exists():
+            # Fenster inzwischen geschlossen
+            return
+        self.text += text
+        self.textbox.configure(state="normal")
+        self.textbox.insert("end", text)
+        self.textbox.configure(state="disabled")
+        self.textbox.see("end")
+
+    def set_state(self, text, color="gray"):
+        if self.winfo_exists():
+            self.state_label.configure(text=text, text_color=color)
+
+    def set_metrics(self, metrics):
+        if self.winfo_exists():
+            self.metrics_label.configure(text=format_metrics(metrics) if metrics else "")
+
+
+class CompareWindow(ctk.CTkToplevel):
+    """Fenster für den Vergleichsmodus
+
+    Die Auswahl (Prompt + Modelle) geht per on_run(prompt, models) an die App,
+    die die Generierungen startet und die Spalten über column() befüllt.
+    on_stop bricht alle laufenden Generierungen ab (auch beim Schließen).
+    """
+
+    def __init__(self, master, models, selected=None, prompt="", on_run=None, on_stop=None,
+                 max_parallel=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.title("⚖️ Compare Models")
+        self.geometry("1200x700")
+        self.on_run = on_run
+        self.on_stop = on_stop
+        self.columns = {}
+
+        top = ctk.CTkFrame(self)
+        top.pack(fill="x", padx=10, pady=(10, 5))
+
+        ctk.CTkLabel(top, text="Prompt (current session history and BIAS are included):",
+                     font=("Arial", 11, "bold"), anchor="w").pack(fill="x", padx=8, pady=(8, 2))
+        self.prompt_box = ctk.CTkTextbox(top, height=70, wrap="word", font=("Arial", 11))
+        self.prompt_box.pack(fill="x", padx=8, pady=2)
+        if prompt:
+            self.prompt_box.insert("1.0", prompt)
+
+        # Model-Auswahl (installierte Modelle)
+        models_frame = ctk.CTkScrollableFrame(top, orientation="horizontal", height=36)
+        models_frame.pack(fill="x", padx=8, pady=2)
+        selected = set(selected or [])
+        self.model_vars = {}
+        for model_name in models:
+            var = ctk.BooleanVar(value=model_name in selected)
+            ctk.CTkCheckBox(models_frame, text=model_name, variable=var,
+                            font=("Arial", 10)).pack(side="left", padx=(0, 10))
+            self.model_vars[model_name] = var
+
+        controls = ctk.CTkFrame(top, fg_color="transparent")
+        controls.pack(fill="x", padx=8, pady=(2, 8))
+        self.run_btn = ctk.CTkButton(controls, text="▶ Run", width=100, command=self._run)
+        self.run_btn.pack(side="left")
+        self.stop_btn = ctk.CTkButton(controls, text="Stop", width=80, fg_color="red",
+                                      hover_color="darkred", state="disabled", command=self._stop)
+        self.stop_btn.pack(side="left", padx=5)
+        parallel_text = f" • max. {max_parallel} parallel" if max_parallel else ""
+        self.status_label = ctk.CTkLabel(controls, text=f"Select models{parallel_text}",
+                                         font=("Arial", 10), text_color="gray", anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True, padx=10)
+
+        self.columns_frame = ctk.CTkFrame(self, fg_color="transparent")
+        self.columns_frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        self.protocol("WM_DELETE_WINDOW", self._close)
+
+    def selected_models(self):
+        return [name for name, var in self.model_vars.items() if var.get()]
+
+    def column(self, model_name):
+        return self.columns.get(model_name)
+
+    def show_columns(self, model_names):
+        """Baut je eine Spalte pro Model (nebeneinander, gleich breit)"""
+        for column in self.columns.values():
+            column.destroy()
+        self.columns = {}
+        for index, model_name in enumerate(model_names):
+            column = CompareColumn(self.columns_frame, model_name)
+            column.grid(row=0, column=index, sticky="nsew", padx=3)
+            self.columns_frame.grid_columnconfigure(index, weight=1, uniform="compare")
+            self.columns[model_name] = column
+        self.columns_frame.grid_rowconfigure(0, weight=1)
+
+    def set_running(self, running):
+        self.run_btn.configure(state="disabled" if running else "normal")
+        self.stop_btn.configure(state="normal" if running else "disabled")
+
+    def set_status(self, text):
+        self.status_label.configure(text=text)
+
+    def _run(self):
+        prompt = self.prompt_box.get("1.0", "end").strip()
+        models = self.selected_models()
+        if not prompt or not models:
+            self.set_status("⚠️ Enter a prompt and select at least one model")
+            return
+        if self.on_run:
+            self.on_run(prompt, models)
+
+    def _stop(self):
+        if self.on_stop:
+            self.on_stop()
+
+    def _close(self):
+        self._stop()
+        self.destroy()
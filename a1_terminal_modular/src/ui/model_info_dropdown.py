@@ -1,9 +1,27 @@
 """
 Erweitertes Dropdown-Menü mit Modellinformationen
 """
+import sys
+
 import customtkinter as ctk
 import tkinter as tk
 
+from src.core.model_search import ModelSearchIndex
+
+# Platz eines Model-Items in der List (55px Item + pady=3 oben und unten)
+ROW_HEIGHT = 61
+ITEM_HEIGHT = 55
+# Maximale Höhe der Model-List im aufgeklappten Dropdown
+MAX_LIST_HEIGHT = 300
+ITEM_COLOR = ("#e8e8e8", "#353535")
+HOVER_COLOR = ("#3b8ed0", "#1f6aa5")
+
+
+class _DropdownRow:
+    """Wiederverwendetes Model-Item der virtuellen List"""
+
+    __slots__ = ("frame", "name_label", "info_label", "item", "index", "entry")
+
 
 class ModelInfoDropdown(ctk.CTkFrame):
     """Dropdown-Menü mit erweiterten Modellinformationen"""
@@ -43,8 +61,23 @@ class ModelInfoDropdown(ctk.CTkFrame):
         
         # Dropdown-Menü (initial versteckt)
         self.dropdown_frame = None
+        self.dropdown_container = None
         self.dropdown_visible = False
         
+        # Suchindex über models_dict (einmal pro update_models aufgebaut)
+        self.search_index = ModelSearchIndex(self.models_dict)
+        self.results = self.search_index.entries
+        self.search_entry = None
+        self._canvas = None
+        self._rows = []
+        self._empty_item = None
+        self._last_query = ""
+        self._filter_pending = None
+        
+        # Mausrad für die Model-List (einmal binden, Handler prüft das Ziel-Widget)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind_all(sequence, self._on_mousewheel, add="+")
+        
     def toggle_dropdown(self):
         """Öffnet/Schließt das Dropdown-Menü"""
         if self.dropdown_visible:
@@ -53,126 +86,234 @@ class ModelInfoDropdown(ctk.CTkFrame):
             self.show_dropdown()
     
     def show_dropdown(self):
-        """Zeigt das Dropdown-Menü"""
+        """Zeigt das Dropdown-Menü
+        
+        Die List ist virtuell: es gibt nur so viele Item-Widgets wie sichtbar
+        sind, beim Scrollen und Filtern werden sie mit anderen Modellen belegt.
+        Öffnen kostet dadurch gleich viel, egal wie groß der Katalog ist.
+        """
         if self.dropdown_visible or not self.models_dict:
             return
         
-        # Erstelle Container für Dropdown
+        list_height = min(MAX_LIST_HEIGHT, len(self.search_index) * ROW_HEIGHT)
+        
+        # Erstelle Container für Dropdown (Suchfeld + List)
         dropdown_container = ctk.CTkFrame(
             self,
             fg_color=("#d4d4d4", "#2b2b2b"),
             corner_radius=8,
-            height=min(300, len(self.models_dict) * 60 + 10)
+            height=list_height + 50
         )
         dropdown_container.pack(fill="x", padx=2, pady=(5, 0))
         dropdown_container.pack_propagate(False)
         
+        # Suchfeld: filtert bei jedem Tastendruck über den vorberechneten Index
+        self.search_entry = ctk.CTkEntry(
+            dropdown_container,
+            placeholder_text="🔍 Filter: Name, Familie, Größe (z.B. llama 7b)",
+            height=32,
+            font=("Arial", 11)
+        )
+        self.search_entry.pack(fill="x", padx=5, pady=(5, 2))
+        self.search_entry.bind("<KeyRelease>", self._schedule_filter)
+        self.search_entry.bind("<Return>", self._select_first_result)
+        self.search_entry.bind("<Escape>", lambda e: self.hide_dropdown())
+        
         # Canvas für scrollbaren Inhalt
         canvas = tk.Canvas(
             dropdown_container,
             bg="#d4d4d4" if ctk.get_appearance_mode() == "Light" else "#2b2b2b",
             highlightthickness=0,
-            height=min(300, len(self.models_dict) * 60)
+            height=list_height,
+            yscrollincrement=ROW_HEIGHT // 3
         )
         
         # Scrollbar
         scrollbar = ctk.CTkScrollbar(dropdown_container, command=canvas.yview)
         scrollbar.pack(side="right", fill="y", padx=(0, 2), pady=2)
         
-        canvas.configure(yscrollcommand=scrollbar.set)
-        canvas.pack(side="left", fill="both", expand=True, padx=2, pady=2)
-        
-        # Frame im Canvas
-        self.dropdown_frame = ctk.CTkFrame(canvas, fg_color="transparent")
-        canvas_window = canvas.create_window((0, 0), window=self.dropdown_frame, anchor="nw")
+        def on_yview(first, last):
+            scrollbar.set(first, last)
+            self._render_rows()
         
-        # Füge Modelle hinzu
-        for model_name, model_info in self.models_dict.items():
-            self.add_model_item(model_name, model_info)
-        
-        # Update scroll region
-        self.dropdown_frame.update_idletasks()
-        canvas.configure(scrollregion=canvas.bbox("all"))
+        canvas.configure(yscrollcommand=on_yview)
+        canvas.pack(side="left", fill="both", expand=True, padx=2, pady=2)
+        canvas.bind("<Configure>", lambda e: self._render_rows())
         
         # Speichere Container statt Frame für späteres Delete
         self.dropdown_container = dropdown_container
+        self.dropdown_frame = canvas
+        self._canvas = canvas
+        self._rows = []
+        self._empty_item = None
         self.dropdown_visible = True
+        
+        self._last_query = ""
+        self._apply_results(self.search_index.search(""))
+        self.search_entry.focus_set()
     
     def hide_dropdown(self):
         """Versteckt das Dropdown-Menü"""
         if not self.dropdown_visible:
             return
         
-        if hasattr(self, 'dropdown_container') and self.dropdown_container:
+        if self._filter_pending is not None:
+            self.after_cancel(self._filter_pending)
+            self._filter_pending = None
+        
+        if self.dropdown_container:
             self.dropdown_container.destroy()
             self.dropdown_container = None
         
         self.dropdown_frame = None
+        self.search_entry = None
+        self._canvas = None
+        self._rows = []
+        self._empty_item = None
         self.dropdown_visible = False
     
-    def add_model_item(self, model_name, model_info):
-        """Fügt ein Model-Item zum Dropdown hinzu"""
+    # ---------- Suche ----------
+    
+    def _schedule_filter(self, event=None):
+        # Schnelles Tippen: nur einmal pro Idle-Zyklus filtern
+        if self._filter_pending is None:
+            self._filter_pending = self.after_idle(self._apply_filter)
+    
+    def _apply_filter(self):
+        self._filter_pending = None
+        if self.search_entry is None:
+            return
+        query = self.search_entry.get()
+        if query == self._last_query:
+            return
+        self._last_query = query
+        self._apply_results(self.search_index.search(query))
+    
+    def _apply_results(self, results):
+        self.results = results
+        canvas = self._canvas
+        canvas.configure(scrollregion=(0, 0, 1, max(len(results) * ROW_HEIGHT, 1)))
+        canvas.yview_moveto(0.0)
+        
+        if results:
+            if self._empty_item is not None:
+                canvas.delete(self._empty_item)
+                self._empty_item = None
+        elif self._empty_item is None:
+            self._empty_item = canvas.create_text(
+                10, 15, anchor="w", text="Keine Treffer",
+                fill="gray50", font=("Arial", 10)
+            )
+        self._render_rows()
+    
+    def _select_first_result(self, event=None):
+        if self._filter_pending is not None:
+            self.after_cancel(self._filter_pending)
+        self._apply_filter()
+        if self.results:
+            entry = self.results[0]
+            self.select_model(entry.name, entry.info)
+    
+    # ---------- Virtuelle List ----------
+    
+    def _render_rows(self):
+        """Belegt die Item-Widgets mit den Modellen im sichtbaren Bereich"""
+        canvas = self._canvas
+        if canvas is None:
+            return
+        width = max(canvas.winfo_width() - 10, 50)
+        view_height = max(canvas.winfo_height(), ROW_HEIGHT)
+        
+        # Eine Zeile mehr als in den Viewport passt (teilweise sichtbare oben und unten)
+        needed = min(len(self.results), view_height // ROW_HEIGHT + 2)
+        while len(self._rows) < needed:
+            self._rows.append(self._create_row())
+        
+        first = int(canvas.canvasy(0)) // ROW_HEIGHT
+        for offset, row in enumerate(self._rows):
+            index = first + offset
+            if index >= len(self.results):
+                if row.index is not None:
+                    canvas.itemconfigure(row.item, state="hidden")
+                    row.index = None
+                    row.entry = None
+                continue
+            entry = self.results[index]
+            canvas.coords(row.item, 5, index * ROW_HEIGHT + 3)
+            canvas.itemconfigure(row.item, width=width, state="normal")
+            row.index = index
+            if row.entry is not entry:
+                row.entry = entry
+                row.name_label.configure(text=entry.name)
+                row.info_label.configure(text=entry.info_text)
+    
+    def _create_row(self):
+        """Erzeugt ein Model-Item (wird für wechselnde Modelle wiederverwendet)"""
+        row = _DropdownRow()
+        row.index = None
+        row.entry = None
+        
         # Container für Model-Item
-        item_frame = ctk.CTkFrame(
-            self.dropdown_frame,
-            fg_color=("#e8e8e8", "#353535"),
+        row.frame = ctk.CTkFrame(
+            self._canvas,
+            fg_color=ITEM_COLOR,
             corner_radius=6,
-            height=55
+            height=ITEM_HEIGHT
+        )
+        row.frame.pack_propagate(False)
+        row.item = self._canvas.create_window(
+            5, 3, window=row.frame, anchor="nw", height=ITEM_HEIGHT, state="hidden"
         )
-        item_frame.pack(fill="x", padx=5, pady=3)
-        item_frame.pack_propagate(False)
-        
-        # Mache den Frame klickbar
-        item_frame.bind("<Button-1>", lambda e: self.select_model(model_name, model_info))
-        
-        # Hover-Effekt
-        def on_enter(e):
-            item_frame.configure(fg_color=("#3b8ed0", "#1f6aa5"))
-        
-        def on_leave(e):
-            item_frame.configure(fg_color=("#e8e8e8", "#353535"))
-        
-        item_frame.bind("<Enter>", on_enter)
-        item_frame.bind("<Leave>", on_leave)
         
         # Model-Name (fett)
-        name_label = ctk.CTkLabel(
-            item_frame,
-            text=model_name,
+        row.name_label = ctk.CTkLabel(
+            row.frame,
+            text="",
             font=("Arial", 12, "bold"),
             anchor="w"
         )
-        name_label.pack(anchor="w", padx=10, pady=(5, 0))
-        name_label.bind("<Button-1>", lambda e: self.select_model(model_name, model_info))
-        name_label.bind("<Enter>", on_enter)
-        name_label.bind("<Leave>", on_leave)
+        row.name_label.pack(anchor="w", padx=10, pady=(5, 0))
         
         # Model-Info (klein, grau)
-        size = model_info.get("size", "?")
-        param_count = model_info.get("parameters", "")
-        model_type = model_info.get("type", "")
-        
-        info_parts = []
-        if size:
-            info_parts.append(f"📦 {size}")
-        if param_count:
-            info_parts.append(f"🔢 {param_count}")
-        if model_type:
-            info_parts.append(f"🏷️ {model_type}")
-        
-        info_text = " • ".join(info_parts) if info_parts else "Model available"
-        
-        info_label = ctk.CTkLabel(
-            item_frame,
-            text=info_text,
+        row.info_label = ctk.CTkLabel(
+            row.frame,
+            text="",
             font=("Arial", 9),
             text_color=("gray50", "gray70"),
             anchor="w"
         )
-        info_label.pack(anchor="w", padx=10, pady=(0, 5))
-        info_label.bind("<Button-1>", lambda e: self.select_model(model_name, model_info))
-        info_label.bind("<Enter>", on_enter)
-        info_label.bind("<Leave>", on_leave)
+        row.info_label.pack(anchor="w", padx=10, pady=(0, 5))
+        
+        # Klick und Hover-Effekt (das Model kommt beim Klick aus der aktuellen Belegung)
+        def on_click(e):
+            if row.entry is not None:
+                self.select_model(row.entry.name, row.entry.info)
+        
+        def on_enter(e):
+            row.frame.configure(fg_color=HOVER_COLOR)
+        
+        def on_leave(e):
+            row.frame.configure(fg_color=ITEM_COLOR)
+        
+        for widget in (row.frame, row.name_label, row.info_label):
+            widget.bind("<Button-1>", on_click)
+            widget.bind("<Enter>", on_enter)
+            widget.bind("<Leave>", on_leave)
+        return row
+    
+    def _on_mousewheel(self, event):
+        canvas = self._canvas
+        if canvas is None or not str(event.widget).startswith(str(canvas)):
+            return
+        if event.num == 4:
+            units = -3
+        elif event.num == 5:
+            units = 3
+        elif sys.platform == "darwin":
+            units = -event.delta
+        else:
+            units = -int(event.delta / 120) * 3
+        canvas.yview_scroll(units, "units")
     
     def select_model(self, model_name, model_info):
         """Selects a model"""
@@ -207,6 +348,8 @@ class ModelInfoDropdown(ctk.CTkFrame):
     def update_models(self, models_dict):
         """Aktualisiert die verfügbaren Modelle"""
         self.models_dict = models_dict
+        self.search_index = ModelSearchIndex(models_dict)
+        self.results = self.search_index.entries
         
         # Schließe Dropdown wenn offen
         if self.dropdown_visible:
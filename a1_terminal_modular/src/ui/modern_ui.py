@@ -22,6 +22,7 @@ def setup_modern_ui(app):
     """
     
     from src.ui.resizable_pane import ResizablePane
+    from src.ui.virtual_transcript import VirtualTranscript
     from src.ui.model_selector import ModelSelector
     
     # Main Container
@@ -154,8 +155,9 @@ def setup_modern_ui(app):
     app.chat_tab_frame = ctk.CTkFrame(app.tab_content, fg_color="transparent")
     
     # Chat Display (Scrollable) mit farbiger Umrandung für aktive Session
-    app.chat_display_frame = ctk.CTkScrollableFrame(
+    app.chat_display_frame = VirtualTranscript(
         app.chat_tab_frame,
+        app_config=app.config,
         fg_color="#0f0f0f",
         corner_radius=8,
         border_width=3,
@@ -231,7 +233,7 @@ def setup_modern_ui(app):
     app.chat_tab_frame.pack(fill="both", expand=True)
     
     # Initialize
-    app.chat_bubbles = []
+    app.chat_bubbles = app.chat_display_frame.entries
     
     return main_container
 
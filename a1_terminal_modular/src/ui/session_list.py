@@ -0,0 +1,159 @@
+"""Session-List mit einer Karte pro Session-ID, aktualisiert per Diff statt Neuaufbau"""
+
+import bisect
+from datetime import datetime
+
+import customtkinter as ctk
+
+
+def session_card_fields(session_id, session_data, busy=False):
+    """Anzeige-Werte einer Session-Karte (nur Metadaten, keine Messages)
+
+    Args:
+        busy (bool): in der Session läuft gerade eine Antwort (⏳ statt 📝)
+
+    Returns:
+        tuple: (button_text, color) - ändert sich einer der Werte, wird die Karte gepatcht
+    """
+    session_name = session_data.get("name", f"Session {session_id[-8:]}")
+    created_date = session_data.get("created_at", "Unbekannt")
+    if created_date != "Unbekannt":
+        try:
+            date_obj = datetime.fromisoformat(created_date)
+            date_str = date_obj.strftime("%d.%m.%Y %H:%M")  # Ohne Sekunden für mehr Platz
+        except (TypeError, ValueError):
+            date_str = created_date[:16] if len(created_date) > 16 else created_date
+    else:
+        date_str = created_date
+
+    msg_count = session_data.get("total_messages", 0)
+    model_name = session_data.get("model", "Kein Model")
+    model_name = model_name[:12] if model_name else "Kein Model"
+
+    # Wort-Anzahl kommt aus den Metadaten (beim Save gepflegt) - nie über alle Messages zählen
+    word_count = session_data.get("word_count", 0)
+    word_display = f"{word_count}W" if word_count < 1000 else f"{word_count//1000:.1f}kW"
+
+    # Session-Button mit Namen - kompakter für schmale Fenster
+    if len(session_name) > 20:
+        session_name_display = session_name[:17] + "..."
+    else:
+        session_name_display = session_name
+
+    icon = "⏳" if busy else "📝"
+    button_text = f"{icon} {session_name_display}\n📅 {date_str}\n💬 {msg_count} | 🤖 {model_name[:8]} | 📊 {word_display}"
+    return button_text, session_data.get("color", "#4A4A4A")
+
+
+class _SessionRow:
+    """Widgets einer Session-Karte (Container, Session-Button, Zahnrad-Button)"""
+
+    __slots__ = ("container", "session_btn", "settings_btn", "fields", "sort_key")
+
+
+class SessionList(ctk.CTkScrollableFrame):
+    """Scrollbare Session-List, neueste Session zuerst
+
+    sync() vergleicht die Sessions mit den vorhandenen Karten: neue Sessions
+    bekommen eine Karte an der richtigen Stelle, gelöschte verlieren ihre,
+    bei allen anderen werden nur geänderte Texte/Farben neu gesetzt. Die
+    Sortierung (created_at absteigend) wird als Liste mitgeführt, statt bei
+    jedem Update alle Sessions neu zu sortieren und alle Widgets neu zu bauen.
+    """
+
+    def __init__(self, master, on_open, on_settings, hover_color=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.on_open = on_open
+        self.on_settings = on_settings
+        self.hover_color = hover_color or (lambda color: color)
+        self._rows = {}     # session_id -> _SessionRow
+        self._order = []    # (sort_key, session_id), aufsteigend; angezeigt wird umgekehrt
+
+    @staticmethod
+    def _sort_key(session_data):
+        return session_data.get("created_at", "")
+
+    def sync(self, sessions, busy=()):
+        """Gleicht die Karten mit sessions ({session_id: session_data}) ab
+
+        Args:
+            busy: Session-IDs mit laufender Antwort
+        """
+        for session_id in [sid for sid in self._rows if sid not in sessions]:
+            self._remove(session_id)
+
+        for session_id, session_data in sessions.items():
+            row = self._rows.get(session_id)
+            if row is None:
+                self._insert(session_id, session_data, session_id in busy)
+                continue
+            sort_key = self._sort_key(session_data)
+            if sort_key != row.sort_key:
+                # Erstellungsdatum geändert (selten): Karte neu einsortieren
+                self._remove(session_id)
+                self._insert(session_id, session_data, session_id in busy)
+                continue
+            self._patch(row, session_card_fields(session_id, session_data, session_id in busy))
+
+    def _insert(self, session_id, session_data, busy=False):
+        row = _SessionRow()
+        row.sort_key = self._sort_key(session_data)
+        row.fields = session_card_fields(session_id, session_data, busy)
+        button_text, color = row.fields
+
+        # Session-Container für Name und Buttons
+        row.container = ctk.CTkFrame(self)
+        row.session_btn = ctk.CTkButton(
+            row.container,
+            text=button_text,
+            command=lambda sid=session_id: self.on_open(sid),
+            height=75,  # Etwas höher für mehr Text
+            font=("Arial", 9),
+            anchor="w",
+            fg_color=color,
+            hover_color=self.hover_color(color),
+            text_color="#000000"  # Schrift schwarz
+        )
+        row.session_btn.pack(side="left", fill="both", expand=True, padx=(0, 5))
+
+        # Quadratischer Zahnrad-Button für Session-Einstellungen (Umbenennen + Farbe)
+        row.settings_btn = ctk.CTkButton(
+            row.container,
+            text="⚙️",
+            command=lambda sid=session_id: self.on_settings(sid),
+            width=75,
+            height=75,
+            font=("Arial", 18),
+            fg_color="#4A4A4A",
+            hover_color="#5A5A5A"
+        )
+        row.settings_btn.pack(side="right")
+
+        # Position in der sortierten List: Karte vor die nächstältere Session packen
+        entry = (row.sort_key, session_id)
+        position = bisect.bisect_left(self._order, entry)
+        self._order.insert(position, entry)
+        if position > 0:
+            older = self._rows[self._order[position - 1][1]]
+            row.container.pack(fill="x", pady=2, before=older.container)
+        else:
+            row.container.pack(fill="x", pady=2)
+        self._rows[session_id] = row
+
+    def _remove(self, session_id):
+        row = self._rows.pop(session_id)
+        entry = (row.sort_key, session_id)
+        position = bisect.bisect_left(self._order, entry)
+        if position < len(self._order) and self._order[position] == entry:
+            del self._order[position]
+        row.container.destroy()
+
+    def _patch(self, row, fields):
+        if fields == row.fields:
+            return
+        button_text, color = fields
+        if button_text != row.fields[0]:
+            row.session_btn.configure(text=button_text)
+        if color != row.fields[1]:
+            row.session_btn.configure(fg_color=color, hover_color=self.hover_color(color))
+        row.fields = fields
@@ -0,0 +1,74 @@
+"""Frame-gedrosseltes Rendering für gestreamte Antworten"""
+
+import threading
+import time
+
+
+class StreamRenderer:
+    """Bündelt Token aus einem Worker-Thread zu höchstens max_fps UI-Updates pro Sekunde
+
+    Es ist immer höchstens ein Flush im Tk-Event-Loop eingeplant (Backpressure):
+    Kommt die UI nicht hinterher, sammeln sich die Token im Puffer und werden mit
+    dem nächsten Frame gemeinsam gezeichnet, statt tausende Callbacks anzustauen.
+    """
+
+    def __init__(self, root, on_flush, max_fps=30, dispatch=None):
+        self.root = root
+        self.on_flush = on_flush
+        # Thread-sicherer Weg in den Main-Thread (z.B. TaskRuntime.call_soon)
+        self.dispatch = dispatch
+        self.frame_interval = 1.0 / max(1, max_fps)
+
+        self._lock = threading.Lock()
+        self._pending = []
+        self._flush_scheduled = False
+        self._last_flush = 0.0
+        self._closed = False
+
+        # Statistik: wie viele Chunks auf wie viele Frames verteilt wurden
+        self.chunks = 0
+        self.frames = 0
+
+    def push(self, text):
+        """Nimmt einen Chunk entgegen (thread-safe, aus dem Worker-Thread)"""
+        if not text:
+            return
+        with self._lock:
+            if self._closed:
+                return
+            self._pending.append(text)
+            self.chunks += 1
+            if self._flush_scheduled:
+                # Frame bereits eingeplant - Chunk wird mitgezeichnet
+                return
+            self._flush_scheduled = True
+            wait = self.frame_interval - (time.monotonic() - self._last_flush)
+        delay = max(0, int(wait * 1000))
+        if self.dispatch is None:
+            self.root.after(delay, self._flush)
+        elif delay == 0:
+            self.dispatch(self._flush)
+        else:
+            self.dispatch(self.root.after, delay, self._flush)
+
+    def _take_pending(self):
+        """Holt den gesammelten Text und gibt den Frame-Slot frei"""
+        with self._lock:
+            text = "".join(self._pending)
+            self._pending.clear()
+            self._flush_scheduled = False
+            self._last_flush = time.monotonic()
+        return text
+
+    def _flush(self):
+        """Zeichnet alle seit dem letzten Frame angefallenen Token (Main-Thread)"""
+        text = self._take_pending()
+        if text:
+            self.frames += 1
+            self.on_flush(text)
+
+    def close(self):
+        """Zeichnet den Rest sofort und nimmt keine weiteren Chunks an (Main-Thread)"""
+        with self._lock:
+            self._closed = True
+        self._flush()
@@ -0,0 +1,119 @@
+"""Text-Vermessung mit echten Font-Metriken (Zeilenumbruch wie Text-Widget mit wrap="word")"""
+
+from collections import OrderedDict
+
+import tkinter.font as tkfont
+
+# Breiten werden auf diese Schrittweite abgerundet, damit kleine Resizes den Cache treffen
+WIDTH_BUCKET = 8
+MAX_CACHED_MEASUREMENTS = 8192
+MAX_CACHED_WORDS = 20000
+TAB_SIZE = 8
+
+
+class _FontMetrics:
+    """Einmal ermittelte Metriken eines Fonts plus Cache der Wortbreiten"""
+
+    def __init__(self, family, pixel_size, weight):
+        # Negative Größe = Pixel, wie CustomTkinter Font-Tupel skaliert
+        self.font = tkfont.Font(family=family, size=-pixel_size, weight=weight)
+        self.linespace = self.font.metrics("linespace")
+        self.fixed_width = self.font.measure("0") if self.font.metrics("fixed") else None
+        self.space = self.font.measure(" ")
+        sample = "abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ 0123456789"
+        self.average_char = self.fixed_width or self.font.measure(sample) / len(sample)
+        self._words = {}
+
+    def word_width(self, word):
+        if self.fixed_width is not None:
+            return len(word) * self.fixed_width
+        width = self._words.get(word)
+        if width is None:
+            if len(self._words) >= MAX_CACHED_WORDS:
+                self._words.clear()
+            width = self._words[word] = self.font.measure(word)
+        return width
+
+
+class TextMeasurer:
+    """Berechnet die Höhe umgebrochener Texte ohne Widget und ohne Layout-Pass
+
+    Ergebnisse werden nach (Text-Hash, Font, Breiten-Bucket) gecacht - eine
+    Bubble, die mit derselben Breite erneut angezeigt wird, kostet nur einen
+    Dictionary-Zugriff. Fonts werden erst beim ersten Messen angelegt (braucht
+    ein Tk-Root) und nur im Main-Thread benutzt.
+    """
+
+    def __init__(self):
+        self._fonts = {}
+        self._cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def metrics(self, font, scaling=1.0):
+        """_FontMetrics für ein CTk-Font-Tupel (family, size[, weight])"""
+        family, size = font[0], font[1]
+        weight = "bold" if "bold" in font[2:] else "normal"
+        key = (family, max(1, abs(round(size * scaling))), weight)
+        metrics = self._fonts.get(key)
+        if metrics is None:
+            metrics = self._fonts[key] = _FontMetrics(*key)
+        return metrics
+
+    def line_count(self, text, font, width, scaling=1.0):
+        """Anzahl Display-Zeilen von text bei width Pixeln Breite"""
+        metrics = self.metrics(font, scaling)
+        bucket = max(1, int(width) // WIDTH_BUCKET)
+        key = (hash(text), len(text), font, scaling, bucket)
+        lines = self._cache.get(key)
+        if lines is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return lines
+
+        self.misses += 1
+        lines = self._wrap(text, metrics, bucket * WIDTH_BUCKET)
+        self._cache[key] = lines
+        if len(self._cache) > MAX_CACHED_MEASUREMENTS:
+            self._cache.popitem(last=False)
+        return lines
+
+    def text_height(self, text, font, width, scaling=1.0):
+        """Höhe von text in Pixeln (Zeilen × Zeilenhöhe des Fonts)"""
+        return self.line_count(text, font, width, scaling) * self.metrics(font, scaling).linespace
+
+    def estimate_height(self, text, font, width, scaling=1.0):
+        """Schnelle Schätzung ohne Umbruch-Simulation (für nie angezeigte Messages)"""
+        metrics = self.metrics(font, scaling)
+        chars_per_line = max(1, int(width / metrics.average_char))
+        lines = text.count("\n") + 1 + len(text) // chars_per_line
+        return lines * metrics.linespace
+
+    @staticmethod
+    def _wrap(text, metrics, width):
+        """Simuliert den Wort-Umbruch des Text-Widgets"""
+        space = metrics.space
+        lines = 0
+        for paragraph in text.expandtabs(TAB_SIZE).split("\n"):
+            lines += 1
+            x = 0
+            for word in paragraph.split(" "):
+                if not word:
+                    # Mehrere Leerzeichen hintereinander
+                    x += space
+                    continue
+                word_width = metrics.word_width(word)
+                if x > 0 and x + word_width > width:
+                    lines += 1
+                    x = 0
+                if word_width > width:
+                    # Überlange Wörter bricht das Text-Widget zeichenweise um
+                    extra, word_width = divmod(word_width, width)
+                    lines += int(extra)
+                # Leerzeichen nach dem Wort darf über den Rand hängen
+                x += word_width + space
+        return lines
+
+
+# Gemeinsame Instanz für alle Bubbles (Cache über Sessions hinweg)
+text_measurer = TextMeasurer()
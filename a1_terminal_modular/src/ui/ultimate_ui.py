@@ -24,6 +24,7 @@ def setup_ultimate_ui(app):
     from src.ui.resizable_pane import ResizablePane
     from src.ui.session_card import SessionCard
     from src.ui.model_selector import ModelSelector
+    from src.ui.virtual_transcript import VirtualTranscript
     
     # ============== MAIN CONTAINER ==============
     app.main_container = ctk.CTkFrame(app.root, fg_color="#0f0f0f")
@@ -237,8 +238,9 @@ def setup_ultimate_ui(app):
     bias_btn.pack(side="left", padx=2)
     
     # Chat Display mit farbiger Umrandung für aktive Session
-    app.chat_display_frame = ctk.CTkScrollableFrame(
+    app.chat_display_frame = VirtualTranscript(
         right_panel,
+        app_config=app.config,
         fg_color="#0f0f0f",
         corner_radius=8,
         border_width=3,
@@ -311,7 +313,7 @@ def setup_ultimate_ui(app):
     setup_keyboard_shortcuts(app)
     
     # Initialize
-    app.chat_bubbles = []
+    app.chat_bubbles = app.chat_display_frame.entries
     
     return app.main_container
 
@@ -550,9 +552,7 @@ def show_bias_editor(app):
 def clear_chat(app):
     """Löscht Chat-Historie"""
     if messagebox.askyesno("Chat leeren", "Möchten You den Chat wirklich leeren?"):
-        for bubble in app.chat_bubbles:
-            bubble.destroy()
-        app.chat_bubbles = []
+        app.chat_display_frame.clear()
         app.chat_history = []
         messagebox.showinfo("Gelöscht", "Chat wurde geleert!")
 
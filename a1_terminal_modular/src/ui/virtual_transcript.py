@@ -0,0 +1,380 @@
+"""Virtualisierte Chat-Anzeige: nur Bubbles im sichtbaren Bereich existieren als Widgets"""
+
+import bisect
+import sys
+import tkinter as tk
+
+import customtkinter as ctk
+
+from src.ui.chat_bubble import (
+    ChatBubble, MIN_TEXT_HEIGHT, TEXT_INSET_X, TEXTBOX_PADDING, bubble_style
+)
+from src.ui.text_measure import text_measurer
+
+# Zusätzlich gerenderter Bereich über und unter dem Viewport (Pixel)
+OVERSCAN_PIXELS = 600
+# Freie Bubble-Widgets, die für später sichtbare Messages aufgehoben werden
+MAX_POOLED_BUBBLES = 24
+# Abstand zwischen den Bubbles (wie pady=5 beim Packen)
+BUBBLE_PADY = 5
+# Höhe von Header und Innenabständen einer Bubble, bis die erste Bubble gemessen ist
+DEFAULT_CHROME_HEIGHT = 55
+
+
+class TranscriptEntry:
+    """Eine Message im Transcript - Daten statt Widget
+
+    Steht in app.chat_bubbles und bietet dieselben Attribute und Methoden wie
+    eine ChatBubble (sender, message, timestamp, metrics, append_text, ...).
+    Ein Widget hängt nur daran, solange die Message im sichtbaren Bereich liegt.
+    """
+
+    __slots__ = ("transcript", "sender", "message", "timestamp", "metrics",
+                 "height", "measured", "widget")
+
+    def __init__(self, transcript, sender, message, timestamp, metrics=None):
+        self.transcript = transcript
+        self.sender = sender
+        self.message = message
+        self.timestamp = timestamp
+        self.metrics = metrics or None
+        self.height = None      # gemessene oder geschätzte Höhe in Pixeln
+        self.measured = False   # True, sobald die Höhe von einem echten Widget stammt
+        self.widget = None
+
+    def append_text(self, text):
+        """Hängt gestreamten Text an (siehe ChatBubble.append_text)"""
+        if not text:
+            return
+        self.message += text
+        if self.widget is not None:
+            self.widget.append_text(text)
+        else:
+            self.transcript.invalidate(self)
+
+    def set_message(self, message):
+        self.message = message
+        if self.widget is not None:
+            self.widget.set_message(message)
+        else:
+            self.transcript.invalidate(self)
+
+    def set_metrics(self, metrics):
+        self.metrics = metrics or None
+        if self.widget is not None:
+            self.widget.set_metrics(metrics)
+        else:
+            self.transcript.invalidate(self)
+
+    def destroy(self):
+        """Entfernt die Message aus dem Transcript"""
+        self.transcript.remove(self)
+
+
+class VirtualTranscript(ctk.CTkFrame):
+    """Scrollbare Chat-Anzeige, die nur Bubbles in der Nähe des Viewports erzeugt
+
+    Ersetzt den CTkScrollableFrame mit einer ChatBubble pro Message. Die
+    Messages liegen als TranscriptEntry in self.entries, ihre Y-Positionen
+    ergeben sich aus den Höhen: exakt über den TextMeasurer (Cache nach
+    Text-Hash, Font und Breite), solange eine Message noch nie sichtbar war
+    nur grob geschätzt. Beim Scrollen werden Bubbles, die den sichtbaren Bereich
+    verlassen, in einen Pool gelegt und für neu sichtbare Messages recycelt.
+    Session-Load und Speicherbedarf hängen damit nicht mehr von der Länge des
+    Transcripts ab.
+
+    _parent_canvas ist wie beim CTkScrollableFrame der scrollende Canvas, so dass
+    yview_moveto() & Co. unverändert funktionieren.
+    """
+
+    def __init__(self, master, app_config=None, label_text=None, **kwargs):
+        super().__init__(master, **kwargs)
+        self.app_config = app_config or {}
+        self.entries = []
+
+        self._offsets = [0]          # Y-Position jeder Message, letzter Wert = Gesamthöhe
+        self._layout_dirty = False
+        self._bound = set()          # Entries mit Widget
+        self._pool = []              # freie Bubbles (Canvas-Item versteckt)
+        self._chrome_height = None   # Bubble-Höhe ohne Textbox (Pixel), aus echten Bubbles gelernt
+        self._render_pending = None
+        self._last_view = None
+        self._region = None
+        self._width = 0
+
+        fg_color = kwargs.get("fg_color", ("gray86", "gray17"))
+        if not isinstance(fg_color, (tuple, list)):
+            fg_color = (fg_color, fg_color)
+        canvas_bg = fg_color[0] if ctk.get_appearance_mode() == "Light" else fg_color[1]
+
+        inset = kwargs.get("border_width", 0) + 3
+        if label_text:
+            self.label = ctk.CTkLabel(self, text=label_text, font=("Arial", 13, "bold"))
+            self.label.pack(fill="x", padx=inset, pady=(inset, 0))
+
+        self._parent_canvas = tk.Canvas(
+            self,
+            bg=canvas_bg,
+            highlightthickness=0,
+            bd=0,
+            yscrollincrement=20,
+            yscrollcommand=self._on_yview
+        )
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._parent_canvas.yview)
+        self._scrollbar.pack(side="right", fill="y", padx=(0, inset), pady=inset)
+        self._parent_canvas.pack(side="left", fill="both", expand=True, padx=(inset, 0), pady=inset)
+
+        self._parent_canvas.bind("<Configure>", self._on_canvas_configure)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self._parent_canvas.bind_all(sequence, self._on_mousewheel, add="+")
+
+    # ---------- Messages ----------
+
+    def append(self, sender, message, timestamp, metrics=None):
+        """Hängt eine Message an und liefert ihren TranscriptEntry"""
+        entry = TranscriptEntry(self, sender, message, timestamp, metrics)
+        self.entries.append(entry)
+        if not self._layout_dirty:
+            self._offsets.append(self._offsets[-1] + self._extent(entry))
+        self._schedule_render()
+        return entry
+
+    def remove(self, entry):
+        if entry.widget is not None:
+            self._release(entry)
+        if self.entries and self.entries[-1] is entry:
+            self.entries.pop()
+        elif entry in self.entries:
+            self.entries.remove(entry)
+        else:
+            return
+        self._layout_dirty = True
+        self._schedule_render()
+
+    def clear(self):
+        """Entfernt alle Messages (die Widgets bleiben im Pool)"""
+        for entry in list(self._bound):
+            self._release(entry)
+        self.entries.clear()
+        self._offsets = [0]
+        self._layout_dirty = False
+        self._render()
+        self._parent_canvas.yview_moveto(0.0)
+
+    def invalidate(self, entry):
+        """Höhe einer Message neu bestimmen (Text oder Metriken geändert)"""
+        entry.height = None
+        entry.measured = False
+        self._layout_dirty = True
+        self._schedule_render()
+
+    def update_style(self, app_config):
+        """Übernimmt neue Farben/Fonts für alle Messages"""
+        self.app_config = app_config
+        for bubble in self._pool:
+            bubble.app_config = app_config
+        for entry in self._bound:
+            entry.widget.update_style(app_config)
+        for entry in self.entries:
+            entry.height = None
+            entry.measured = False
+        self._layout_dirty = True
+        self._schedule_render()
+
+    # ---------- Höhen ----------
+
+    def _extent(self, entry):
+        """Platz einer Message im Transcript inklusive Abstand"""
+        if entry.height is None:
+            entry.height = self._estimate_height(entry)
+        return entry.height + 2 * BUBBLE_PADY
+
+    def _chrome(self, scaling):
+        if self._chrome_height is None:
+            return round(DEFAULT_CHROME_HEIGHT * scaling)
+        return self._chrome_height
+
+    def _estimate_height(self, entry):
+        """Schnelle Schätzung für noch nie angezeigte Messages (ohne Umbruch-Simulation)"""
+        scaling = self._get_widget_scaling()
+        style = bubble_style(entry.sender, self.app_config)
+        # Vor dem ersten Layout ist die Breite noch unbekannt
+        width = self._placement(entry)[1] if self._width else 600
+        text_height = text_measurer.estimate_height(
+            entry.message, (style["font"], style["font_size"]), width - TEXT_INSET_X * scaling, scaling
+        )
+        text_height = max(round(text_height / scaling) + TEXTBOX_PADDING, MIN_TEXT_HEIGHT)
+        return round(text_height * scaling) + self._chrome(scaling)
+
+    def _set_measured_height(self, entry, height):
+        if height <= 1 or (entry.measured and entry.height == height):
+            return
+        entry.measured = True
+        if entry.height != height:
+            entry.height = height
+            self._layout_dirty = True
+            self._schedule_render()
+
+    def _relayout(self):
+        offsets = [0]
+        y = 0
+        for entry in self.entries:
+            y += self._extent(entry)
+            offsets.append(y)
+        self._offsets = offsets
+        self._layout_dirty = False
+
+    # ---------- Rendering ----------
+
+    def _schedule_render(self):
+        if self._render_pending is None:
+            self._render_pending = self.after_idle(self._render)
+
+    def _capture_anchor(self):
+        """Merkt sich die Scroll-Position relativ zur obersten sichtbaren Message"""
+        if not self.entries or self._region is None:
+            return None
+        if self._parent_canvas.yview()[1] >= 0.999:
+            return ("bottom", None, 0)
+        top = self._parent_canvas.canvasy(0)
+        index = max(0, min(bisect.bisect_right(self._offsets, top) - 1, len(self.entries) - 1))
+        return ("entry", index, top - self._offsets[index])
+
+    def _restore_anchor(self, anchor):
+        kind, index, delta = anchor
+        region_height = self._region[3]
+        if kind == "bottom":
+            self._parent_canvas.yview_moveto(1.0)
+        elif region_height > 0 and index < len(self.entries):
+            self._parent_canvas.yview_moveto((self._offsets[index] + delta) / region_height)
+
+    def _render(self):
+        """Bindet Widgets an alle Messages im (erweiterten) sichtbaren Bereich"""
+        if self._render_pending is not None:
+            self.after_cancel(self._render_pending)
+            self._render_pending = None
+        canvas = self._parent_canvas
+
+        anchor = None
+        if self._layout_dirty:
+            # Höhen haben sich geändert: sichtbare Message bleibt an ihrer Position
+            anchor = self._capture_anchor()
+            self._relayout()
+
+        view_height = canvas.winfo_height()
+        region = (0, 0, max(self._width, 1), max(self._offsets[-1], view_height))
+        if region != self._region:
+            canvas.configure(scrollregion=region)
+            self._region = region
+        if anchor is not None:
+            self._restore_anchor(anchor)
+
+        top = canvas.canvasy(0)
+        first = max(0, bisect.bisect_right(self._offsets, top - OVERSCAN_PIXELS) - 1)
+        last = min(len(self.entries),
+                   bisect.bisect_left(self._offsets, top + view_height + OVERSCAN_PIXELS))
+        visible = self.entries[first:last]
+
+        visible_ids = set(map(id, visible))
+        for entry in [entry for entry in self._bound if id(entry) not in visible_ids]:
+            self._release(entry)
+
+        for index, entry in enumerate(visible, start=first):
+            x, width = self._placement(entry)
+            y = self._offsets[index] + BUBBLE_PADY
+            if entry.widget is None:
+                self._materialize(entry, x, y, width)
+            else:
+                canvas.coords(entry.widget.transcript_item, x, y)
+                canvas.itemconfigure(entry.widget.transcript_item, width=width)
+
+    def _placement(self, entry):
+        """X-Position und Breite einer Bubble (wie pack(fill="x", padx=...))"""
+        padx = 20 if entry.sender == "You" else 5
+        return padx, max(self._width - 2 * padx, 50)
+
+    def _materialize(self, entry, x, y, width):
+        """Holt eine Bubble aus dem Pool (oder erzeugt eine) und misst sie an ihrer Position"""
+        canvas = self._parent_canvas
+        if self._pool:
+            bubble = self._pool.pop()
+            bubble.transcript_entry = entry
+            canvas.coords(bubble.transcript_item, x, y)
+            canvas.itemconfigure(bubble.transcript_item, width=width, state="normal")
+            bubble.bind_message(entry.sender, entry.message, entry.timestamp, entry.metrics)
+        else:
+            bubble = ChatBubble(
+                canvas,
+                sender=entry.sender,
+                message=entry.message,
+                timestamp=entry.timestamp,
+                app_config=self.app_config,
+                auto_pack=False
+            )
+            bubble.transcript_entry = entry
+            bubble.transcript_item = canvas.create_window(x, y, window=bubble, anchor="nw", width=width)
+            bubble.bind("<Configure>", lambda event, b=bubble: self._on_bubble_configure(b, event))
+            if entry.metrics:
+                bubble.set_metrics(entry.metrics)
+        entry.widget = bubble
+        self._bound.add(entry)
+        
+        # Endgültige Höhe in einem Pass aus den Font-Metriken (kein Layout-Roundtrip)
+        bubble.adjust_height_to_content(width)
+        scaling = self._get_widget_scaling()
+        self._set_measured_height(entry, round(bubble.text_height * scaling) + self._chrome(scaling))
+
+    def _release(self, entry):
+        bubble = entry.widget
+        entry.widget = None
+        self._bound.discard(entry)
+        bubble.transcript_entry = None
+        if len(self._pool) < MAX_POOLED_BUBBLES:
+            self._parent_canvas.itemconfigure(bubble.transcript_item, state="hidden")
+            self._pool.append(bubble)
+        else:
+            self._parent_canvas.delete(bubble.transcript_item)
+            bubble.destroy()
+
+    # ---------- Events ----------
+
+    def _on_bubble_configure(self, bubble, event):
+        entry = bubble.transcript_entry
+        if entry is None:
+            return
+        if bubble.text_height:
+            # Tatsächliche Höhe von Header & Abständen für alle weiteren Berechnungen übernehmen
+            chrome = event.height - round(bubble.text_height * self._get_widget_scaling())
+            if chrome > 0:
+                self._chrome_height = chrome
+        self._set_measured_height(entry, event.height)
+
+    def _on_canvas_configure(self, event):
+        if event.width != self._width:
+            # Neue Breite: sichtbare Bubbles messen sich über <Configure> selbst neu,
+            # alle anderen werden bis zum nächsten Anzeigen nur geschätzt
+            self._width = event.width
+            for entry in self.entries:
+                entry.height = None
+                entry.measured = False
+            self._layout_dirty = True
+        self._schedule_render()
+
+    def _on_yview(self, first, last):
+        self._scrollbar.set(first, last)
+        if (first, last) != self._last_view:
+            self._last_view = (first, last)
+            self._schedule_render()
+
+    def _on_mousewheel(self, event):
+        if not str(event.widget).startswith(str(self._parent_canvas)):
+            return
+        if event.num == 4:
+            units = -3
+        elif event.num == 5:
+            units = 3
+        elif sys.platform == "darwin":
+            units = -event.delta
+        else:
+            units = -int(event.delta / 120) * 3
+        self._parent_canvas.yview_scroll(units, "units")